@@ -92,7 +92,7 @@ def main():
 
     schedule = solve_assignment(
         talks=talks, locations=locations, allowed_times=allowed_times
-    )
+    ).schedule
     # print(schedule)
     fig = plot_schedule(schedule)
     fig.show()
@@ -6,8 +6,18 @@ from ._types import (
     TimeSlot,
     AllowedTimes,
     TimeRange,
+    SolverOptions,
+    Solution,
 )
 from ._problem import solve_assignment
+from ._anytime import iterate_solutions
+from ._portfolio import solve_assignment_portfolio
+from ._lns import solve_lns
+from ._decomposition import solve_decomposed
+from ._cache import SolutionCache
+from ._scheduler import Scheduler
+from ._io import load_instance, read_schedule, write_schedule
+from ._service import SolveService, serve
 
 __all__ = [
     "Location",
@@ -17,5 +27,18 @@ __all__ = [
     "TimeSlot",
     "AllowedTimes",
     "TimeRange",
+    "SolverOptions",
+    "Solution",
     "solve_assignment",
+    "iterate_solutions",
+    "solve_assignment_portfolio",
+    "solve_lns",
+    "solve_decomposed",
+    "SolutionCache",
+    "Scheduler",
+    "load_instance",
+    "read_schedule",
+    "write_schedule",
+    "SolveService",
+    "serve",
 ]
\ No newline at end of file
@@ -0,0 +1,75 @@
+from dataclasses import dataclass, field
+
+from ._instance import ProblemInstance
+from ._types import Talk, Attendee
+
+from collections import defaultdict
+
+
+@dataclass(kw_only=True, frozen=True, eq=False)
+class AttendeeClass:
+    """
+    Non-speaker attendees that rate every talk the same way. The model only
+    decides how many members of a class attend each talk, the members are
+    distributed afterwards with `assign_class_members`.
+    """
+
+    name: str
+    members: tuple[Attendee, ...] = field(repr=False)
+    # One entry per talk, in the order of the talks the class was built from
+    preferences: tuple[float, ...] = field(repr=False)
+
+    @property
+    def size(self) -> int:
+        return len(self.members)
+
+
+def group_attendees(
+    instance: ProblemInstance,
+) -> tuple[list[int], list[AttendeeClass]]:
+    """
+    Split the attendees of `instance` into speakers, which are kept
+    individually by their ids, and classes of non-speakers with identical
+    preference profiles.
+    """
+    speakers = sorted(set(instance.speaker.tolist()))
+    is_speaker = set(speakers)
+
+    profiles: dict[tuple[float, ...], list[Attendee]] = defaultdict(list)
+    for index, profile in enumerate(map(tuple, instance.weights.tolist())):
+        if index not in is_speaker:
+            profiles[profile].append(instance.attendees[index])
+
+    classes = [
+        AttendeeClass(
+            name=f"class_{index}", members=tuple(members), preferences=profile
+        )
+        for index, (profile, members) in enumerate(profiles.items())
+    ]
+    return speakers, classes
+
+
+def assign_class_members(
+    attendee_class: AttendeeClass, attendance: list[tuple[Talk, int, int]]
+) -> dict[Talk, list[Attendee]]:
+    """
+    Distribute the members of a class over the talks it attends.
+
+    `attendance` holds `(talk, start_slot, count)` triples. As long as no slot
+    is attended by more than `attendee_class.size` members in total, the
+    greedy interval colouring below seats every member without overlaps.
+    """
+    free_from = {member: 0 for member in attendee_class.members}
+    assigned: dict[Talk, list[Attendee]] = {}
+
+    for talk, start, count in sorted(attendance, key=lambda entry: entry[1]):
+        available = [member for member, free in free_from.items() if free <= start]
+        if len(available) < count:
+            raise ValueError(
+                f"{attendee_class.name} cannot send {count} members to {talk.title}"
+            )
+        assigned[talk] = available[:count]
+        for member in assigned[talk]:
+            free_from[member] = start + talk.duration
+
+    return assigned
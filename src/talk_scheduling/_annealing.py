@@ -0,0 +1,231 @@
+from ._greedy import greedy_schedule
+from ._instance import ProblemInstance
+from ._model import schedule_objective
+from ._two_phase import fill_timetable, joint_upper_bound, timetable_surrogate
+from ._types import (
+    ScheduledTalk,
+    Solution,
+    SolverOptions,
+)
+
+import numpy as np
+import time
+from dataclasses import dataclass
+
+
+@dataclass(kw_only=True)
+class Timetable:
+    """
+    The start slot and room id of every talk, together with the busy masks
+    that make checking a move cheap: `occupant[location, slot]` is the talk
+    held there or -1, `speaking[attendee, slot]` counts the talks an attendee
+    gives at that slot.
+    """
+
+    starts: np.ndarray
+    rooms: np.ndarray
+    occupant: np.ndarray
+    speaking: np.ndarray
+
+    @classmethod
+    def of(
+        cls, instance: ProblemInstance, *, starts: np.ndarray, rooms: np.ndarray
+    ) -> "Timetable":
+        timetable = cls(
+            starts=starts.copy(),
+            rooms=rooms.copy(),
+            occupant=np.full((len(instance.locations), instance.horizon), -1),
+            speaking=np.zeros((len(instance.attendees), instance.horizon), dtype=int),
+        )
+        for talk in range(len(instance.talks)):
+            timetable.place(instance, talk, int(rooms[talk]), int(starts[talk]))
+        return timetable
+
+    def place(self, instance: ProblemInstance, talk: int, room: int, start: int):
+        end = start + instance.duration[talk]
+        self.starts[talk], self.rooms[talk] = start, room
+        self.occupant[room, start:end] = talk
+        self.speaking[instance.speaker[talk], start:end] += 1
+
+    def lift(self, instance: ProblemInstance, talk: int):
+        start = self.starts[talk]
+        end = start + instance.duration[talk]
+        self.occupant[self.rooms[talk], start:end] = -1
+        self.speaking[instance.speaker[talk], start:end] -= 1
+
+    def move(
+        self, instance: ProblemInstance, placements: list[tuple[int, int, int]]
+    ) -> bool:
+        """
+        Move every (talk, room, start) of `placements` at once. Returns whether
+        all speakers are still free, otherwise the move is undone.
+        """
+        previous = [
+            (talk, int(self.rooms[talk]), int(self.starts[talk]))
+            for talk, _, _ in placements
+        ]
+        for talk, _, _ in placements:
+            self.lift(instance, talk)
+        free = True
+        for talk, room, start in placements:
+            end = start + instance.duration[talk]
+            free = free and not self.speaking[instance.speaker[talk], start:end].any()
+            self.place(instance, talk, room, start)
+        if not free:
+            self.move(instance, previous)
+        return free
+
+
+def anneal_timetable(
+    instance: ProblemInstance,
+    timetable: Timetable,
+    *,
+    steps: int,
+    time_limit: float,
+    seed: int = 0,
+) -> Timetable:
+    """
+    Improve `timetable` by simulated annealing on the surrogate objective of
+    the two-phase strategy, keeping it feasible throughout.
+
+    Every step picks a talk and one of its allowed rooms and start slots. If
+    the room is free, the talk moves there; if a talk of the same duration
+    starts there, both swap places. The change of the objective only looks
+    at the moved talks: their room values and their overlap losses against
+    all other talks. Worse moves are accepted with the usual Metropolis
+    probability while the temperature cools geometrically over the steps or
+    the time limit, whichever runs out first. Returns the best timetable seen.
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    room_value, overlap_loss = timetable_surrogate(instance)
+    duration = instance.duration
+    # The allowed (room, start slot) pairs of every talk
+    moves = [np.argwhere(allowed) for allowed in instance.allowed_starts]
+    movable = np.flatnonzero([len(pairs) > 1 for pairs in moves])
+    if len(movable) == 0:
+        return timetable
+
+    def propose() -> tuple[float, list[tuple[int, int, int]]] | None:
+        """
+        A random move as the change of the objective and the new room and
+        start of every moved talk, or None if a room is taken.
+        """
+        talk = int(rng.choice(movable))
+        room, start = moves[talk][rng.integers(len(moves[talk]))].tolist()
+        end = start + int(duration[talk])
+        old_room, old_start = int(timetable.rooms[talk]), int(timetable.starts[talk])
+        if (room, start) == (old_room, old_start):
+            return None
+        placements = [(talk, room, start)]
+        occupants = set(timetable.occupant[room, start:end].tolist()) - {-1, talk}
+        if occupants:
+            other = occupants.pop()
+            if (
+                occupants
+                or timetable.starts[other] != start
+                or duration[other] != duration[talk]
+                or not instance.allowed_starts[other, old_room, old_start]
+            ):
+                return None
+            placements.append((other, old_room, old_start))
+
+        starts = timetable.starts
+        ends = starts + duration
+        others = np.ones(len(instance.talks), dtype=bool)
+        others[[moved for moved, _, _ in placements]] = False
+        change = 0.0
+        latest = ends[others].max(initial=0)
+        for moved, new_room, first in placements:
+            last = first + int(duration[moved])
+            change += (
+                room_value[moved, new_room] - room_value[moved, timetable.rooms[moved]]
+            )
+            overlapping = (ends > first) & (starts < last) & others
+            overlapped = (ends > starts[moved]) & (starts < ends[moved]) & others
+            change -= overlap_loss[moved] @ (overlapping.astype(float) - overlapped)
+            latest = max(latest, last)
+        change -= 0.001 * (latest - ends.max())
+        return change, placements
+
+    # Start hot enough to accept a typical worsening move half of the time
+    samples = [proposal[0] for _ in range(200) if (proposal := propose())]
+    worsening = [-change for change in samples if change < 0]
+    temperature = float(np.mean(worsening)) / np.log(2) if worsening else 1.0
+    final_temperature = temperature * 1e-3
+
+    current = best = 0.0
+    best_starts, best_rooms = timetable.starts.copy(), timetable.rooms.copy()
+    for step in range(steps):
+        elapsed = time.perf_counter() - started
+        if elapsed > time_limit:
+            break
+        progress = max(step / steps, elapsed / time_limit)
+        heat = temperature * (final_temperature / temperature) ** progress
+        proposal = propose()
+        if proposal is None:
+            continue
+        change, placements = proposal
+        if change < 0 and rng.random() >= np.exp(change / heat):
+            continue
+        if timetable.move(instance, placements):
+            current += change
+            if current > best + 1e-9:
+                best = current
+                best_starts, best_rooms = (
+                    timetable.starts.copy(),
+                    timetable.rooms.copy(),
+                )
+
+    return Timetable.of(instance, starts=best_starts, rooms=best_rooms)
+
+
+def solve_annealing(
+    *,
+    instance: ProblemInstance,
+    options: SolverOptions = SolverOptions(),
+    initial_schedule: list[ScheduledTalk] | None = None,
+    steps_per_talk: int = 500,
+) -> Solution:
+    """
+    Solve without any MIP solver: anneal the timetable of
+    `initial_schedule`, or the greedy schedule, for `steps_per_talk` steps
+    per talk or the time limit of `options`, and seat attendees as in the
+    two-phase strategy. The bound is the combinatorial bound of the joint
+    model.
+    """
+    started = time.perf_counter()
+    schedule = initial_schedule or greedy_schedule(instance)
+    if schedule is None:
+        print("No feasible initial schedule found")
+        return Solution(schedule=[], status="Not Solved", objective=None, bound=None)
+    objective = schedule_objective(schedule)
+    history = [(time.perf_counter() - started, objective)]
+
+    starts = np.zeros(len(instance.talks), dtype=int)
+    rooms = np.zeros(len(instance.talks), dtype=int)
+    for scheduled in schedule:
+        talk = instance.talk_index[scheduled.talk]
+        starts[talk] = scheduled.time_slot.index
+        rooms[talk] = instance.location_index[scheduled.location]
+    timetable = anneal_timetable(
+        instance,
+        Timetable.of(instance, starts=starts, rooms=rooms),
+        steps=steps_per_talk * len(instance.talks),
+        time_limit=options.time_limit,
+        seed=options.seed or 0,
+    )
+    annealed = fill_timetable(instance, starts=timetable.starts, rooms=timetable.rooms)
+    # The surrogate may mislead, the schedule it started from stays if better
+    if schedule_objective(annealed) > objective:
+        schedule, objective = annealed, schedule_objective(annealed)
+        history.append((time.perf_counter() - started, objective))
+    print(f"Objective: {objective}")
+
+    return Solution(
+        schedule=schedule,
+        status="Annealing",
+        objective=objective,
+        bound=joint_upper_bound(instance),
+        history=history,
+    )
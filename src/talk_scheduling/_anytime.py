@@ -0,0 +1,26 @@
+from ._portfolio import _SolveProcess
+from ._types import Solution
+
+from collections.abc import Iterator
+from typing import Any
+
+
+def iterate_solutions(**arguments: Any) -> Iterator[Solution]:
+    """
+    Run `solve_assignment` with the keyword `arguments` in a separate process
+    and yield the best solution so far after every stage, see its
+    `on_incumbent`. Closing the generator stops the process and the solver
+    it runs right away, also in the middle of a stage.
+    """
+    solve = _SolveProcess(arguments, quiet=False, stream=True)
+    try:
+        while True:
+            outcome, value = solve.receive()
+            if outcome == "incumbent":
+                yield value
+            elif outcome == "failed":
+                raise value
+            else:
+                return
+    finally:
+        solve.stop()
@@ -0,0 +1,258 @@
+from ._problem import solve_assignment
+from ._types import (
+    Location,
+    Talk,
+    ScheduledTalk,
+    Attendee,
+    TimeSlot,
+    AllowedTimes,
+    Solution,
+    SolverOptions,
+)
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class CacheStatistics:
+    hits: int = 0
+    near_hits: int = 0  # Solved with a cached schedule of a similar problem
+    misses: int = 0
+    evictions: int = 0
+
+
+def _digest(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def _ranges(allowed_times: AllowedTimes) -> list[tuple[int, int]]:
+    return sorted(
+        (time_range.start.index, time_range.end.index)
+        for time_range in allowed_times.times
+    )
+
+
+def _settings(settings: dict[str, Any]) -> dict[str, Any]:
+    return {
+        name: asdict(value) if isinstance(value, SolverOptions) else value
+        for name, value in settings.items()
+    }
+
+
+def problem_keys(
+    *,
+    talks: list[Talk],
+    locations: list[Location],
+    allowed_times: AllowedTimes,
+    settings: dict[str, Any],
+) -> tuple[str, str]:
+    """
+    Hashes of a problem together with the keyword arguments of
+    `solve_assignment` it is solved with: one of everything but the
+    preferences, whose schedules are feasible for each other, and one of the
+    whole problem.
+
+    Talks and locations are identified by their position, time ranges and
+    preferences are hashed independently of their order.
+    """
+    structure = _digest(
+        dict(
+            talks=[(talk.title, talk.speaker.name, talk.duration) for talk in talks],
+            locations=[
+                (location.name, location.capacity, _ranges(location.allowed_times))
+                for location in locations
+            ],
+            allowed_times=_ranges(allowed_times),
+            settings=_settings(settings),
+        )
+    )
+    preferences = _digest(
+        [
+            sorted(
+                (attendee.name, preference)
+                for attendee, preference in talk.visitor_preferences.items()
+            )
+            for talk in talks
+        ]
+    )
+    return structure, f"{structure}-{preferences}"
+
+
+class SolutionCache:
+    """
+    Solutions of `solve_assignment` stored on disk, keyed by a hash of the
+    problem and the solve settings.
+
+    Only solutions with a schedule are stored, so problems that were found
+    infeasible or timed out are solved again. Exact hits are returned without
+    solving. A problem that only differs in
+    its preferences from a cached one is solved with the cached schedule as
+    a warm start. Entries are evicted in least recently used order once they
+    take more than `max_bytes` on disk.
+    """
+
+    def __init__(self, directory: str | Path, *, max_bytes: int = 64 * 2**20):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.statistics = CacheStatistics()
+
+    def solve(
+        self,
+        *,
+        talks: list[Talk],
+        locations: list[Location],
+        allowed_times: AllowedTimes,
+        **settings: Any,
+    ) -> Solution:
+        """
+        `solve_assignment` with the cache in front of it, `settings` are its
+        keyword arguments.
+        """
+        started = time.perf_counter()
+        structure, key = problem_keys(
+            talks=talks,
+            locations=locations,
+            allowed_times=allowed_times,
+            settings=settings,
+        )
+        path = self.directory / f"{key}.json"
+        if path.exists():
+            self.statistics.hits += 1
+            solution = self._load(path, talks=talks, locations=locations)
+            solution.wall_time = time.perf_counter() - started
+            return solution
+
+        initial_schedule = None
+        options = settings.get("options", SolverOptions())
+        if settings.get("strategy", "joint") == "joint" and options.backend == "cbc":
+            initial_schedule = self._near_hit(structure, talks, locations)
+        if initial_schedule is None:
+            self.statistics.misses += 1
+        else:
+            self.statistics.near_hits += 1
+            settings = dict(settings, initial_schedule=initial_schedule)
+
+        solution = solve_assignment(
+            talks=talks, locations=locations, allowed_times=allowed_times, **settings
+        )
+        # Without a schedule the solve may have run out of time, a later one
+        # may still succeed
+        if solution.schedule and solution.objective is not None:
+            self._store(path, solution, talks=talks, locations=locations)
+            self._evict()
+        return solution
+
+    def clear(self):
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def _near_hit(
+        self, structure: str, talks: list[Talk], locations: list[Location]
+    ) -> list[ScheduledTalk] | None:
+        candidates = sorted(
+            self.directory.glob(f"{structure}-*.json"),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+        for path in candidates:
+            schedule = self._load(path, talks=talks, locations=locations).schedule
+            if len(schedule) != len(talks):
+                continue
+            # Attendees that no longer take part in the problem leave their talks
+            known = {
+                attendee
+                for talk in talks
+                for attendee in [talk.speaker, *talk.visitor_preferences]
+            }
+            return [
+                ScheduledTalk(
+                    talk=scheduled.talk,
+                    time_slot=scheduled.time_slot,
+                    location=scheduled.location,
+                    attendees=[
+                        attendee
+                        for attendee in scheduled.attendees
+                        if attendee in known
+                    ],
+                )
+                for scheduled in schedule
+            ]
+        return None
+
+    def _load(
+        self, path: Path, *, talks: list[Talk], locations: list[Location]
+    ) -> Solution:
+        entry = json.loads(path.read_text())
+        # Mark the entry as recently used
+        os.utime(path)
+        return Solution(
+            schedule=[
+                ScheduledTalk(
+                    talk=talks[talk],
+                    time_slot=TimeSlot(start),
+                    location=locations[location],
+                    attendees=[Attendee(name=name) for name in attendees],
+                )
+                for talk, location, start, attendees in entry["schedule"]
+            ],
+            status=entry["status"],
+            objective=entry["objective"],
+            bound=entry["bound"],
+            wall_time=entry["wall_time"],
+            history=[tuple(point) for point in entry["history"]],
+        )
+
+    def _store(
+        self,
+        path: Path,
+        solution: Solution,
+        *,
+        talks: list[Talk],
+        locations: list[Location],
+    ):
+        talk_index = {id(talk): index for index, talk in enumerate(talks)}
+        location_index = {location: index for index, location in enumerate(locations)}
+        entry = dict(
+            schedule=[
+                (
+                    talk_index[id(scheduled.talk)],
+                    location_index[scheduled.location],
+                    scheduled.time_slot.index,
+                    [attendee.name for attendee in scheduled.attendees],
+                )
+                for scheduled in solution.schedule
+            ],
+            status=solution.status,
+            objective=solution.objective,
+            bound=solution.bound,
+            wall_time=solution.wall_time,
+            history=solution.history,
+        )
+        # Concurrent readers never see a partially written entry
+        partial = path.with_suffix(f".{os.getpid()}.tmp")
+        partial.write_text(json.dumps(entry))
+        os.replace(partial, path)
+
+    def _evict(self):
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+            self.statistics.evictions += 1
@@ -0,0 +1,95 @@
+from ._instance import ProblemInstance
+from ._types import (
+    Location,
+    Talk,
+    ScheduledTalk,
+    TimeSlot,
+    AllowedTimes,
+    TimeRange,
+)
+
+import numpy as np
+from dataclasses import replace
+
+
+def coarsen_times(allowed_times: AllowedTimes, factor: int) -> AllowedTimes:
+    """
+    The coarse slots that lie completely within a range, so every coarse
+    placement is also a valid fine one.
+    """
+    times = []
+    for time_range in allowed_times.times:
+        start = -(-time_range.start.index // factor)
+        end = time_range.end.index // factor
+        if start < end:
+            times.append(TimeRange(start=TimeSlot(start), end=TimeSlot(end)))
+    return AllowedTimes(times=times)
+
+
+def coarsen_problem(
+    *,
+    talks: list[Talk],
+    locations: list[Location],
+    allowed_times: AllowedTimes,
+    factor: int,
+) -> dict:
+    """
+    The problem with every `factor` slots merged into one. Durations are
+    rounded up and ranges shrunk to the coarse slots they contain, so any
+    coarse schedule scaled back by `factor` is feasible. Talks and locations
+    keep their positions.
+    """
+    return dict(
+        talks=[replace(talk, duration=-(-talk.duration // factor)) for talk in talks],
+        locations=[
+            replace(
+                location,
+                allowed_times=coarsen_times(location.allowed_times, factor),
+            )
+            for location in locations
+        ],
+        allowed_times=coarsen_times(allowed_times, factor),
+    )
+
+
+def refine_schedule(
+    schedule: list[ScheduledTalk],
+    *,
+    coarse_talks: list[Talk],
+    coarse_locations: list[Location],
+    talks: list[Talk],
+    locations: list[Location],
+    factor: int,
+) -> list[ScheduledTalk]:
+    """
+    Map a schedule of the coarse problem back to the original talks,
+    locations and slots.
+    """
+    talk_of = {id(coarse): talk for coarse, talk in zip(coarse_talks, talks)}
+    location_of = dict(zip(coarse_locations, locations))
+    return [
+        replace(
+            scheduled,
+            talk=talk_of[id(scheduled.talk)],
+            location=location_of[scheduled.location],
+            time_slot=TimeSlot(scheduled.time_slot.index * factor),
+        )
+        for scheduled in schedule
+    ]
+
+
+def restrict_to_window(
+    instance: ProblemInstance, schedule: list[ScheduledTalk], window: int
+) -> ProblemInstance:
+    """
+    `instance` with every talk held in its room of `schedule`, starting at
+    most `window` slots before or after its start there.
+    """
+    allowed = np.zeros_like(instance.allowed_starts)
+    slots = np.arange(instance.horizon)
+    for scheduled in schedule:
+        talk = instance.talk_index[scheduled.talk]
+        location = instance.location_index[scheduled.location]
+        near = np.abs(slots - scheduled.time_slot.index) <= window
+        allowed[talk, location] = instance.allowed_starts[talk, location] & near
+    return replace(instance, allowed_starts=allowed)
@@ -0,0 +1,359 @@
+from ._instance import ProblemInstance, compile_instance
+from ._lns import merge_schedules
+from ._model import schedule_objective
+from ._portfolio import _solve_quietly
+from ._solvers import solve_cbc
+from ._two_phase import joint_upper_bound
+from ._types import (
+    Location,
+    Talk,
+    ScheduledTalk,
+    TimeSlot,
+    AllowedTimes,
+    TimeRange,
+    Solution,
+    SolverOptions,
+)
+
+import numpy as np
+import pulp
+import time
+from collections import defaultdict
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import combinations
+from typing import Any
+
+
+@dataclass(kw_only=True, frozen=True)
+class Block:
+    """
+    One weakly coupled part of a problem: a span of time, such as a day, and
+    a cluster of rooms. `original_of` maps the block's copies of the rooms,
+    restricted to the span, back to the rooms they were made from.
+    """
+
+    start: int
+    end: int
+    original_of: dict[Location, Location]
+    allowed_times: AllowedTimes
+
+    @property
+    def locations(self) -> list[Location]:
+        return list(self.original_of)
+
+    def overlaps(self, other: "Block") -> bool:
+        return self.start < other.end and other.start < self.end
+
+
+def time_spans(allowed_times: AllowedTimes) -> list[tuple[int, int]]:
+    """
+    The maximal spans covered by the allowed time ranges, ranges that overlap
+    or touch are joined.
+    """
+    spans: list[tuple[int, int]] = []
+    for time_range in sorted(
+        allowed_times.times, key=lambda time_range: time_range.start
+    ):
+        start, end = time_range.start.index, time_range.end.index
+        if spans and start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+        else:
+            spans.append((start, end))
+    return spans
+
+
+def _restrict(times: AllowedTimes, start: int, end: int) -> AllowedTimes:
+    return AllowedTimes(
+        times=[
+            TimeRange(
+                start=TimeSlot(max(time_range.start.index, start)),
+                end=TimeSlot(min(time_range.end.index, end)),
+            )
+            for time_range in times.times
+            if time_range.start.index < end and start < time_range.end.index
+        ]
+    )
+
+
+def split_blocks(
+    *,
+    locations: list[Location],
+    allowed_times: AllowedTimes,
+    by_day: bool = True,
+    room_clusters: list[list[Location]] | None = None,
+) -> list[Block]:
+    """
+    Split a problem into blocks: one per span of the allowed times if
+    `by_day`, times one per cluster of `room_clusters`. Blocks without a room
+    that is available during their span are left out.
+    """
+    spans = time_spans(allowed_times)
+    if not by_day and spans:
+        spans = [(spans[0][0], spans[-1][1])]
+
+    blocks = []
+    for start, end in spans:
+        for cluster in room_clusters or [locations]:
+            original_of = {}
+            for location in cluster:
+                times = _restrict(location.allowed_times, start, end)
+                if times.times:
+                    original_of[replace(location, allowed_times=times)] = location
+            if original_of:
+                blocks.append(
+                    Block(
+                        start=start,
+                        end=end,
+                        original_of=original_of,
+                        allowed_times=_restrict(allowed_times, start, end),
+                    )
+                )
+    return blocks
+
+
+def assign_blocks(
+    instance: ProblemInstance,
+    blocks: list[Block],
+    options: SolverOptions,
+    *,
+    cuts: Sequence[tuple[int, frozenset[int]]] = (),
+) -> list[int] | None:
+    """
+    Assign every talk to a block with a small aggregate MIP. Returns the
+    block of every talk, or None if no assignment was found. Every cut holds
+    a block and a set of talks that must not all be assigned to it.
+
+    The talks of a block must fit into its rooms' free slots, and a speaker's
+    talks into its span. A speaker only gives talks in one of the blocks that
+    overlap in time. The objective rewards every talk by the best attendance
+    the largest room of its block allows and penalises attendees for rated
+    talks beyond the length of a span, at their average preference per slot.
+    """
+    talks = range(len(instance.talks))
+    duration = instance.duration.tolist()
+    weights = instance.weights
+    ranked = -np.sort(-weights, axis=0)
+    # best[k, talk] is the best attendance of `talk` in a room with k seats
+    best = np.vstack([np.zeros(len(instance.talks)), np.cumsum(ranked, axis=0)])
+
+    fits = {}
+    value = {}
+    room_slots = []
+    for index, block in enumerate(blocks):
+        compiled = compile_instance(
+            talks=instance.talks,
+            locations=block.locations,
+            allowed_times=block.allowed_times,
+            attendees=instance.attendees,
+        )
+        largest = min(int(compiled.capacity.max()), len(instance.attendees))
+        for talk in np.flatnonzero(compiled.allowed_starts.any(axis=(1, 2))).tolist():
+            fits[talk, index] = True
+            value[talk, index] = float(best[largest, talk])
+        # Slots at which a room is open and talks are allowed at all
+        globally = np.zeros(compiled.horizon, dtype=bool)
+        for time_range in block.allowed_times.times:
+            globally[time_range.start.index : time_range.end.index] = True
+        room_slots.append(
+            sum(
+                int(globally[time_range.start.index : time_range.end.index].sum())
+                for location in block.locations
+                for time_range in location.allowed_times.times
+            )
+        )
+
+    problem = pulp.LpProblem("BlockAssignment", pulp.LpMaximize)
+    assigned = pulp.LpVariable.dicts("assigned", fits.keys(), cat=pulp.LpBinary)
+    for talk in talks:
+        problem += (
+            pulp.lpSum(
+                assigned[talk, index]
+                for index in range(len(blocks))
+                if (talk, index) in fits
+            )
+            == 1
+        )
+    for index, block in enumerate(blocks):
+        problem += (
+            pulp.lpSum(
+                duration[talk] * assigned[talk, index]
+                for talk in talks
+                if (talk, index) in fits
+            )
+            <= room_slots[index]
+        )
+
+    speaker = instance.speaker.tolist()
+    gives = {}
+    for talk in talks:
+        for index, block in enumerate(blocks):
+            if (talk, index) not in fits:
+                continue
+            key = speaker[talk], index
+            if key not in gives:
+                gives[key] = pulp.LpVariable(
+                    f"gives_{key[0]}_{index}", cat=pulp.LpBinary
+                )
+            problem += assigned[talk, index] <= gives[key]
+    for (speaker_id, index), variable in gives.items():
+        problem += (
+            pulp.lpSum(
+                duration[talk] * assigned[talk, index]
+                for talk in talks
+                if speaker[talk] == speaker_id and (talk, index) in fits
+            )
+            <= blocks[index].end - blocks[index].start
+        )
+    for (index_i, block_i), (index_j, block_j) in combinations(enumerate(blocks), 2):
+        if not block_i.overlaps(block_j):
+            continue
+        for speaker_id in set(speaker):
+            if (speaker_id, index_i) in gives and (speaker_id, index_j) in gives:
+                problem += gives[speaker_id, index_i] + gives[speaker_id, index_j] <= 1
+
+    # Attendees lose the talks they rated beyond what fits into a span
+    spans = sorted({(block.start, block.end) for block in blocks})
+    excess_penalty = []
+    by_attendee = instance.preferences.tocsr()
+    for attendee in range(len(instance.attendees)):
+        first, last = by_attendee.indptr[attendee], by_attendee.indptr[attendee + 1]
+        rated = by_attendee.indices[first:last].tolist()
+        if not rated:
+            continue
+        per_slot = float(
+            np.mean([weights[attendee, talk] / duration[talk] for talk in rated])
+        )
+        for start, end in spans:
+            load = pulp.lpSum(
+                duration[talk] * assigned[talk, index]
+                for talk in rated
+                for index, block in enumerate(blocks)
+                if (block.start, block.end) == (start, end) and (talk, index) in fits
+            )
+            excess = pulp.LpVariable(f"excess_{attendee}_{start}", 0)
+            problem += excess >= load - (end - start)
+            excess_penalty.append(per_slot * excess)
+
+    problem += pulp.lpSum(
+        value[pair] * variable for pair, variable in assigned.items()
+    ) - pulp.lpSum(excess_penalty)
+
+    for index, group in cuts:
+        problem += pulp.lpSum(assigned[talk, index] for talk in group) <= len(group) - 1
+
+    solve_cbc(problem, options)
+    if problem.status != pulp.LpStatusOptimal:
+        return None
+    block_of = [0] * len(instance.talks)
+    for (talk, index), variable in assigned.items():
+        if round(variable.value() or 0) == 1:
+            block_of[talk] = index
+    return block_of
+
+
+def solve_decomposed(
+    *,
+    talks: list[Talk],
+    locations: list[Location],
+    allowed_times: AllowedTimes,
+    by_day: bool = True,
+    room_clusters: list[list[Location]] | None = None,
+    max_workers: int | None = None,
+    max_rounds: int = 5,
+    options: SolverOptions = SolverOptions(),
+    **settings: Any,
+) -> Solution:
+    """
+    Solve a problem whose time and rooms split into weakly coupled blocks.
+
+    The problem is split into one block per day, the maximal spans of the
+    allowed times, and per cluster of `room_clusters`. An aggregate model
+    assigns every talk to a block, then every block is solved by
+    `solve_assignment` with `settings` and `options` in its own process and
+    the schedules are stitched together. A block that can not be solved
+    forbids its set of talks and the talks are assigned again, for at most
+    `max_rounds` assignments. Speakers only give talks in one of
+    the blocks that overlap in time; listeners booked into overlapping talks
+    of different room clusters stay in the one they prefer.
+
+    The time limit of `options` applies to every aggregate model and every
+    block. The bound is that of the whole problem, as in the two-phase
+    strategy.
+    """
+    if max_rounds < 1:
+        raise ValueError(f"max_rounds must be at least 1, got {max_rounds}")
+    started = time.perf_counter()
+    instance = compile_instance(
+        talks=talks, locations=locations, allowed_times=allowed_times
+    )
+    blocks = split_blocks(
+        locations=locations,
+        allowed_times=allowed_times,
+        by_day=by_day,
+        room_clusters=room_clusters,
+    )
+    # Solutions of every block and set of talks solved so far
+    solved: dict[tuple[int, frozenset[int]], Solution] = {}
+    cuts: list[tuple[int, frozenset[int]]] = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for _ in range(max_rounds):
+            block_of = assign_blocks(instance, blocks, options, cuts=cuts)
+            if block_of is None:
+                break
+            talks_of: dict[int, set[int]] = defaultdict(set)
+            for talk, index in enumerate(block_of):
+                talks_of[index].add(talk)
+            groups = [(index, frozenset(group)) for index, group in talks_of.items()]
+            pending = [group for group in groups if group not in solved]
+            print(f"Solving {len(pending)} of {len(groups)} blocks")
+            arguments = [
+                dict(
+                    settings,
+                    talks=[talks[talk] for talk in sorted(group)],
+                    locations=blocks[index].locations,
+                    allowed_times=blocks[index].allowed_times,
+                    options=options,
+                )
+                for index, group in pending
+            ]
+            solved.update(zip(pending, executor.map(_solve_quietly, arguments)))
+
+            failed = [group for group in groups if solved[group].objective is None]
+            if not failed:
+                break
+            # These talks do not fit into their block together, forbid that
+            print(f"{len(failed)} blocks could not be solved, reassigning talks")
+            cuts += failed
+    if block_of is None or failed:
+        return Solution(
+            schedule=[],
+            status="Not Solved",
+            objective=None,
+            bound=None,
+            wall_time=time.perf_counter() - started,
+        )
+
+    schedule: list[ScheduledTalk] = []
+    for index, group in groups:
+        block, solution = blocks[index], solved[index, group]
+        print(
+            f"Block {block.start}-{block.end}: {solution.status}, "
+            f"objective {solution.objective}"
+        )
+        schedule = merge_schedules(
+            schedule,
+            [
+                replace(scheduled, location=block.original_of[scheduled.location])
+                for scheduled in solution.schedule
+            ],
+        )
+
+    return Solution(
+        schedule=schedule,
+        status="Decomposed",
+        objective=schedule_objective(schedule),
+        bound=joint_upper_bound(instance),
+        wall_time=time.perf_counter() - started,
+    )
@@ -0,0 +1,12 @@
+def contiguous_runs(slots: list[int]) -> list[tuple[int, int]]:
+    """
+    Split sorted slots into maximal runs of consecutive slots, returned as
+    inclusive `(first, last)` pairs.
+    """
+    runs = []
+    for slot in slots:
+        if runs and runs[-1][1] == slot - 1:
+            runs[-1] = (runs[-1][0], slot)
+        else:
+            runs.append((slot, slot))
+    return runs
@@ -0,0 +1,54 @@
+from ._instance import ProblemInstance
+from ._two_phase import fill_timetable
+from ._types import ScheduledTalk
+
+import numpy as np
+
+
+def greedy_schedule(instance: ProblemInstance) -> list[ScheduledTalk] | None:
+    """
+    A feasible schedule built without any solver.
+
+    Talks are placed in order of their total preference weight into the
+    earliest start slot of any room that is free and whose speaker is free,
+    preferring larger rooms on ties. Attendees are assigned as in the second
+    phase of the two-phase strategy. Returns None if some talk does not fit
+    anywhere anymore.
+    """
+    number_of_talks = len(instance.talks)
+    duration = instance.duration.tolist()
+    speaker = instance.speaker.tolist()
+    # The speaker has to fit into the room
+    allowed_starts = instance.allowed_starts & (instance.capacity >= 1)[:, None]
+    # Larger rooms first, so the earliest slot wins and capacity breaks ties
+    by_capacity = np.argsort(-instance.capacity, kind="stable")
+
+    room_busy = np.zeros(
+        (len(instance.locations), instance.horizon + max(duration, default=0)),
+        dtype=bool,
+    )
+    speaker_busy = np.zeros((len(instance.attendees), room_busy.shape[1]), dtype=bool)
+    starts = np.zeros(number_of_talks, dtype=int)
+    rooms = np.zeros(number_of_talks, dtype=int)
+
+    for talk in np.argsort(-instance.weights.sum(axis=0), kind="stable").tolist():
+        length = duration[talk]
+        # free[location, slot] tells whether the room and speaker are free for
+        # the whole talk when it starts at slot
+        window = np.lib.stride_tricks.sliding_window_view(room_busy, length, axis=1)
+        free = ~window.any(axis=2)[:, : instance.horizon]
+        speaker_window = np.lib.stride_tricks.sliding_window_view(
+            speaker_busy[speaker[talk]], length
+        )
+        free &= ~speaker_window.any(axis=1)[: instance.horizon]
+        candidates = (allowed_starts[talk] & free)[by_capacity]
+        if not candidates.any():
+            return None
+        # The earliest slot, then the first room in order of capacity
+        slot = int(np.flatnonzero(candidates.any(axis=0))[0])
+        location = int(by_capacity[np.flatnonzero(candidates[:, slot])[0]])
+        room_busy[location, slot : slot + length] = True
+        speaker_busy[speaker[talk], slot : slot + length] = True
+        starts[talk], rooms[talk] = slot, location
+
+    return fill_timetable(instance, starts=starts, rooms=rooms)
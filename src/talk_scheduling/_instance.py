@@ -0,0 +1,177 @@
+from dataclasses import dataclass, field
+
+from ._types import (
+    Location,
+    Talk,
+    Attendee,
+    AllowedTimes,
+    TimeRange,
+)
+
+import numpy as np
+import scipy.sparse as sp
+from collections.abc import Iterable
+from functools import cached_property
+
+
+@dataclass(kw_only=True, frozen=True, eq=False)
+class ProblemInstance:
+    """
+    A scheduling problem compiled into dense integer ids and arrays.
+
+    Talks, locations and attendees are identified by their position in
+    `talks`, `locations` and `attendees`, the models are built over these ids
+    and only map back to the original objects when a schedule is extracted.
+    `allowed_times` are the globally allowed times they were compiled with.
+    `allowed_starts[talk, location, slot]` tells whether a talk fits into one
+    range of the location and one globally allowed range when it starts at
+    `slot`. `preferences` only holds the explicit preferences as a sparse
+    (attendees x talks) matrix, `weights` fills in the default.
+    """
+
+    talks: list[Talk]
+    locations: list[Location]
+    attendees: list[Attendee]
+    allowed_times: AllowedTimes
+    duration: np.ndarray
+    capacity: np.ndarray
+    speaker: np.ndarray
+    allowed_starts: np.ndarray
+    preferences: sp.csc_array
+    talk_index: dict[Talk, int] = field(repr=False)
+    location_index: dict[Location, int] = field(repr=False)
+    attendee_index: dict[Attendee, int] = field(repr=False)
+
+    @property
+    def horizon(self) -> int:
+        return self.allowed_starts.shape[2]
+
+    @cached_property
+    def weights(self) -> np.ndarray:
+        """
+        Preferences as a dense (attendees x talks) matrix, with the default of
+        0.1 for unrated talks that the objective of `solve_assignment` uses.
+        """
+        weights = np.full((len(self.attendees), len(self.talks)), 0.1)
+        rated = self.preferences.tocoo()
+        weights[rated.row, rated.col] = rated.data
+        return weights
+
+    def rated_by(self, talk: int) -> list[int]:
+        """
+        The attendees with an explicit preference for `talk`.
+        """
+        start, end = self.preferences.indptr[talk], self.preferences.indptr[talk + 1]
+        return self.preferences.indices[start:end].tolist()
+
+    def domains(self) -> dict[tuple[int, int], list[int]]:
+        """
+        The feasible start slots of every talk and location. Pairs without any
+        feasible start slot are left out, a talk can never be held there.
+        """
+        talks, locations, slots = np.nonzero(self.allowed_starts)
+        # np.nonzero lists the slots of every pair consecutively
+        pair = talks * len(self.locations) + locations
+        firsts = np.flatnonzero(np.diff(pair, prepend=-1))
+        return {
+            (talk, location): starts.tolist()
+            for talk, location, starts in zip(
+                talks[firsts].tolist(),
+                locations[firsts].tolist(),
+                np.split(slots, firsts[1:]),
+            )
+        }
+
+
+def _fitting_starts(
+    times: list[TimeRange], durations: np.ndarray, horizon: int
+) -> np.ndarray:
+    """
+    A (durations x horizon) mask of the slots at which something of each
+    duration can start such that it ends within the same time range.
+    """
+    fits = np.zeros((len(durations), horizon), dtype=bool)
+    for time_range in times:
+        for row, duration in enumerate(durations.tolist()):
+            last = time_range.end.index - duration
+            if last >= time_range.start.index:
+                fits[row, time_range.start.index : last + 1] = True
+    return fits
+
+
+def compile_instance(
+    *,
+    talks: list[Talk],
+    locations: list[Location],
+    allowed_times: AllowedTimes,
+    attendees: Iterable[Attendee] | None = None,
+) -> ProblemInstance:
+    """
+    Compile the public dataclasses into a `ProblemInstance`.
+
+    `attendees` defaults to everyone related to `talks`; pass a larger set when
+    `talks` are only part of an event whose other attendees may join them too.
+    Attendees are numbered in order of their names.
+    """
+    if attendees is None:
+        attendees = {
+            attendee
+            for talk in talks
+            for attendee in [talk.speaker, *talk.visitor_preferences]
+        }
+    attendees = sorted(attendees, key=lambda attendee: attendee.name)
+    talk_index = {talk: index for index, talk in enumerate(talks)}
+    location_index = {location: index for index, location in enumerate(locations)}
+    attendee_index = {attendee: index for index, attendee in enumerate(attendees)}
+
+    duration = np.array([talk.duration for talk in talks], dtype=int)
+    capacity = np.array([location.capacity for location in locations], dtype=int)
+    speaker = np.array([attendee_index[talk.speaker] for talk in talks], dtype=int)
+
+    rows, columns, values = [], [], []
+    for column, talk in enumerate(talks):
+        for attendee, preference in talk.visitor_preferences.items():
+            rows.append(attendee_index[attendee])
+            columns.append(column)
+            values.append(preference)
+    # Explicit preferences of 0 are kept as stored entries, they still count
+    # as rated
+    preferences = sp.csc_array(
+        (np.array(values, dtype=float), (rows, columns)),
+        shape=(len(attendees), len(talks)),
+    )
+
+    horizon = max(
+        (
+            time_range.end.index
+            for times in [
+                allowed_times,
+                *(location.allowed_times for location in locations),
+            ]
+            for time_range in times.times
+        ),
+        default=0,
+    )
+    durations, duration_id = np.unique(duration, return_inverse=True)
+    globally = _fitting_starts(allowed_times.times, durations, horizon)
+    fits = np.zeros((len(locations), len(durations), horizon), dtype=bool)
+    for index, location in enumerate(locations):
+        fits[index] = (
+            _fitting_starts(location.allowed_times.times, durations, horizon) & globally
+        )
+    allowed_starts = fits[:, duration_id, :].transpose(1, 0, 2)
+
+    return ProblemInstance(
+        talks=talks,
+        locations=locations,
+        attendees=attendees,
+        allowed_times=allowed_times,
+        duration=duration,
+        capacity=capacity,
+        speaker=speaker,
+        allowed_starts=np.ascontiguousarray(allowed_starts),
+        preferences=preferences,
+        talk_index=talk_index,
+        location_index=location_index,
+        attendee_index=attendee_index,
+    )
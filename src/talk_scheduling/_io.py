@@ -0,0 +1,268 @@
+from ._types import (
+    Location,
+    Talk,
+    ScheduledTalk,
+    Attendee,
+    TimeSlot,
+    AllowedTimes,
+    TimeRange,
+)
+
+import numpy as np
+import pandas as pd
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TypedDict
+
+Table = str | Path | pd.DataFrame
+
+
+class Instance(TypedDict):
+    """
+    The keyword arguments `solve_assignment` takes to describe a problem.
+    """
+
+    talks: list[Talk]
+    locations: list[Location]
+    allowed_times: AllowedTimes
+
+
+def _format(path: Path) -> str:
+    match path.suffix.lower():
+        case ".csv":
+            return "csv"
+        case ".json":
+            return "json"
+        case ".jsonl" | ".ndjson":
+            return "jsonl"
+        case ".parquet" | ".pq":
+            return "parquet"
+        case suffix:
+            raise ValueError(f"Unknown table format: {suffix}")
+
+
+def read_table(
+    source: Table, *, columns: list[str], chunksize: int | None = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Read `columns` of a CSV, JSON, JSON lines or Parquet file, picked by its
+    suffix, in chunks of `chunksize` rows. CSV and JSON lines are streamed,
+    the other formats are read at once. A DataFrame is passed through.
+    """
+    if isinstance(source, pd.DataFrame):
+        frames = [source]
+    else:
+        path = Path(source)
+        match _format(path):
+            case "csv":
+                frames = pd.read_csv(path, usecols=columns, chunksize=chunksize)
+                if chunksize is None:
+                    frames = [frames]
+            case "jsonl":
+                frames = pd.read_json(path, lines=True, chunksize=chunksize)
+                if chunksize is None:
+                    frames = [frames]
+            case "json":
+                frames = [pd.read_json(path)]
+            case "parquet":
+                frames = [pd.read_parquet(path, columns=columns)]
+
+    for frame in frames:
+        missing = set(columns) - set(frame.columns)
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+        yield frame[columns]
+
+
+def _write_table(frame: pd.DataFrame, path: str | Path):
+    path = Path(path)
+    match _format(path):
+        case "csv":
+            frame.to_csv(path, index=False)
+        case "json":
+            frame.to_json(path, orient="records")
+        case "jsonl":
+            frame.to_json(path, orient="records", lines=True)
+        case "parquet":
+            frame.to_parquet(path, index=False)
+
+
+def _time_ranges(frame: pd.DataFrame) -> list[TimeRange]:
+    return [
+        TimeRange(start=TimeSlot(start), end=TimeSlot(end))
+        for start, end in zip(
+            frame["start"].astype(int).tolist(), frame["end"].astype(int).tolist()
+        )
+    ]
+
+
+def load_instance(
+    *,
+    talks: Table,
+    rooms: Table,
+    availability: Table,
+    preferences: Table,
+    chunksize: int = 100_000,
+) -> Instance:
+    """
+    Load a problem from tables, returned as keyword arguments of
+    `solve_assignment`.
+
+    `talks` has the columns `title`, `speaker` and `duration`, `rooms` the
+    columns `name` and `capacity`. `availability` holds `location`, `start`
+    and `end` of every allowed time range; rows without a location are the
+    globally allowed times, if there are none the whole span of the rooms'
+    ranges is allowed. `preferences` is a long table of `talk`, `attendee`
+    and `preference` rows, read in chunks of `chunksize` rows. Talks and
+    rooms are referred to by their titles and names, attendees by their
+    names.
+    """
+    [talk_table] = read_table(talks, columns=["title", "speaker", "duration"])
+    [room_table] = read_table(rooms, columns=["name", "capacity"])
+    [ranges] = read_table(availability, columns=["location", "start", "end"])
+
+    titles = pd.Index(talk_table["title"])
+    if not titles.is_unique:
+        raise ValueError("Talk titles must be unique")
+    names = pd.Index(room_table["name"])
+    if not names.is_unique:
+        raise ValueError("Room names must be unique")
+
+    # Rows are mapped to ids chunk by chunk, only distinct names are hashed
+    talk_ids, attendee_ids, values = [], [], []
+    attendee_names: list[str] = []
+    attendee_id: dict[str, int] = {}
+    for chunk in read_table(
+        preferences, columns=["talk", "attendee", "preference"], chunksize=chunksize
+    ):
+        talk_id = titles.get_indexer(chunk["talk"])
+        if (talk_id < 0).any():
+            unknown = chunk["talk"][talk_id < 0].iloc[0]
+            raise ValueError(f"Preference for unknown talk: {unknown}")
+        codes, uniques = pd.factorize(chunk["attendee"])
+        for name in uniques.tolist():
+            if name not in attendee_id:
+                attendee_id[name] = len(attendee_names)
+                attendee_names.append(name)
+        mapping = np.array([attendee_id[name] for name in uniques.tolist()], dtype=int)
+        talk_ids.append(talk_id)
+        attendee_ids.append(mapping[codes])
+        values.append(chunk["preference"].to_numpy())
+
+    row_talk = np.concatenate(talk_ids or [np.zeros(0, dtype=int)])
+    row_attendee = np.concatenate(attendee_ids or [np.zeros(0, dtype=int)])
+    row_value = np.concatenate(values or [np.zeros(0)])
+    # Group the rows by talk, keeping the file order within a talk
+    order = np.argsort(row_talk, kind="stable")
+    boundaries = np.searchsorted(row_talk[order], np.arange(len(titles) + 1))
+    listeners = [Attendee(name=name) for name in attendee_names]
+
+    talk_list = []
+    for index, (title, speaker, duration) in enumerate(
+        talk_table.itertuples(index=False, name=None)
+    ):
+        rows = order[boundaries[index] : boundaries[index + 1]]
+        talk_list.append(
+            Talk(
+                title=title,
+                speaker=Attendee(name=speaker),
+                duration=int(duration),
+                # Later rows for the same attendee replace earlier ones
+                visitor_preferences=dict(
+                    zip(
+                        [listeners[row] for row in row_attendee[rows].tolist()],
+                        row_value[rows].tolist(),
+                    )
+                ),
+            )
+        )
+
+    is_global = ranges["location"].isna() | (ranges["location"] == "")
+    unknown = ~is_global & ~ranges["location"].isin(names)
+    if unknown.any():
+        raise ValueError(
+            f"Availability for unknown room: {ranges['location'][unknown].iloc[0]}"
+        )
+    by_room = {
+        name: _time_ranges(frame)
+        for name, frame in ranges[~is_global].groupby("location", sort=False)
+    }
+    locations = [
+        Location(
+            name=name,
+            capacity=int(capacity),
+            allowed_times=AllowedTimes(times=by_room.get(name, [])),
+        )
+        for name, capacity in room_table.itertuples(index=False, name=None)
+    ]
+
+    if is_global.any():
+        allowed_times = AllowedTimes(times=_time_ranges(ranges[is_global]))
+    elif len(ranges):
+        allowed_times = AllowedTimes(
+            times=[
+                TimeRange(
+                    start=TimeSlot(int(ranges["start"].min())),
+                    end=TimeSlot(int(ranges["end"].max())),
+                )
+            ]
+        )
+    else:
+        allowed_times = AllowedTimes(times=[])
+
+    return Instance(talks=talk_list, locations=locations, allowed_times=allowed_times)
+
+
+def schedule_table(schedule: list[ScheduledTalk]) -> pd.DataFrame:
+    """
+    A schedule as a long table with one row per talk and attendee: the
+    columns `talk`, `location`, `start` and `attendee`. Talks without
+    attendees get a single row without one.
+    """
+    rows = [
+        (
+            scheduled.talk.title,
+            scheduled.location.name,
+            scheduled.time_slot.index,
+            attendee.name,
+        )
+        for scheduled in schedule
+        for attendee in scheduled.attendees or [None]
+    ]
+    return pd.DataFrame(rows, columns=["talk", "location", "start", "attendee"])
+
+
+def write_schedule(schedule: list[ScheduledTalk], path: str | Path):
+    """
+    Write a schedule as the table of `schedule_table`.
+    """
+    _write_table(schedule_table(schedule), path)
+
+
+def read_schedule(path: Table, instance: Instance) -> list[ScheduledTalk]:
+    """
+    Read a schedule written by `write_schedule`, resolving talks, locations
+    and attendees against `instance`.
+    """
+    [frame] = read_table(path, columns=["talk", "location", "start", "attendee"])
+    talk_of = {talk.title: talk for talk in instance["talks"]}
+    location_of = {location.name: location for location in instance["locations"]}
+
+    schedule = []
+    for (title, name, start), rows in frame.groupby(
+        ["talk", "location", "start"], sort=False
+    ):
+        if title not in talk_of or name not in location_of:
+            raise ValueError(f"Unknown talk or location: {title}, {name}")
+        schedule.append(
+            ScheduledTalk(
+                talk=talk_of[title],
+                time_slot=TimeSlot(int(start)),
+                location=location_of[name],
+                attendees=[
+                    Attendee(name=attendee)
+                    for attendee in rows["attendee"].dropna().tolist()
+                ],
+            )
+        )
+    return schedule
@@ -0,0 +1,472 @@
+from dataclasses import dataclass, replace
+
+from talk_scheduling.helpers import complete_initial_values
+from ._domains import contiguous_runs
+from ._greedy import greedy_schedule
+from ._instance import ProblemInstance, compile_instance
+from ._model import (
+    extract_schedule,
+    gather_attendees,
+    schedule_objective,
+    set_initial_values,
+)
+from ._solvers import cbc_solver, solve_cbc
+from ._time_indexed import build_time_indexed_model
+from ._types import (
+    Location,
+    Talk,
+    ScheduledTalk,
+    Attendee,
+    TimeSlot,
+    AllowedTimes,
+    TimeRange,
+    Solution,
+    SolverOptions,
+)
+
+import pulp
+import random
+import time
+from collections import defaultdict
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Literal
+
+Neighbourhood = Literal["room", "time_window", "attendee_cluster"]
+
+
+@dataclass(kw_only=True, frozen=True)
+class Region:
+    """
+    The talks one LNS step frees and where they may go: into the free slots of
+    `locations` between `start` (inclusive) and `end` (exclusive).
+    """
+
+    talks: frozenset[Talk]
+    locations: frozenset[Location]
+    start: int
+    end: int
+
+    def touches(self, other: "Region") -> bool:
+        """
+        Whether the two regions can not be re-optimised independently. Shared
+        listeners are not considered, those are repaired after merging.
+        """
+        if self.talks & other.talks:
+            return True
+        speakers = {talk.speaker for talk in self.talks}
+        if speakers & {talk.speaker for talk in other.talks}:
+            return True
+        return bool(self.locations & other.locations) and (
+            self.start < other.end and other.start < self.end
+        )
+
+
+def room_region(
+    schedule: list[ScheduledTalk],
+    location: Location,
+    size: int,
+    horizon: int,
+    rng: random.Random,
+) -> Region:
+    """
+    Up to `size` consecutive talks of one room, free to move between the talks
+    held there before and after them.
+    """
+    held_here = sorted(
+        (scheduled for scheduled in schedule if scheduled.location == location),
+        key=lambda scheduled: scheduled.time_slot,
+    )
+    first = rng.randrange(max(len(held_here) - size, 0) + 1)
+    chosen = held_here[first : first + size]
+    before = held_here[first - 1] if first > 0 else None
+    after = held_here[first + size] if first + size < len(held_here) else None
+    return Region(
+        talks=frozenset(scheduled.talk for scheduled in chosen),
+        locations=frozenset([location]),
+        start=before.time_slot.index + before.talk.duration if before else 0,
+        end=after.time_slot.index if after else horizon,
+    )
+
+
+def time_window_region(
+    schedule: list[ScheduledTalk],
+    locations: list[Location],
+    size: int,
+    rng: random.Random,
+) -> Region:
+    """
+    `size` talks that start one after another, free to move between all rooms
+    within the slots they span.
+    """
+    by_start = sorted(schedule, key=lambda scheduled: scheduled.time_slot)
+    first = rng.randrange(max(len(by_start) - size, 0) + 1)
+    chosen = by_start[first : first + size]
+    return Region(
+        talks=frozenset(scheduled.talk for scheduled in chosen),
+        locations=frozenset(locations),
+        start=min(scheduled.time_slot.index for scheduled in chosen),
+        end=max(
+            scheduled.time_slot.index + scheduled.talk.duration for scheduled in chosen
+        ),
+    )
+
+
+def attendee_cluster_region(
+    schedule: list[ScheduledTalk],
+    size: int,
+    horizon: int,
+    rng: random.Random,
+) -> Region:
+    """
+    A random talk and the talks sharing most attendees with it, free to move
+    anywhere within the rooms they are held in.
+    """
+    seed = rng.choice(schedule)
+    others = [scheduled for scheduled in schedule if scheduled is not seed]
+    rng.shuffle(others)
+    seed_attendees = set(seed.attendees)
+    others.sort(
+        key=lambda scheduled: -len(seed_attendees.intersection(scheduled.attendees))
+    )
+    chosen = [seed] + others[: size - 1]
+    return Region(
+        talks=frozenset(scheduled.talk for scheduled in chosen),
+        locations=frozenset(scheduled.location for scheduled in chosen),
+        start=0,
+        end=horizon,
+    )
+
+
+def free_locations(
+    region: Region, fixed: list[ScheduledTalk]
+) -> dict[Location, Location]:
+    """
+    Copies of the region's locations whose allowed times only cover the slots
+    in the region that no fixed talk occupies, mapped to the originals.
+    """
+    occupied: dict[Location, set[int]] = defaultdict(set)
+    for scheduled in fixed:
+        start = scheduled.time_slot.index
+        occupied[scheduled.location].update(
+            range(start, start + scheduled.talk.duration)
+        )
+
+    original_of = {}
+    for location in region.locations:
+        times = []
+        for time_range in location.allowed_times.times:
+            free = [
+                slot
+                for slot in range(
+                    max(time_range.start.index, region.start),
+                    min(time_range.end.index, region.end),
+                )
+                if slot not in occupied[location]
+            ]
+            times += [
+                TimeRange(start=TimeSlot(first), end=TimeSlot(last + 1))
+                for first, last in contiguous_runs(free)
+            ]
+        restricted = replace(location, allowed_times=AllowedTimes(times=times))
+        original_of[restricted] = location
+    return original_of
+
+
+def reoptimise(
+    schedule: list[ScheduledTalk],
+    region: Region,
+    *,
+    attendees: set[Attendee],
+    allowed_times: AllowedTimes,
+    options: SolverOptions,
+    published: dict[Talk, tuple[TimeSlot, Location]] | None = None,
+    max_moved: int | None = None,
+) -> list[ScheduledTalk] | None:
+    """
+    Re-optimise the talks of `region` as a sub-MIP with the rest of `schedule`
+    fixed. The current placement is the warm start, so the result is never
+    worse. Returns the new placements of the freed talks, or None if the
+    sub-MIP found no solution.
+
+    Talks of the region that are not in `schedule` yet are placed as well. If
+    they exist, or a current placement no longer fits, there is no warm start.
+    With `max_moved`, at most that many freed talks may leave the slot and
+    location `published` for them; talks whose published placement is no
+    longer possible are free to move.
+    """
+    freed = [scheduled for scheduled in schedule if scheduled.talk in region.talks]
+    fixed = [scheduled for scheduled in schedule if scheduled.talk not in region.talks]
+    placed = {scheduled.talk for scheduled in freed}
+    unplaced = sorted(region.talks - placed, key=lambda talk: talk.title)
+    original_of = free_locations(region, fixed)
+    restricted_of = {
+        location: restricted for restricted, location in original_of.items()
+    }
+
+    instance = compile_instance(
+        talks=[scheduled.talk for scheduled in freed] + unplaced,
+        locations=list(original_of),
+        allowed_times=allowed_times,
+        attendees=attendees,
+    )
+    model = build_time_indexed_model(instance=instance)
+
+    # Attendees can not join a freed talk while they are in a fixed one
+    busy: dict[Attendee, set[int]] = defaultdict(set)
+    for scheduled in fixed:
+        start = scheduled.time_slot.index
+        for attendee in scheduled.attendees:
+            busy[attendee].update(range(start, start + scheduled.talk.duration))
+    duration = instance.duration.tolist()
+    starts_of: dict[int, list[tuple[int, pulp.LpVariable]]] = defaultdict(list)
+    for (talk, _, slot), variable in model.start.items():
+        starts_of[talk].append((slot, variable))
+    for talk, starts in starts_of.items():
+        for attendee, slots in busy.items():
+            clashing = [
+                variable
+                for slot, variable in starts
+                if not slots.isdisjoint(range(slot, slot + duration[talk]))
+            ]
+            if clashing:
+                assigned = model.x[talk, instance.attendee_index[attendee]]
+                model.problem += assigned + pulp.lpSum(clashing) <= 1
+
+    if max_moved is not None:
+        stays = [
+            model.start[key]
+            for talk, (slot, location) in (published or {}).items()
+            if talk in instance.talk_index and location in restricted_of
+            for key in [
+                (
+                    instance.talk_index[talk],
+                    instance.location_index[restricted_of[location]],
+                    slot.index,
+                )
+            ]
+            if key in model.start
+        ]
+        model.problem += pulp.lpSum(1 - stay for stay in stays) <= max_moved
+
+    fixed_end = max(
+        (scheduled.time_slot.index + scheduled.talk.duration for scheduled in fixed),
+        default=0,
+    )
+
+    # The fixed talks may end later than any freed one can
+    model.latest_end.upBound = max(model.latest_end.upBound, fixed_end)
+    warm_start = not unplaced and all(
+        still_fits(instance, scheduled, restricted_of) for scheduled in freed
+    )
+    if warm_start:
+        set_initial_values(
+            model,
+            [
+                replace(scheduled, location=restricted_of[scheduled.location])
+                for scheduled in freed
+            ],
+        )
+        model.latest_end.setInitialValue(max(model.latest_end.varValue, fixed_end))
+    model.latest_end.lowBound = fixed_end
+    if warm_start:
+        complete_initial_values(model.problem, cbc_solver(options))
+    solve_cbc(model.problem, options, warm_start=warm_start)
+    if model.problem.status != pulp.LpStatusOptimal:
+        return None
+
+    return [
+        replace(scheduled, location=original_of[scheduled.location])
+        for scheduled in extract_schedule(model)
+    ]
+
+
+def still_fits(
+    instance: ProblemInstance,
+    scheduled: ScheduledTalk,
+    restricted_of: dict[Location, Location],
+) -> bool:
+    """
+    Whether a placement is still possible in the restricted locations of a
+    sub-MIP, with all of its attendees seated.
+    """
+    if scheduled.location not in restricted_of:
+        return False
+    location = instance.location_index[restricted_of[scheduled.location]]
+    slot = scheduled.time_slot.index
+    return (
+        slot < instance.horizon
+        and instance.allowed_starts[instance.talk_index[scheduled.talk], location, slot]
+        and len(scheduled.attendees) <= instance.capacity[location]
+    )
+
+
+def _reoptimise_arguments(arguments: dict) -> list[ScheduledTalk] | None:
+    return reoptimise(**arguments)
+
+
+def merge_schedules(
+    schedule: list[ScheduledTalk], replacement: list[ScheduledTalk]
+) -> list[ScheduledTalk]:
+    """
+    Replace the placements of some talks, talks that are not part of
+    `schedule` yet are added. Listeners that end up in two overlapping talks
+    stay in the one they prefer, speakers always stay in their own talk.
+    """
+    replaced = {scheduled.talk: scheduled for scheduled in replacement}
+    present = {scheduled.talk for scheduled in schedule}
+    merged = [replaced.get(scheduled.talk, scheduled) for scheduled in schedule] + [
+        scheduled for scheduled in replacement if scheduled.talk not in present
+    ]
+
+    attending: dict[Attendee, list[ScheduledTalk]] = defaultdict(list)
+    for scheduled in merged:
+        for attendee in scheduled.attendees:
+            attending[attendee].append(scheduled)
+
+    dropped: dict[Talk, set[Attendee]] = defaultdict(set)
+    for attendee, talks in attending.items():
+        talks.sort(
+            key=lambda scheduled: (
+                scheduled.talk.speaker != attendee,
+                -scheduled.talk.visitor_preferences.get(attendee, 0.1),
+            )
+        )
+        taken: set[int] = set()
+        for scheduled in talks:
+            start = scheduled.time_slot.index
+            slots = range(start, start + scheduled.talk.duration)
+            if taken.isdisjoint(slots):
+                taken.update(slots)
+            else:
+                dropped[scheduled.talk].add(attendee)
+
+    return [
+        (
+            replace(
+                scheduled,
+                attendees=[
+                    attendee
+                    for attendee in scheduled.attendees
+                    if attendee not in dropped[scheduled.talk]
+                ],
+            )
+            if scheduled.talk in dropped
+            else scheduled
+        )
+        for scheduled in merged
+    ]
+
+
+def solve_lns(
+    *,
+    talks: list[Talk],
+    locations: list[Location],
+    allowed_times: AllowedTimes,
+    initial_schedule: list[ScheduledTalk] | None = None,
+    neighbourhoods: Sequence[Neighbourhood] = (
+        "room",
+        "time_window",
+        "attendee_cluster",
+    ),
+    neighbourhood_size: int = 8,
+    time_limit: float = 60,
+    options: SolverOptions = SolverOptions(time_limit=5),
+    workers: int = 1,
+    seed: int = 0,
+) -> Solution:
+    """
+    Improve a schedule by Large Neighbourhood Search.
+
+    Starting from `initial_schedule`, or the greedy schedule, every step frees
+    a neighbourhood of about `neighbourhood_size` talks: consecutive talks of a
+    room, talks in a time window, or a cluster of talks sharing attendees. The
+    freed talks are re-optimised as a sub-MIP with `options`, a step is kept
+    only if it improves the objective. With several `workers`, neighbourhoods
+    that do not touch each other are re-optimised in parallel processes.
+
+    The solution's history holds the objective over time, no bound is known.
+    """
+    started = time.perf_counter()
+    schedule = initial_schedule or greedy_schedule(
+        compile_instance(talks=talks, locations=locations, allowed_times=allowed_times)
+    )
+    if schedule is None:
+        raise ValueError("No feasible initial schedule found, pass one instead")
+
+    objective = schedule_objective(schedule)
+    history = [(time.perf_counter() - started, objective)]
+    rng = random.Random(seed)
+    attendees = gather_attendees(talks)
+    horizon = max(
+        time_range.end.index
+        for location in locations
+        for time_range in location.allowed_times.times
+    )
+
+    def random_region() -> Region:
+        match rng.choice(neighbourhoods):
+            case "room":
+                location = rng.choice(locations)
+                return room_region(schedule, location, neighbourhood_size, horizon, rng)
+            case "time_window":
+                return time_window_region(schedule, locations, neighbourhood_size, rng)
+            case "attendee_cluster":
+                return attendee_cluster_region(
+                    schedule, neighbourhood_size, horizon, rng
+                )
+            case neighbourhood:
+                raise ValueError(f"Unknown neighbourhood: {neighbourhood}")
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    step = 0
+    try:
+        while (remaining := time_limit - (time.perf_counter() - started)) > 0:
+            regions: list[Region] = []
+            for _ in range(4 * workers):
+                region = random_region()
+                if region.talks and not any(region.touches(other) for other in regions):
+                    regions.append(region)
+                if len(regions) == workers:
+                    break
+
+            sub_options = replace(
+                options, time_limit=max(min(options.time_limit, remaining), 1)
+            )
+            arguments = [
+                dict(
+                    schedule=schedule,
+                    region=region,
+                    attendees=attendees,
+                    allowed_times=allowed_times,
+                    options=sub_options,
+                )
+                for region in regions
+            ]
+            if executor is None:
+                results = map(_reoptimise_arguments, arguments)
+            else:
+                results = executor.map(_reoptimise_arguments, arguments)
+
+            for result in results:
+                step += 1
+                if result is None:
+                    continue
+                candidate = merge_schedules(schedule, result)
+                candidate_objective = schedule_objective(candidate)
+                if candidate_objective > objective + 1e-9:
+                    schedule, objective = candidate, candidate_objective
+                    history.append((time.perf_counter() - started, objective))
+                    print(f"LNS step {step}: objective {objective}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return Solution(
+        schedule=schedule,
+        status="LNS",
+        objective=objective,
+        bound=None,
+        wall_time=time.perf_counter() - started,
+        history=history,
+    )
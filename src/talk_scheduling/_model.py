@@ -0,0 +1,274 @@
+from dataclasses import dataclass, field
+
+from ._aggregation import AttendeeClass, assign_class_members
+from ._instance import ProblemInstance
+from ._types import (
+    Talk,
+    ScheduledTalk,
+    Attendee,
+    TimeSlot,
+)
+
+import pulp
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Literal
+
+ConflictEncoding = Literal["pairwise", "per_slot"]
+
+
+def gather_attendees(talks: list[Talk]) -> set[Attendee]:
+    attendees = set()
+    for talk in talks:
+        attendees.update(talk.visitor_preferences.keys())
+        attendees.add(talk.speaker)
+    return attendees
+
+
+@dataclass(kw_only=True)
+class Model:
+    """
+    A built scheduling model, independent of the formulation that produced it.
+
+    Variables are keyed by the integer ids of `instance`, `attendees` lists
+    the ids of the attendees that are modelled individually. `start_of` and
+    `is_scheduled` are linear expressions over the formulation's own
+    variables, so extraction and reporting work the same way for every
+    formulation. The start variables of the formulation are kept in `y`
+    (big-M, the start slot per talk and location) or `start` (time-indexed,
+    one binary per talk, location and start slot). Lazily built models leave
+    constraints out; `separate` adds the ones the current solution violates
+    and returns how many it added. Models with sparse preferences only have
+    `x` for explicit preferences and speakers and count everyone else in
+    `filler`.
+    """
+
+    problem: pulp.LpProblem
+    instance: ProblemInstance
+    attendees: list[int]
+    start_of: dict[int, pulp.LpAffineExpression]
+    is_scheduled: dict[tuple[int, int], pulp.LpAffineExpression]
+    x: dict[tuple[int, int], pulp.LpVariable]
+    preference_sum: pulp.LpAffineExpression
+    latest_end: pulp.LpVariable
+    conflicts: dict[tuple[int, int], pulp.LpVariable] = field(default_factory=dict)
+    start_comes_before: dict[tuple[int, int], pulp.LpVariable] = field(
+        default_factory=dict
+    )
+    y: dict[tuple[int, int], pulp.LpVariable] = field(default_factory=dict)
+    start: dict[tuple[int, int, int], pulp.LpVariable] = field(default_factory=dict)
+    separate: Callable[[], int] | None = None
+    attendee_classes: list[AttendeeClass] = field(default_factory=list)
+    class_count: dict[tuple[int, AttendeeClass], pulp.LpVariable] = field(
+        default_factory=dict
+    )
+    filler: dict[int, pulp.LpVariable] = field(default_factory=dict)
+
+
+def print_solution(model: Model):
+    talks, locations = model.instance.talks, model.instance.locations
+    status = pulp.LpStatus[model.problem.status]
+    objective = pulp.value(model.problem.objective)
+
+    print(f"Status: {status}")
+    print(f"Objective: {objective}")
+    print("Latest end", pulp.value(model.latest_end))
+    print("Preference sum", pulp.value(model.preference_sum))
+
+    for (talk, location), scheduled in model.is_scheduled.items():
+        print(
+            talks[talk].title,
+            locations[location].name,
+            pulp.value(scheduled),
+            pulp.value(model.start_of[talk]) if pulp.value(scheduled) else 0.0,
+        )
+
+    for (talk_i, talk_j), comes_before in model.start_comes_before.items():
+        print(
+            f"{talks[talk_i].title} comes before {talks[talk_j].title}:",
+            pulp.value(comes_before),
+        )
+    for (talk_i, talk_j), conflict in model.conflicts.items():
+        print(
+            f"{talks[talk_i].title} conflicts with {talks[talk_j].title}:",
+            pulp.value(conflict),
+        )
+
+    for (talk, attendee), assigned in model.x.items():
+        print(
+            f"{model.instance.attendees[attendee].name} assigned to "
+            f"{talks[talk].title}:",
+            pulp.value(assigned),
+        )
+    for talk, count in model.filler.items():
+        print(f"Fillers assigned to {talks[talk].title}:", pulp.value(count))
+
+
+def extract_schedule(model: Model) -> list[ScheduledTalk]:
+    instance = model.instance
+    # Without a solution the start expressions have no value
+    start_slot = {
+        talk: round(value)
+        for talk, start_of in model.start_of.items()
+        if (value := pulp.value(start_of)) is not None
+    }
+
+    attending: dict[int, list[Attendee]] = defaultdict(list)
+    for (talk, attendee), assigned in model.x.items():
+        if round(pulp.value(assigned) or 0) == 1:
+            attending[talk].append(instance.attendees[attendee])
+    for attendee_class in model.attendee_classes:
+        attendance = [
+            (
+                instance.talks[talk],
+                start_slot[talk],
+                round(pulp.value(model.class_count[talk, attendee_class]) or 0),
+            )
+            for talk in range(len(instance.talks))
+        ]
+        for talk, members in assign_class_members(attendee_class, attendance).items():
+            attending[instance.talk_index[talk]].extend(members)
+
+    schedule: list[ScheduledTalk] = []
+    for (talk, location), scheduled in model.is_scheduled.items():
+        if round(pulp.value(scheduled) or 0) == 0:
+            continue
+        schedule.append(
+            ScheduledTalk(
+                talk=instance.talks[talk],
+                time_slot=TimeSlot(start_slot[talk]),
+                location=instance.locations[location],
+                attendees=attending[talk],
+            )
+        )
+
+    if model.filler:
+        seat_fillers(
+            schedule,
+            attendees=instance.attendees,
+            counts={
+                instance.talks[talk]: round(pulp.value(count) or 0)
+                for talk, count in model.filler.items()
+            },
+        )
+    return schedule
+
+
+def seat_fillers(
+    schedule: list[ScheduledTalk],
+    *,
+    attendees: list[Attendee],
+    counts: dict[Talk, int],
+):
+    """
+    Seat `counts[talk]` further attendees into every scheduled talk, in place.
+
+    Talks are filled in order of their start, each from the attendees that are
+    free for its whole duration, preferring those without an explicit
+    preference for it and with the fewest talks so far. The fillers of a model
+    are only bounded per slot, so a talk may end up with fewer of them.
+    """
+    busy: dict[Attendee, list[tuple[int, int]]] = {
+        attendee: [] for attendee in attendees
+    }
+    for scheduled in schedule:
+        start = scheduled.time_slot.index
+        for attendee in scheduled.attendees:
+            busy[attendee].append((start, start + scheduled.talk.duration))
+
+    for scheduled in sorted(schedule, key=lambda scheduled: scheduled.time_slot.index):
+        talk = scheduled.talk
+        start = scheduled.time_slot.index
+        end = start + talk.duration
+        free = sorted(
+            (
+                attendee
+                for attendee, intervals in busy.items()
+                if all(
+                    other_end <= start or end <= other_start
+                    for other_start, other_end in intervals
+                )
+            ),
+            key=lambda attendee: (
+                attendee in talk.visitor_preferences,
+                len(busy[attendee]),
+                attendee.name,
+            ),
+        )
+        for attendee in free[: counts.get(talk, 0)]:
+            scheduled.attendees.append(attendee)
+            busy[attendee].append((start, end))
+
+
+def set_initial_values(model: Model, schedule: list[ScheduledTalk]):
+    """
+    Load a feasible schedule into the variables of `model` as a warm start.
+
+    Auxiliary variables that are not part of `Model` are left unset, the
+    solver completes them from the fixed ones.
+    """
+    instance = model.instance
+    duration = instance.duration.tolist()
+    placed = {instance.talk_index[scheduled.talk]: scheduled for scheduled in schedule}
+    start_slot = {talk: scheduled.time_slot.index for talk, scheduled in placed.items()}
+    room_of = {
+        talk: instance.location_index[scheduled.location]
+        for talk, scheduled in placed.items()
+    }
+    attending = {
+        talk: {instance.attendee_index[attendee] for attendee in scheduled.attendees}
+        for talk, scheduled in placed.items()
+    }
+
+    for (talk, location), variable in model.y.items():
+        held_here = room_of[talk] == location
+        variable.setInitialValue(start_slot[talk] if held_here else 0)
+    for (talk, location, slot), variable in model.start.items():
+        held_here = room_of[talk] == location and start_slot[talk] == slot
+        variable.setInitialValue(int(held_here))
+    for (talk, location), scheduled in model.is_scheduled.items():
+        if isinstance(scheduled, pulp.LpVariable):
+            scheduled.setInitialValue(int(room_of[talk] == location))
+    for talk, start_of in model.start_of.items():
+        if isinstance(start_of, pulp.LpVariable):
+            start_of.setInitialValue(start_slot[talk])
+
+    for (talk, attendee), variable in model.x.items():
+        variable.setInitialValue(int(attendee in attending[talk]))
+    for talk, count in model.filler.items():
+        count.setInitialValue(
+            sum((talk, attendee) not in model.x for attendee in attending[talk])
+        )
+    for (talk, attendee_class), count in model.class_count.items():
+        members = set(attendee_class.members)
+        count.setInitialValue(
+            sum(attendee in members for attendee in placed[talk].attendees)
+        )
+
+    for (talk_i, talk_j), comes_before in model.start_comes_before.items():
+        comes_before.setInitialValue(int(start_slot[talk_i] <= start_slot[talk_j]))
+    for (talk_i, talk_j), conflict in model.conflicts.items():
+        overlap = min(
+            start_slot[talk_i] + duration[talk_i], start_slot[talk_j] + duration[talk_j]
+        ) - max(start_slot[talk_i], start_slot[talk_j])
+        conflict.setInitialValue(int(overlap > 0))
+
+    model.latest_end.setInitialValue(
+        max(start_slot[talk] + duration[talk] for talk in start_slot)
+    )
+
+
+def schedule_objective(schedule: list[ScheduledTalk]) -> float:
+    """
+    The objective of `solve_assignment`, evaluated on a finished schedule.
+    """
+    preference_sum = sum(
+        scheduled.talk.visitor_preferences.get(attendee, 0.1)
+        for scheduled in schedule
+        for attendee in scheduled.attendees
+    )
+    latest_end = max(
+        (scheduled.time_slot.index + scheduled.talk.duration for scheduled in schedule),
+        default=0,
+    )
+    return preference_sum - 0.001 * latest_end
@@ -0,0 +1,203 @@
+from ._problem import solve_assignment
+from ._types import (
+    Location,
+    Talk,
+    AllowedTimes,
+    Solution,
+    SolverOptions,
+)
+
+import contextlib
+import io
+import multiprocessing
+import os
+import signal
+import time
+from dataclasses import replace
+from multiprocessing.connection import Connection, wait
+from typing import Any
+
+# Each entry holds keyword arguments for `solve_assignment`
+DEFAULT_PORTFOLIO: list[dict[str, Any]] = [
+    dict(formulation="time_indexed", conflict_encoding="per_slot"),
+    dict(
+        formulation="time_indexed",
+        conflict_encoding="per_slot",
+        options=SolverOptions(backend="highs"),
+    ),
+    dict(formulation="time_indexed", conflict_encoding="pairwise", warm_start=True),
+    dict(formulation="big_m", warm_start=True, options=SolverOptions(seed=1)),
+    dict(strategy="two_phase"),
+]
+
+
+# How long solves may take past the deadline to hand back their results
+REPORT_GRACE = 1.0
+
+
+def _start_process_group():
+    # CBC runs as a child of the solving process, a process group lets us stop
+    # both
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+
+
+def _solve_quietly(arguments: dict[str, Any]) -> Solution:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return solve_assignment(**arguments)
+
+
+def _run_solve(
+    connection: Connection, arguments: dict[str, Any], *, quiet: bool, stream: bool
+):
+    """
+    The body of a `_SolveProcess`: send ("done", solution) or ("failed",
+    error), and with `stream` every ("incumbent", solution) before.
+    """
+    _start_process_group()
+    if stream:
+        arguments = dict(
+            arguments,
+            on_incumbent=lambda solution: connection.send(("incumbent", solution)),
+        )
+    try:
+        outcome = (
+            "done",
+            _solve_quietly(arguments) if quiet else solve_assignment(**arguments),
+        )
+    except Exception as error:
+        outcome = ("failed", error)
+    connection.send(outcome)
+    connection.close()
+
+
+class _SolveProcess:
+    """
+    `solve_assignment` with the keyword `arguments` in a process of its own
+    group, so that `stop` ends it together with the solver it runs. Its
+    outcomes are read with `receive`, see `_run_solve`.
+    """
+
+    def __init__(
+        self, arguments: dict[str, Any], *, quiet: bool = True, stream: bool = False
+    ):
+        self.connection, sender = multiprocessing.Pipe(duplex=False)
+        self.process = multiprocessing.Process(
+            target=_run_solve,
+            args=(sender, arguments),
+            kwargs=dict(quiet=quiet, stream=stream),
+        )
+        self.process.start()
+        # Only the child writes, so that its exit ends the pipe
+        sender.close()
+
+    def receive(self) -> tuple[str, Any]:
+        try:
+            return self.connection.recv()
+        except EOFError:
+            return "failed", RuntimeError("The solving process died")
+
+    def stop(self):
+        if self.process.is_alive():
+            if hasattr(os, "killpg"):
+                with contextlib.suppress(ProcessLookupError):
+                    os.killpg(self.process.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+def solve_assignment_portfolio(
+    *,
+    talks: list[Talk],
+    locations: list[Location],
+    allowed_times: AllowedTimes,
+    portfolio: list[dict[str, Any]] = DEFAULT_PORTFOLIO,
+    time_limit: float = 15,
+    max_workers: int | None = None,
+) -> Solution:
+    """
+    Race differently configured solves in separate processes.
+
+    Every entry of `portfolio` holds keyword arguments for `solve_assignment`.
+    All of them share `time_limit`: an entry gets the time left when it
+    starts as its time limit, and entries still running `REPORT_GRACE`
+    seconds after the deadline are stopped. The best schedule found is
+    returned together with the tightest bound of all solves. As soon as one
+    solve proves its schedule optimal, the others are stopped.
+    """
+    started = time.perf_counter()
+    deadline = started + time_limit
+    problem = dict(talks=talks, locations=locations, allowed_times=allowed_times)
+    waiting = [
+        (index, {**arguments, **problem}) for index, arguments in enumerate(portfolio)
+    ]
+    max_workers = max_workers or len(portfolio)
+
+    best: Solution | None = None
+    bound: float | None = None
+    running: dict[Connection, tuple[int, _SolveProcess]] = {}
+    try:
+        while waiting or running:
+            while waiting and len(running) < max_workers:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    print(f"Portfolio out of time, skipping {len(waiting)} entries")
+                    waiting.clear()
+                    break
+                index, arguments = waiting.pop(0)
+                options = replace(
+                    arguments.get("options", SolverOptions()), time_limit=remaining
+                )
+                solve = _SolveProcess(dict(arguments, options=options))
+                running[solve.connection] = index, solve
+            if not running:
+                break
+            ready = wait(
+                list(running),
+                timeout=max(deadline + REPORT_GRACE - time.perf_counter(), 0),
+            )
+            if not ready:
+                print("Portfolio out of time, stopping the remaining solves")
+                break
+            for connection in ready:
+                index, solve = running.pop(connection)
+                outcome, solution = solve.receive()
+                solve.stop()
+                if outcome == "failed":
+                    print(f"Portfolio entry {index} failed: {solution!r}")
+                    continue
+                print(
+                    f"Portfolio entry {index}: {solution.status}, "
+                    f"objective {solution.objective}, bound {solution.bound}, "
+                    f"{solution.wall_time:.2f}s"
+                )
+                if solution.bound is not None:
+                    bound = (
+                        solution.bound if bound is None else min(bound, solution.bound)
+                    )
+                if solution.objective is not None and (
+                    best is None or solution.objective > best.objective
+                ):
+                    best = solution
+            if (
+                best is not None
+                and bound is not None
+                and bound - best.objective <= 1e-6
+            ):
+                print("Portfolio proved optimality, stopping the remaining solves")
+                break
+    finally:
+        for _, solve in running.values():
+            solve.stop()
+
+    if best is None:
+        return Solution(
+            schedule=[],
+            status="Not Solved",
+            objective=None,
+            bound=bound,
+            wall_time=time.perf_counter() - started,
+        )
+    return replace(best, bound=bound, wall_time=time.perf_counter() - started)
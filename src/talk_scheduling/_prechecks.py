@@ -0,0 +1,133 @@
+from ._instance import ProblemInstance
+
+import numpy as np
+from collections import defaultdict
+
+
+def covered_slots(allowed_starts: np.ndarray, durations: np.ndarray) -> np.ndarray:
+    """
+    A (talks x locations x horizon) mask of the slots each talk may occupy in
+    each location, over all of its `allowed_starts` there.
+    """
+    horizon = allowed_starts.shape[2]
+    covered = np.zeros_like(allowed_starts)
+    for duration in np.unique(durations).tolist():
+        talks = durations == duration
+        for offset in range(duration):
+            covered[talks, :, offset:] |= allowed_starts[talks, :, : horizon - offset]
+    return covered
+
+
+def find_infeasibility(instance: ProblemInstance) -> str | None:
+    """
+    The reason why `instance` has no schedule, if a cheap counting argument
+    shows so, otherwise None.
+
+    It checks that every talk has a start slot in a room with a seat for its
+    speaker, that the talks fit into the open room slots in total, that the
+    talks which must run at a slot whatever their start have enough rooms,
+    and the same for the talks of every speaker.
+    """
+    titles = [talk.title for talk in instance.talks]
+    allowed_starts = instance.allowed_starts & (instance.capacity >= 1)[:, None]
+    for talk in np.flatnonzero(~allowed_starts.any(axis=(1, 2))).tolist():
+        return f"Talk {titles[talk]!r} fits into no room and allowed time range"
+
+    covered = covered_slots(allowed_starts, instance.duration)
+    room_slots = int(covered.any(axis=0).sum())
+    total = int(instance.duration.sum())
+    if total > room_slots:
+        return (
+            f"The talks last {total} slots together, "
+            f"but rooms are only open for {room_slots}"
+        )
+
+    # A talk starting no earlier than `earliest` and no later than `latest`
+    # runs at every slot from `latest` up to its earliest end
+    can_start = allowed_starts.any(axis=1)
+    earliest = can_start.argmax(axis=1)
+    latest = instance.horizon - 1 - can_start[:, ::-1].argmax(axis=1)
+    mandatory = np.zeros((len(instance.talks), instance.horizon), dtype=bool)
+    for talk, (first, last) in enumerate(
+        zip(latest.tolist(), (earliest + instance.duration).tolist())
+    ):
+        mandatory[talk, first:last] = True
+    rooms_open = covered.any(axis=0).sum(axis=0)
+    for slot in np.flatnonzero(mandatory.sum(axis=0) > rooms_open).tolist():
+        running = [titles[talk] for talk in np.flatnonzero(mandatory[:, slot])]
+        return (
+            f"Talks {', '.join(running)} must all run at slot {slot}, "
+            f"but only {rooms_open[slot]} rooms are open then"
+        )
+
+    talks_of = defaultdict(list)
+    for talk, speaker in enumerate(instance.speaker.tolist()):
+        talks_of[speaker].append(talk)
+    for speaker, talks in talks_of.items():
+        if len(talks) < 2:
+            continue
+        name = instance.attendees[speaker].name
+        slots = int(covered[talks].any(axis=(0, 1)).sum())
+        total = int(instance.duration[talks].sum())
+        if total > slots:
+            return (
+                f"Speaker {name!r} gives talks lasting {total} slots, "
+                f"but they can only take place within {slots} slots"
+            )
+        clashes = np.flatnonzero(mandatory[talks].sum(axis=0) > 1)
+        if len(clashes):
+            running = [titles[talk] for talk in talks if mandatory[talk, clashes[0]]]
+            return (
+                f"Speaker {name!r} must give talks {', '.join(running)} "
+                f"at slot {clashes[0]}"
+            )
+    return None
+
+
+def fractional_knapsack(values: np.ndarray, sizes: np.ndarray, room: float) -> float:
+    """
+    The most value that fits into `room`, where the last item may be taken in
+    part. Values and sizes are given per row of the arrays, one knapsack each.
+    """
+    values, sizes = np.atleast_2d(values), np.atleast_2d(sizes)
+    order = np.argsort(-values / sizes, axis=1, kind="stable")
+    values = np.take_along_axis(values, order, axis=1)
+    sizes = np.take_along_axis(sizes, order, axis=1)
+    before = np.cumsum(sizes, axis=1) - sizes
+    return float((values * np.clip(room - before, 0, sizes) / sizes).sum())
+
+
+def preference_upper_bound(instance: ProblemInstance) -> float:
+    """
+    An upper bound on the preference sum of any schedule, the smallest of
+    three relaxations, each ignoring all but one kind of constraint:
+
+    - every talk collects the best preferences that fit into the largest room,
+    - every attendee collects their best preferences per slot, within the
+      slots at which any talk can run,
+    - the best preferences per slot of every talk fill the seats of all rooms
+      over the slots they are open.
+
+    Negative preferences count as 0, as nobody has to attend a talk they
+    dislike; only speakers must, and leaving them out only loosens the bound.
+    """
+    weights = np.maximum(instance.weights, 0)
+    if not weights.size:
+        return 0.0
+    duration = instance.duration
+    largest_room = min(int(instance.capacity.max(initial=0)), len(instance.attendees))
+    ranked = -np.sort(-weights, axis=0)[:largest_room]
+    per_talk = float(ranked.sum())
+
+    covered = covered_slots(instance.allowed_starts, duration)
+    slots = int(covered.any(axis=(0, 1)).sum())
+    per_attendee = fractional_knapsack(
+        weights, np.broadcast_to(duration, weights.shape), slots
+    )
+
+    seats = np.minimum(instance.capacity, len(instance.attendees))
+    seat_slots = int((covered.any(axis=0).sum(axis=1) * seats).sum())
+    per_seat = fractional_knapsack(
+        ranked.ravel(), np.broadcast_to(duration, ranked.shape).ravel(), seat_slots
+    )
+    return min(per_talk, per_attendee, per_seat)
@@ -1,67 +1,610 @@
-from talk_scheduling.helpers import pulp_max, pulp_min, pulp_or, pulp_select
+from talk_scheduling.helpers import (
+    complete_initial_values,
+    propagate_bounds,
+    pulp_max,
+    pulp_min,
+    pulp_select,
+)
+from ._annealing import solve_annealing
+from ._coarsening import coarsen_problem, refine_schedule, restrict_to_window
+from ._domains import contiguous_runs
+from ._instance import ProblemInstance, compile_instance
+from ._model import (
+    ConflictEncoding,
+    Model,
+    extract_schedule,
+    print_solution,
+    schedule_objective,
+    set_initial_values,
+)
+from ._greedy import greedy_schedule
+from ._room_matching import (
+    assign_rooms,
+    match_rooms,
+    pool_rooms,
+    repair_rooms,
+    to_pools,
+)
+from ._prechecks import find_infeasibility, preference_upper_bound
+from ._solvers import cbc_solver, solve_cbc, within_gap
+from ._sparse import solve_sparse
+from ._symmetry import add_symmetry_breaking, canonical_schedule
+from ._time_indexed import build_time_indexed_model
+from ._two_phase import joint_upper_bound, solve_two_phase
 from ._types import (
     Location,
     Talk,
     ScheduledTalk,
-    Attendee,
-    TimeSlot,
     AllowedTimes,
-    TimeRange,
+    Solution,
+    SolverOptions,
 )
 
 import pulp
+import time
+from collections.abc import Callable
+from dataclasses import replace
 from itertools import combinations
+from typing import Any, Literal
 
 
-def gather_attendees(talks: list[Talk]) -> set[Attendee]:
-    attendees = set()
-    for talk in talks:
-        attendees.update(talk.visitor_preferences.keys())
-        attendees.add(talk.speaker)
-    return attendees
-
-
-def gather_all_possible_start_slots(
-    locations: list[Location], allowed_times: AllowedTimes
-) -> list[TimeSlot]:
-    return sorted(
-        {
-            ts
-            for location in locations
-            for ts in location.allowed_times.start_slots()
-            if allowed_times.includes(ts)
-        }
-    )
+Formulation = Literal["big_m", "time_indexed"]
+Strategy = Literal["joint", "two_phase", "annealing"]
 
 
 def solve_assignment(
-    *, talks: list[Talk], locations: list[Location], allowed_times: AllowedTimes
-) -> list[ScheduledTalk]:
-    attendees = gather_attendees(talks)
-    start_slots = gather_all_possible_start_slots(locations, allowed_times)
+    *,
+    talks: list[Talk],
+    locations: list[Location],
+    allowed_times: AllowedTimes,
+    formulation: Formulation = "big_m",
+    conflict_encoding: ConflictEncoding = "pairwise",
+    aggregate_attendees: bool = False,
+    sparse_preferences: bool = False,
+    strategy: Strategy = "joint",
+    tighten_bounds: bool = False,
+    break_symmetries: bool = False,
+    warm_start: bool = False,
+    initial_schedule: list[ScheduledTalk] | None = None,
+    lazy_constraints: bool = False,
+    room_matching: bool = False,
+    time_coarsening: int = 1,
+    refine_window: int | None = None,
+    on_incumbent: Callable[[Solution], bool | None] | None = None,
+    options: SolverOptions = SolverOptions(),
+) -> Solution:
+    """
+    Place every talk into a location and start slot and assign attendees.
+
+    `strategy="joint"` decides everything in one MIP built with the given
+    `formulation`. `strategy="two_phase"` first solves a time-indexed
+    timetable against a surrogate objective and then assigns attendees with
+    a dynamic program; it ignores the model options of the joint strategy.
+    `strategy="annealing"` runs no solver at all: it improves the greedy
+    schedule, or `initial_schedule`, by simulated annealing on the timetable
+    within the time limit of `options` and seats attendees as the two-phase
+    strategy does, for a good schedule in well under a second.
+    `tighten_bounds` runs bound propagation over the built model before it
+    is solved. `break_symmetries` detects interchangeable rooms and talks and
+    only keeps one of the equivalent schedules they allow.
+
+    `warm_start` builds a greedy schedule first and hands it to CBC as the
+    initial incumbent. If CBC finds no solution within its time limit, the
+    greedy schedule is returned instead. `initial_schedule` replaces the
+    greedy schedule by a given feasible one, such as the solution of a
+    similar problem, and implies `warm_start`.
+
+    `lazy_constraints` starts the big-M model without its pairwise room-overlap
+    and attendee-conflict constraints and only adds those the incumbent
+    violates, re-solving until there are none. The time limit covers all
+    rounds together.
+
+    `room_matching` lets the time-indexed model only decide how large a room
+    every talk gets, bounding the talks at every slot by the rooms that are
+    large enough and open. Concrete rooms are matched greedily afterwards. If
+    that fails, a MIP over the rooms alone assigns them, and if no assignment
+    exists the talks without a room are re-optimised together with the talks
+    they overlap.
+
+    `sparse_preferences` only creates attendance variables of the time-indexed
+    model for explicit preferences and speakers. All other attendance is
+    counted per talk at the default preference and seated afterwards, so the
+    objective is that of the extracted schedule.
+
+    `time_coarsening` first solves the problem with every `time_coarsening`
+    slots merged into one, with durations rounded up and ranges shrunk to
+    the coarse slots they contain. The coarse schedule is then refined at
+    full resolution: every talk stays in its room and starts at most
+    `refine_window` slots, by default `time_coarsening`, away from its coarse
+    start, with the coarse schedule as the warm start. The coarse solve gets
+    half of the time limit and the fine one the rest, symmetries are only
+    broken in the coarse one, and the bound is the combinatorial bound of
+    the whole problem. An `initial_schedule` takes the place of the coarse
+    schedule, so only the refinement around it is solved.
+
+    `on_incumbent` makes the joint strategy solve in stages of growing effort
+    and calls it after every stage with the best solution so far, its bound
+    and the time elapsed: first the greedy schedule or `initial_schedule`, then
+    that schedule annealed for up to a second, then the results of rounds of
+    CBC warm-started from the best schedule so far, the first one second long
+    and every next one twice as long. All of them together get the time limit.
+    If it returns True the search stops after the current stage and the best
+    schedule so far is returned. Other strategies only report their result.
+
+    `options` set the solver's time limit, gaps, threads and seed, and pick
+    the backend: `"highs"` compiles the time-indexed formulation straight
+    into sparse matrices and solves it with HiGHS through scipy, skipping
+    PuLP. The returned solution carries the schedule together with the
+    objective, the best bound, the remaining gap and the wall time.
+
+    The talks, locations and attendees are compiled into integer ids and
+    arrays once, every strategy and backend builds its model from those.
+    Before any model is built, cheap counting arguments look for talks that
+    fit nowhere, more talk time than open room slots and speakers that can
+    not give all their talks; an instance failing one is reported as
+    infeasible right away. The joint strategy bounds the preference sum of
+    its model by a combinatorial bound and returns an initial schedule
+    without solving if it is already within the gaps of `options`.
+    """
+    started = time.perf_counter()
+    instance = compile_instance(
+        talks=talks, locations=locations, allowed_times=allowed_times
+    )
+    if reason := find_infeasibility(instance):
+        print(f"Infeasible: {reason}")
+        return Solution(
+            schedule=[],
+            status=pulp.LpStatus[pulp.LpStatusInfeasible],
+            objective=None,
+            bound=None,
+            wall_time=time.perf_counter() - started,
+        )
+    upper_bound = None
+    if time_coarsening > 1:
+        if initial_schedule is not None:
+            # The given schedule takes the place of the coarse one
+            schedule = initial_schedule
+        else:
+            coarse = coarsen_problem(
+                talks=talks,
+                locations=locations,
+                allowed_times=allowed_times,
+                factor=time_coarsening,
+            )
+            coarse_solution = solve_assignment(
+                **coarse,
+                formulation=formulation,
+                conflict_encoding=conflict_encoding,
+                aggregate_attendees=aggregate_attendees,
+                sparse_preferences=sparse_preferences,
+                strategy=strategy,
+                tighten_bounds=tighten_bounds,
+                break_symmetries=break_symmetries,
+                warm_start=warm_start,
+                lazy_constraints=lazy_constraints,
+                room_matching=room_matching,
+                options=replace(options, time_limit=options.time_limit / 2),
+            )
+            schedule = None
+            if coarse_solution.objective is not None:
+                schedule = refine_schedule(
+                    coarse_solution.schedule,
+                    coarse_talks=coarse["talks"],
+                    coarse_locations=coarse["locations"],
+                    talks=talks,
+                    locations=locations,
+                    factor=time_coarsening,
+                )
+            # The fine solve only gets the time the coarse one left
+            options = replace(
+                options,
+                time_limit=max(options.time_limit - (time.perf_counter() - started), 0),
+            )
+        if schedule is None:
+            print("Coarse problem not solved, solving at full resolution")
+        else:
+            upper_bound = joint_upper_bound(instance)
+            instance = restrict_to_window(
+                instance,
+                schedule,
+                time_coarsening if refine_window is None else refine_window,
+            )
+            # The restricted rooms are no longer interchangeable
+            break_symmetries = False
+            if strategy == "annealing" or (
+                strategy == "joint" and options.backend == "cbc"
+            ):
+                initial_schedule = schedule
+
+    match strategy:
+        case "joint" if on_incumbent is not None:
+            solution = solve_joint_anytime(
+                instance=instance,
+                on_incumbent=on_incumbent,
+                initial_schedule=initial_schedule,
+                upper_bound=upper_bound,
+                options=options,
+                formulation=formulation,
+                conflict_encoding=conflict_encoding,
+                aggregate_attendees=aggregate_attendees,
+                sparse_preferences=sparse_preferences,
+                tighten_bounds=tighten_bounds,
+                break_symmetries=break_symmetries,
+                warm_start=warm_start,
+                lazy_constraints=lazy_constraints,
+                room_matching=room_matching,
+            )
+        case "joint":
+            solution = solve_joint(
+                instance=instance,
+                formulation=formulation,
+                conflict_encoding=conflict_encoding,
+                aggregate_attendees=aggregate_attendees,
+                sparse_preferences=sparse_preferences,
+                tighten_bounds=tighten_bounds,
+                break_symmetries=break_symmetries,
+                warm_start=warm_start,
+                initial_schedule=initial_schedule,
+                lazy_constraints=lazy_constraints,
+                room_matching=room_matching,
+                options=options,
+            )
+        case "two_phase":
+            if options.backend != "cbc":
+                raise ValueError("The two_phase strategy requires the cbc backend")
+            solution = solve_two_phase(instance=instance, options=options)
+        case "annealing":
+            solution = solve_annealing(
+                instance=instance, options=options, initial_schedule=initial_schedule
+            )
+        case _:
+            raise ValueError(f"Unknown strategy: {strategy}")
+
+    if upper_bound is not None:
+        # The bound of the refinement only holds within the windows
+        solution.bound = upper_bound
+    solution.wall_time = time.perf_counter() - started
+    print(f"Gap: {solution.gap}")
+    print(f"Wall time: {solution.wall_time:.2f}s")
+    if on_incumbent is not None and strategy != "joint":
+        if solution.objective is not None:
+            on_incumbent(solution)
+    return solution
+
+
+def solve_joint_anytime(
+    *,
+    instance: ProblemInstance,
+    on_incumbent: Callable[[Solution], bool | None],
+    options: SolverOptions,
+    initial_schedule: list[ScheduledTalk] | None = None,
+    upper_bound: float | None = None,
+    **settings: Any,
+) -> Solution:
+    """
+    Solve the joint model in stages of growing effort and report the best
+    solution after each to `on_incumbent`, see `solve_assignment`. `settings` are
+    passed on to `solve_joint`. A given `upper_bound` replaces the bounds of
+    the stages, it is the only one that holds for a restricted instance.
+    """
+    if options.backend != "cbc":
+        raise ValueError("Anytime solving requires the cbc backend")
+    started = time.perf_counter()
+    best = Solution(
+        schedule=[],
+        status=pulp.LpStatus[pulp.LpStatusNotSolved],
+        objective=None,
+        bound=joint_upper_bound(instance) if upper_bound is None else upper_bound,
+    )
 
-    problem = pulp.LpProblem("TalkScheduling", pulp.LpMaximize)
-    pulp_solver = pulp.PULP_CBC_CMD(msg=False, timeLimit=15)
+    def report(solution: Solution) -> bool:
+        """
+        Keep `solution` if it improves on the best one and report the best.
+        Returns whether the search should stop.
+        """
+        elapsed = time.perf_counter() - started
+        if solution.objective is not None and (
+            best.objective is None or solution.objective > best.objective + 1e-9
+        ):
+            best.schedule, best.objective = solution.schedule, solution.objective
+            best.status = solution.status
+            best.history.append((elapsed, solution.objective))
+        if upper_bound is None and solution.bound is not None:
+            best.bound = min(best.bound, solution.bound)
+        best.wall_time = elapsed
+        if best.objective is None:
+            return False
+        if on_incumbent(replace(best, history=list(best.history))):
+            print("Search stopped by the caller")
+            return True
+        return within_gap(best.objective, best.bound, options)
+
+    def remaining() -> float:
+        return options.time_limit - (time.perf_counter() - started)
+
+    schedule = initial_schedule or greedy_schedule(instance)
+    if schedule is not None and report(
+        Solution(
+            schedule=schedule,
+            status="Greedy" if initial_schedule is None else "Initial",
+            objective=schedule_objective(schedule),
+            bound=None,
+        )
+    ):
+        return best
 
+    annealed = solve_annealing(
+        instance=instance,
+        options=replace(options, time_limit=min(1, max(remaining(), 0))),
+        initial_schedule=schedule,
+    )
+    if report(annealed):
+        return best
+
+    length = 1.0
+    while remaining() > 0:
+        solution = solve_joint(
+            instance=instance,
+            initial_schedule=best.schedule or None,
+            options=replace(options, time_limit=min(length, remaining())),
+            **settings,
+        )
+        if report(solution):
+            break
+        length *= 2
+    best.wall_time = time.perf_counter() - started
+    return best
+
+
+def solve_joint(
+    *,
+    instance: ProblemInstance,
+    formulation: Formulation,
+    conflict_encoding: ConflictEncoding,
+    aggregate_attendees: bool,
+    sparse_preferences: bool,
+    tighten_bounds: bool,
+    break_symmetries: bool,
+    warm_start: bool,
+    lazy_constraints: bool,
+    options: SolverOptions,
+    initial_schedule: list[ScheduledTalk] | None = None,
+    room_matching: bool = False,
+) -> Solution:
+    match options.backend:
+        case "cbc":
+            pass
+        case "highs":
+            if formulation != "time_indexed":
+                raise ValueError(
+                    "The highs backend requires the time_indexed formulation"
+                )
+            if aggregate_attendees:
+                raise ValueError(
+                    "The highs backend does not support attendee aggregation"
+                )
+            if warm_start or initial_schedule is not None:
+                raise ValueError("The highs backend does not support warm starts")
+            if sparse_preferences:
+                raise ValueError(
+                    "The highs backend does not support sparse preferences"
+                )
+            if break_symmetries:
+                raise ValueError(
+                    "The highs backend does not support symmetry breaking"
+                )
+            if room_matching:
+                raise ValueError("The highs backend does not support room matching")
+            return solve_sparse(
+                instance=instance,
+                conflict_encoding=conflict_encoding,
+                options=options,
+            )
+        case _:
+            raise ValueError(f"Unknown backend: {options.backend}")
+
+    match formulation:
+        case "big_m":
+            if conflict_encoding != "pairwise":
+                raise ValueError(
+                    f"Conflict encoding {conflict_encoding} requires the "
+                    "time_indexed formulation"
+                )
+            if aggregate_attendees:
+                raise ValueError(
+                    "Attendee aggregation requires the time_indexed formulation"
+                )
+            if sparse_preferences:
+                raise ValueError(
+                    "Sparse preferences require the time_indexed formulation"
+                )
+            if room_matching:
+                raise ValueError("Room matching requires the time_indexed formulation")
+            model = build_big_m_model(instance, lazy=lazy_constraints)
+        case "time_indexed":
+            if lazy_constraints:
+                raise ValueError("Lazy constraints require the big_m formulation")
+            model_instance, rooms_open = instance, None
+            if room_matching:
+                model_instance, rooms_open = pool_rooms(instance)
+            model = build_time_indexed_model(
+                instance=model_instance,
+                conflict_encoding=conflict_encoding,
+                aggregate_attendees=aggregate_attendees,
+                sparse_preferences=sparse_preferences,
+                rooms_open=rooms_open,
+            )
+        case _:
+            raise ValueError(f"Unknown formulation: {formulation}")
+
+    if break_symmetries:
+        print("Symmetries found", add_symmetry_breaking(model))
+    if tighten_bounds:
+        print("Tightened bounds", propagate_bounds(model.problem))
+
+    upper_bound = joint_upper_bound(instance)
+    print(f"Combinatorial bound: {upper_bound}")
+    if not model.filler:
+        # Fillers relax the preference sum, capping it would only add ties
+        # between solutions that can and can not be seated
+        model.problem += model.preference_sum <= preference_upper_bound(instance)
+
+    if warm_start and initial_schedule is None:
+        initial_schedule = greedy_schedule(instance)
+    if initial_schedule is not None:
+        initial_objective = schedule_objective(initial_schedule)
+        if within_gap(initial_objective, upper_bound, options):
+            print("Initial schedule is within the gap of the bound")
+            return Solution(
+                schedule=initial_schedule,
+                status=pulp.LpStatus[pulp.LpStatusOptimal],
+                objective=initial_objective,
+                bound=upper_bound,
+            )
+        if break_symmetries:
+            initial_schedule = canonical_schedule(initial_schedule, instance)
+        model_schedule = initial_schedule
+        if room_matching:
+            model_schedule = to_pools(initial_schedule, model.instance)
+        set_initial_values(model, model_schedule)
+        print("Initial objective", initial_objective)
+        if not complete_initial_values(model.problem, cbc_solver(options)):
+            print("Initial schedule could not be completed into a warm start")
+
+    started = time.perf_counter()
+    bound = solve_cbc(model.problem, options, warm_start=initial_schedule is not None)
+    solved = model.problem.status == pulp.LpStatusOptimal
+
+    # Add the violated constraints of a lazy model until there are none left
+    rounds = 0
+    while solved and model.separate is not None and (added := model.separate()):
+        rounds += 1
+        print(f"Round {rounds}: added {added} violated constraints")
+        remaining = options.time_limit - (time.perf_counter() - started)
+        if remaining <= 0:
+            solved = False
+            break
+        if initial_schedule is not None:
+            for variable in model.problem.variables():
+                variable.varValue = None
+            set_initial_values(model, model_schedule)
+            complete_initial_values(model.problem, cbc_solver(options))
+        bound = solve_cbc(
+            model.problem,
+            replace(options, time_limit=remaining),
+            warm_start=initial_schedule is not None,
+        )
+        solved = model.problem.status == pulp.LpStatusOptimal
+
+    if bound is not None:
+        bound = min(bound, upper_bound)
+    status = pulp.LpStatus[model.problem.status if solved else pulp.LpStatusNotSolved]
+    if initial_schedule is not None and not solved:
+        print(f"Status: {status}, using initial schedule")
+        return Solution(
+            schedule=initial_schedule,
+            status=status,
+            objective=schedule_objective(initial_schedule),
+            bound=bound,
+        )
+
+    print_solution(model)
+
+    schedule = extract_schedule(model)
+    if solved and room_matching:
+        matched, unmatched = match_rooms(schedule, instance)
+        if unmatched:
+            print(f"{len(unmatched)} talks found no room, assigning rooms exactly")
+            schedule = assign_rooms(schedule, instance, options)
+            if schedule is None:
+                print("No room assignment exists, repairing the schedule")
+                schedule = repair_rooms(matched, unmatched, instance, options)
+        else:
+            schedule = matched
+        if schedule is None:
+            status = pulp.LpStatus[pulp.LpStatusNotSolved]
+            return Solution(schedule=[], status=status, objective=None, bound=bound)
+
+    objective = None
+    if solved:
+        # Fillers that could not be seated are not part of the schedule, and
+        # matching rooms may have moved talks
+        objective = (
+            schedule_objective(schedule)
+            if model.filler or room_matching
+            else pulp.value(model.problem.objective)
+        )
+    return Solution(
+        schedule=schedule,
+        status=status,
+        objective=objective,
+        bound=bound,
+    )
+
+
+def build_big_m_model(instance: ProblemInstance, *, lazy: bool = False) -> Model:
+    """
+    With `lazy`, the pairwise room-overlap and attendee-conflict constraints
+    are left out. `Model.separate` adds those the current solution violates.
+    """
+    talks = range(len(instance.talks))
+    locations = range(len(instance.locations))
+    attendees = list(range(len(instance.attendees)))
+    duration = instance.duration.tolist()
+    capacity = instance.capacity.tolist()
+    speaker = instance.speaker.tolist()
+    # weight[talk][attendee], with the default for unrated talks
+    weight = instance.weights.T.tolist()
+    domains = instance.domains()
+    locations_of = {
+        talk: [location for location in locations if (talk, location) in domains]
+        for talk in talks
+    }
+    talks_in = {
+        location: [talk for talk in talks if (talk, location) in domains]
+        for location in locations
+    }
+    runs = {pair: contiguous_runs(slots) for pair, slots in domains.items()}
+
+    problem = pulp.LpProblem("TalkScheduling", pulp.LpMaximize)
     # y describes start slot of each talk and location
-    last_slot = start_slots[-1].index
-    M = last_slot + max(talk.duration for talk in talks) + 1
-    eps = 1e-8
+    first_slot = min(slots[0] for slots in domains.values())
+    last_slot = max(slots[-1] for slots in domains.values())
+    latest_possible_end = max(
+        slots[-1] + duration[talk] for (talk, _), slots in domains.items()
+    )
     y = pulp.LpVariable.dicts(
         "y",
-        ((talk, location) for talk in talks for location in locations),
-        start_slots[0].index,
+        domains.keys(),
+        0,
         last_slot,
         cat=pulp.LpInteger,
     )
+    # Every big-M below is derived from these bounds, so keep them tight
+    for pair, slots in domains.items():
+        y[pair].upBound = slots[-1]
     # is_scheduled describes whether a talk is scheduled at a specific location
     is_scheduled = pulp.LpVariable.dicts(
         "is_scheduled",
-        ((talk, location) for talk in talks for location in locations),
+        domains.keys(),
         0,
         1,
         cat=pulp.LpBinary,
     )
+    # start_of describes the start slot of a talk, wherever it is held
+    start_of = {
+        talk: pulp.LpVariable(
+            f"start_{talk}",
+            min(domains[talk, location][0] for location in locations_of[talk]),
+            max(domains[talk, location][-1] for location in locations_of[talk]),
+            cat=pulp.LpInteger,
+        )
+        for talk in talks
+    }
+    for talk in talks:
+        problem += start_of[talk] == pulp.lpSum(
+            y[(talk, location)] for location in locations_of[talk]
+        )
 
     # comes_before describes the ordering of talks
     start_comes_before = pulp.LpVariable.dicts(
@@ -89,14 +632,14 @@ def solve_assignment(
     min_end = pulp.LpVariable.dicts(
         "min_end",
         ((talk_i, talk_j) for talk_i, talk_j in combinations(talks, 2)),
-        start_slots[0].index,
-        last_slot,
+        first_slot,
+        latest_possible_end,
         cat=pulp.LpInteger,
     )
     max_start = pulp.LpVariable.dicts(
         "max_start",
         ((talk_i, talk_j) for talk_i, talk_j in combinations(talks, 2)),
-        start_slots[0].index,
+        first_slot,
         last_slot,
         cat=pulp.LpInteger,
     )
@@ -121,226 +664,213 @@ def solve_assignment(
 
     # Objective function (maximize total visitor preference)
     preference_sum = pulp.lpSum(
-        talk.visitor_preferences.get(attendee, 0.1) * x[talk, attendee]
+        weight[talk][attendee] * x[talk, attendee]
         for talk in talks
         for attendee in attendees
     )
     # 2nd Objective: Minimize latest start
-    latest_end = pulp.LpVariable("latest_start", 0, last_slot, cat=pulp.LpInteger)
-    for talk in talks:
-        for location in locations:
-            problem += y[(talk, location)] + talk.duration <= latest_end
+    latest_end = pulp.LpVariable(
+        "latest_start", 0, latest_possible_end, cat=pulp.LpInteger
+    )
+    for talk, location in domains:
+        problem += y[(talk, location)] + duration[talk] <= latest_end
 
     problem += preference_sum - 0.001 * latest_end
 
     # Each task must be scheduled exactly once
     for talk in talks:
         problem += (
-            pulp.lpSum(is_scheduled[(talk, location)] for location in locations) == 1
+            pulp.lpSum(is_scheduled[(talk, location)] for location in locations_of[talk])
+            == 1
+        )
+
+    # Each talk may only start at a feasible slot of its location. The feasible
+    # slots form disjoint runs, selecting one run per scheduled pair keeps y
+    # within that run without any big-M.
+    time_range_selector = pulp.LpVariable.dicts(
+        "time_range_selector",
+        (
+            (talk, location, run_index)
+            for (talk, location), pair_runs in runs.items()
+            if len(pair_runs) > 1
+            for run_index in range(len(pair_runs))
+        ),
+        0,
+        1,
+        cat=pulp.LpBinary,
+    )
+    for (talk, location), pair_runs in runs.items():
+        scheduled = is_scheduled[(talk, location)]
+        start_time = y[(talk, location)]
+        if len(pair_runs) == 1:
+            [(first, last)] = pair_runs
+            problem += start_time >= first * scheduled
+            problem += start_time <= last * scheduled
+            continue
+        selectors = [
+            time_range_selector[(talk, location, run_index)]
+            for run_index in range(len(pair_runs))
+        ]
+        problem += pulp.lpSum(selectors) == scheduled
+        problem += start_time >= pulp.lpSum(
+            first * selector for (first, _), selector in zip(pair_runs, selectors)
+        )
+        problem += start_time <= pulp.lpSum(
+            last * selector for (_, last), selector in zip(pair_runs, selectors)
         )
-        for location in locations:
-            problem += y[(talk, location)] <= last_slot * is_scheduled[(talk, location)]
 
     # Constrains for if task i start < task j start
-    for talk_i, talk_j in combinations(talks, 2):
-        talk_i_start = pulp.lpSum(y[(talk_i, location)] for location in locations)
-        talk_j_start = pulp.lpSum(y[(talk_j, location)] for location in locations)
+    def add_ordering(talk_i: int, talk_j: int):
         pulp_min(
             problem,
-            talk_i_start,
-            talk_j_start,
+            start_of[talk_i],
+            start_of[talk_j],
             1 - start_comes_before[(talk_i, talk_j)],
-            M=M,
         )
 
-    # Talks may not overlap in the same location
-    for location in locations:
-        for talk_i, talk_j in combinations(talks, 2):
-            duration_i = talk_i.duration
-            duration_j = talk_j.duration
-            talk_i_scheduled = is_scheduled[(talk_i, location)]
-            talk_j_scheduled = is_scheduled[(talk_j, location)]
-            problem += y[(talk_i, location)] + duration_i - (
-                1 - talk_i_scheduled
-            ) * M <= y[(talk_j, location)] + M * (
-                1 - start_comes_before[(talk_i, talk_j)]
-            ) + M * (1 - talk_j_scheduled)
-            problem += y[(talk_j, location)] + duration_j - (
-                1 - talk_j_scheduled
-            ) * M <= y[(talk_i, location)] + M * start_comes_before[
-                (talk_i, talk_j)
-            ] + M * (1 - talk_i_scheduled)
+    # Talks may not overlap in the same location. Each big-M only has to
+    # cover the case in which its own condition is the one that is switched
+    # off: an unscheduled talk has y = 0, a scheduled one starts within its
+    # domain.
+    def add_room_overlap(location: int, talk_i: int, talk_j: int):
+        first_i, last_i = domains[talk_i, location][0], domains[talk_i, location][-1]
+        first_j, last_j = domains[talk_j, location][0], domains[talk_j, location][-1]
+        duration_i = duration[talk_i]
+        duration_j = duration[talk_j]
+        talk_i_scheduled = is_scheduled[(talk_i, location)]
+        talk_j_scheduled = is_scheduled[(talk_j, location)]
+        comes_before = start_comes_before[(talk_i, talk_j)]
+        problem.addConstraint(
+            y[(talk_i, location)] + duration_i - y[(talk_j, location)]
+            <= max(duration_i - first_j, 0) * (1 - talk_i_scheduled)
+            + max(last_i + duration_i - first_j, 0) * (1 - comes_before)
+            + (last_i + duration_i) * (1 - talk_j_scheduled)
+        )
+        problem.addConstraint(
+            y[(talk_j, location)] + duration_j - y[(talk_i, location)]
+            <= max(duration_j - first_i, 0) * (1 - talk_j_scheduled)
+            + max(last_j + duration_j - first_i, 0) * comes_before
+            + (last_j + duration_j) * (1 - talk_i_scheduled)
+        )
 
     # Talks conflict if they overlap in time
-    for talk_i, talk_j in combinations(talks, 2):
-        duration_i = talk_i.duration
-        duration_j = talk_j.duration
-        start_i = pulp.lpSum(y[(talk_i, location)] for location in locations)
-        start_j = pulp.lpSum(y[(talk_j, location)] for location in locations)
+    def add_conflict(talk_i: int, talk_j: int):
+        duration_i = duration[talk_i]
+        duration_j = duration[talk_j]
+        start_i = start_of[talk_i]
+        start_j = start_of[talk_j]
         end_i = start_i + duration_i
         end_j = start_j + duration_j
         con = conflicts[(talk_i, talk_j)]
 
         end_sel = min_end_sel[(talk_i, talk_j)]
         min_end_value = min_end[(talk_i, talk_j)]
-        pulp_min(problem, end_i, end_j, end_sel, M=M)
-        pulp_select(problem, end_i, end_j, min_end_value, end_sel, M=M)
+        min_end_value.lowBound = min(
+            start_i.lowBound + duration_i, start_j.lowBound + duration_j
+        )
+        min_end_value.upBound = min(
+            start_i.upBound + duration_i, start_j.upBound + duration_j
+        )
+        pulp_min(problem, end_i, end_j, end_sel)
+        pulp_select(problem, end_i, end_j, min_end_value, end_sel)
 
         start_sel = max_start_sel[(talk_i, talk_j)]
         max_start_value = max_start[(talk_i, talk_j)]
-        pulp_max(problem, start_i, start_j, start_sel, M=M)
-        pulp_select(problem, start_i, start_j, max_start_value, start_sel, M=M)
+        max_start_value.lowBound = max(start_i.lowBound, start_j.lowBound)
+        max_start_value.upBound = max(start_i.upBound, start_j.upBound)
+        pulp_max(problem, start_i, start_j, start_sel)
+        pulp_select(problem, start_i, start_j, max_start_value, start_sel)
 
         overlap = min_end_value - max_start_value
-        pulp_max(problem, 0, overlap, con, M=M)
+        pulp_max(problem, 0, overlap, con)
 
     # Each attendee can be only at one talk at a time
-    for attendee in attendees:
-        for talk_i, talk_j in combinations(talks, 2):
-            problem += (
-                x[(talk_i, attendee)] + x[(talk_j, attendee)]
-                <= 2 - conflicts[(talk_i, talk_j)]
-            )
-
-    # Each speaker must attend their own talk
-    for talk in talks:
-        speaker = talk.speaker
-        problem += x[talk, speaker] == 1
-
-    or_variables = pulp.LpVariable.dicts(
-        "time_range_selector",
-        (
-            (talk, location, time_range_index)
-            for talk in talks
-            for location in locations
-            for time_range_index in range(location.allowed_times.number_of_ranges())
-        ),
-        0,
-        1,
-        cat=pulp.LpBinary,
-    )
-
-    for talk in talks:
-        for location in locations:
-            scheduled = is_scheduled[(talk, location)]
-            start_time = y[(talk, location)]
-            end_time = start_time + talk.duration
-
-            or_variable = [
-                or_variables[(talk, location, time_range_index)]
-                for time_range_index in range(location.allowed_times.number_of_ranges())
-            ]
-            pulp_or(
-                problem,
-                *[
-                    [
-                        start_time >= time_range.start.index - M * (1 - scheduled),
-                        end_time <= time_range.end.index + M * (1 - scheduled),
-                    ]
-                    for time_range in location.allowed_times.times
-                ],
-                or_variables=or_variable,
-                number_of_true_terms=scheduled,
-                M=M,
-            )
-
-    # global_or_variables = pulp.LpVariable.dicts(
-    #     "global_time_range_selector",
-    #     (
-    #         (talk, time_range_index)
-    #         for talk in talks
-    #         for time_range_index in range(allowed_times.number_of_ranges())
-    #     ),
-    #     0,
-    #     1,
-    #     cat=pulp.LpBinary,
-    # )
-
-    # for talk in talks:
-    #     start_time = pulp.lpSum(y[(talk, location)] for location in locations)
-    #     scheduled = pulp.lpSum(is_scheduled[(talk, location)] for location in locations)
-    #     end_time = start_time + talk.duration
-
-    #     global_or_variable = [
-    #         global_or_variables[(talk, time_range_index)]
-    #         for time_range_index in range(allowed_times.number_of_ranges())
-    #     ]
-    #     pulp_or(
-    #         problem,
-    #         *[
-    #             [
-    #                 start_time >= time_range.start.index,
-    #                 end_time <= time_range.end.index,
-    #             ]
-    #             for time_range in allowed_times.times
-    #         ],
-    #         or_variables=global_or_variable,
-    #         number_of_true_terms=scheduled,
-    #         M=M,
-    #     )
-
-    for talk in talks:
-        for location in locations:
-            scheduled = is_scheduled[(talk, location)]
-            number_of_attendees = pulp.lpSum(
-                x[talk, attendee] for attendee in attendees
-            )
-            problem += number_of_attendees <= location.capacity + M * (1 - scheduled)
-
-    problem.solve(pulp_solver)
-
-    status = pulp.LpStatus[problem.status]
-    objective = pulp.value(problem.objective)
-
-    print(f"Status: {status}")
-    print(f"Objective: {objective}")
-    print("Latest end", pulp.value(latest_end))
-    print("Preference sum", pulp.value(preference_sum))
-
-    for talk in talks:
-        for location in locations:
-            print(
-                talk.title,
-                location.name,
-                pulp.value(is_scheduled[(talk, location)]),
-                pulp.value(y[(talk, location)]),
-            )
-
-    for talk_i, talk_j in combinations(talks, 2):
-        print(
-            f"{talk_i.title} comes before {talk_j.title}:",
-            pulp.value(start_comes_before[(talk_i, talk_j)]),
-        )
-        print(
-            f"{talk_i.title} conflicts with {talk_j.title}:",
-            pulp.value(conflicts[(talk_i, talk_j)]),
+    def add_attendee_conflict(attendee: int, talk_i: int, talk_j: int):
+        problem.addConstraint(
+            x[(talk_i, attendee)] + x[(talk_j, attendee)]
+            <= 2 - conflicts[(talk_i, talk_j)]
         )
 
-    for talk in talks:
+    separate = None
+    if not lazy:
+        for talk_i, talk_j in combinations(talks, 2):
+            add_ordering(talk_i, talk_j)
+        for location in locations:
+            for talk_i, talk_j in combinations(talks_in[location], 2):
+                add_room_overlap(location, talk_i, talk_j)
+        for talk_i, talk_j in combinations(talks, 2):
+            add_conflict(talk_i, talk_j)
         for attendee in attendees:
-            print(
-                f"{attendee.name} assigned to {talk.title}:",
-                pulp.value(x[talk, attendee]),
-            )
-
-    schedule: list[ScheduledTalk] = []
+            for talk_i, talk_j in combinations(talks, 2):
+                add_attendee_conflict(attendee, talk_i, talk_j)
+    else:
+        ordered, room_pairs, conflicting, attendee_pairs = set(), set(), set(), set()
+
+        def separate() -> int:
+            start = {talk: round(pulp.value(start_of[talk])) for talk in talks}
+            attending = {
+                attendee: [
+                    talk for talk in talks if round(pulp.value(x[talk, attendee])) == 1
+                ]
+                for attendee in attendees
+            }
+            room_of = {
+                talk: location
+                for (talk, location), scheduled in is_scheduled.items()
+                if round(pulp.value(scheduled)) == 1
+            }
+
+            def overlapping(talks_to_check: list[int]):
+                for talk_i, talk_j in combinations(sorted(talks_to_check), 2):
+                    if (
+                        start[talk_i] < start[talk_j] + duration[talk_j]
+                        and start[talk_j] < start[talk_i] + duration[talk_i]
+                    ):
+                        yield talk_i, talk_j
+
+            added = 0
+            for location in locations:
+                held_here = [talk for talk in talks if room_of.get(talk) == location]
+                for pair in overlapping(held_here):
+                    if pair not in ordered:
+                        ordered.add(pair)
+                        add_ordering(*pair)
+                    if (location, *pair) not in room_pairs:
+                        room_pairs.add((location, *pair))
+                        add_room_overlap(location, *pair)
+                        added += 1
+            for attendee, attended in attending.items():
+                for pair in overlapping(attended):
+                    if pair not in conflicting:
+                        conflicting.add(pair)
+                        add_conflict(*pair)
+                    if (attendee, *pair) not in attendee_pairs:
+                        attendee_pairs.add((attendee, *pair))
+                        add_attendee_conflict(attendee, *pair)
+                        added += 1
+            return added
 
+    # Each speaker must attend their own talk
     for talk in talks:
-        for location in locations:
-            if pulp.value(is_scheduled[(talk, location)]) == 0:
-                continue
-            # Find the start slot for the talk at this location
-            start_slot = pulp.value(y[talk, location])
-            attending = [
-                attendee for attendee in attendees if pulp.value(x[talk, attendee]) == 1
-            ]
-            schedule.append(
-                ScheduledTalk(
-                    talk=talk,
-                    time_slot=TimeSlot(start_slot),
-                    location=location,
-                    attendees=attending,
-                )
-            )
-
-    return schedule
+        problem += x[talk, speaker[talk]] == 1
+
+    for talk, location in domains:
+        scheduled = is_scheduled[(talk, location)]
+        number_of_attendees = pulp.lpSum(x[talk, attendee] for attendee in attendees)
+        excess = max(len(attendees) - capacity[location], 0)
+        problem += number_of_attendees <= capacity[location] + excess * (1 - scheduled)
+
+    return Model(
+        problem=problem,
+        instance=instance,
+        attendees=attendees,
+        start_of=start_of,
+        is_scheduled=is_scheduled,
+        x=x,
+        preference_sum=preference_sum,
+        latest_end=latest_end,
+        conflicts=conflicts,
+        start_comes_before=start_comes_before,
+        y=y,
+        separate=separate,
+    )
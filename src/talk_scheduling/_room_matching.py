@@ -0,0 +1,200 @@
+from ._instance import ProblemInstance
+from ._lns import Region, merge_schedules, reoptimise
+from ._solvers import solve_cbc
+from ._types import (
+    Location,
+    ScheduledTalk,
+    AllowedTimes,
+    SolverOptions,
+)
+
+import numpy as np
+import pulp
+from collections import defaultdict
+from dataclasses import replace
+
+
+def pool_rooms(instance: ProblemInstance) -> tuple[ProblemInstance, np.ndarray]:
+    """
+    `instance` with its rooms pooled by capacity, so a model only decides how
+    large a room every talk gets and not which one.
+
+    The pools are ordered by decreasing capacity. A talk may start at a slot
+    in a pool if it may do so in one of its rooms. Also returns the
+    (pools x horizon) counts of rooms that are at least as large as a pool
+    and open at a slot, that is covered by a placement of some talk.
+    """
+    capacities = sorted(set(instance.capacity.tolist()), reverse=True)
+    pool_of = np.array([capacities.index(c) for c in instance.capacity.tolist()])
+
+    open_at = np.zeros((len(instance.locations), instance.horizon), dtype=bool)
+    for duration in set(instance.duration.tolist()):
+        starts = instance.allowed_starts[instance.duration == duration].any(axis=0)
+        for offset in range(duration):
+            open_at[:, offset:] |= starts[:, : instance.horizon - offset]
+
+    allowed_starts = np.zeros(
+        (len(instance.talks), len(capacities), instance.horizon), dtype=bool
+    )
+    rooms_open = np.zeros((len(capacities), instance.horizon), dtype=int)
+    for location, pool in enumerate(pool_of.tolist()):
+        allowed_starts[:, pool] |= instance.allowed_starts[:, location]
+        rooms_open[pool:] += open_at[location]
+
+    pools = [
+        Location(
+            name=f"{capacity} seats",
+            capacity=capacity,
+            allowed_times=AllowedTimes(times=[]),
+        )
+        for capacity in capacities
+    ]
+    pooled = replace(
+        instance,
+        locations=pools,
+        capacity=np.array(capacities, dtype=int),
+        allowed_starts=allowed_starts,
+        location_index={pool: index for index, pool in enumerate(pools)},
+    )
+    return pooled, rooms_open
+
+
+def match_rooms(
+    schedule: list[ScheduledTalk], instance: ProblemInstance
+) -> tuple[list[ScheduledTalk], list[ScheduledTalk]]:
+    """
+    Move the talks of `schedule` into rooms of `instance`, keeping their start
+    slots and attendees. Talks are handed out in order of their start, larger
+    audiences first, each into the smallest free room it fits into.
+
+    Returns the matched talks and those for which no room was free.
+    """
+    free_from = np.zeros(len(instance.locations), dtype=int)
+    capacity = instance.capacity
+    matched, unmatched = [], []
+    for scheduled in sorted(
+        schedule,
+        key=lambda scheduled: (scheduled.time_slot, -len(scheduled.attendees)),
+    ):
+        talk = instance.talk_index[scheduled.talk]
+        start = scheduled.time_slot.index
+        fits = (
+            instance.allowed_starts[talk, :, start]
+            & (capacity >= len(scheduled.attendees))
+            & (free_from <= start)
+        )
+        if not fits.any():
+            unmatched.append(scheduled)
+            continue
+        candidates = np.flatnonzero(fits)
+        room = candidates[np.argmin(capacity[candidates])]
+        free_from[room] = start + instance.duration[talk]
+        matched.append(replace(scheduled, location=instance.locations[room]))
+    matched.sort(key=lambda scheduled: instance.talk_index[scheduled.talk])
+    return matched, unmatched
+
+
+def assign_rooms(
+    schedule: list[ScheduledTalk], instance: ProblemInstance, options: SolverOptions
+) -> list[ScheduledTalk] | None:
+    """
+    Move the talks of `schedule` into rooms of `instance` with a MIP that only
+    decides the rooms, keeping start slots and attendees. Unlike
+    `match_rooms` it finds rooms whenever they exist. Returns None otherwise.
+    """
+    problem = pulp.LpProblem("RoomAssignment", pulp.LpMinimize)
+    duration = instance.duration.tolist()
+    held_in = {}
+    using: dict[tuple[int, int], list[pulp.LpVariable]] = defaultdict(list)
+    for scheduled in schedule:
+        talk = instance.talk_index[scheduled.talk]
+        start = scheduled.time_slot.index
+        rooms = np.flatnonzero(
+            instance.allowed_starts[talk, :, start]
+            & (instance.capacity >= len(scheduled.attendees))
+        ).tolist()
+        if not rooms:
+            return None
+        for location in rooms:
+            held_in[talk, location] = pulp.LpVariable(
+                f"held_in_{talk}_{location}", cat=pulp.LpBinary
+            )
+            for u in range(start, start + duration[talk]):
+                using[location, u].append(held_in[talk, location])
+        problem += pulp.lpSum(held_in[talk, location] for location in rooms) == 1
+    for variables in using.values():
+        if len(variables) > 1:
+            problem += pulp.lpSum(variables) <= 1
+    # Prefer small rooms, leaving the large ones free
+    problem += pulp.lpSum(
+        int(instance.capacity[location]) * variable
+        for (_, location), variable in held_in.items()
+    )
+
+    solve_cbc(problem, options)
+    if problem.status != pulp.LpStatusOptimal:
+        return None
+    room_of = {
+        talk: location
+        for (talk, location), variable in held_in.items()
+        if round(variable.value() or 0) == 1
+    }
+    return [
+        replace(
+            scheduled,
+            location=instance.locations[room_of[instance.talk_index[scheduled.talk]]],
+        )
+        for scheduled in schedule
+    ]
+
+
+def to_pools(
+    schedule: list[ScheduledTalk], pooled: ProblemInstance
+) -> list[ScheduledTalk]:
+    """
+    Replace the rooms of `schedule` by their pools of `pooled`.
+    """
+    pool_of = {pool.capacity: pool for pool in pooled.locations}
+    return [
+        replace(scheduled, location=pool_of[scheduled.location.capacity])
+        for scheduled in schedule
+    ]
+
+
+def repair_rooms(
+    matched: list[ScheduledTalk],
+    unmatched: list[ScheduledTalk],
+    instance: ProblemInstance,
+    options: SolverOptions,
+) -> list[ScheduledTalk] | None:
+    """
+    Place the talks that found no room by re-optimising them together with
+    the matched talks they overlap, every other talk stays where it is.
+    Returns the repaired schedule, or None if the repair found no solution.
+    """
+    overlapping = {
+        scheduled.talk
+        for scheduled in matched
+        for other in unmatched
+        if scheduled.time_slot.index < other.time_slot.index + other.talk.duration
+        and other.time_slot.index < scheduled.time_slot.index + scheduled.talk.duration
+    }
+    region = Region(
+        talks=frozenset(overlapping | {scheduled.talk for scheduled in unmatched}),
+        locations=frozenset(instance.locations),
+        start=0,
+        end=instance.horizon,
+    )
+    placements = reoptimise(
+        matched,
+        region,
+        attendees=set(instance.attendees),
+        allowed_times=instance.allowed_times,
+        options=options,
+    )
+    if placements is None:
+        return None
+    return sorted(
+        merge_schedules(matched, placements),
+        key=lambda scheduled: instance.talk_index[scheduled.talk],
+    )
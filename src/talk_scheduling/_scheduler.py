@@ -0,0 +1,220 @@
+from ._lns import Region, merge_schedules, reoptimise
+from ._model import gather_attendees, schedule_objective
+from ._problem import solve_assignment
+from ._types import (
+    Location,
+    Talk,
+    ScheduledTalk,
+    Attendee,
+    TimeSlot,
+    AllowedTimes,
+    Solution,
+    SolverOptions,
+)
+
+import time
+from dataclasses import replace
+from typing import Any
+
+
+class Scheduler:
+    """
+    Keeps a schedule up to date while the problem is edited.
+
+    Edits only mark the talks they affect. `reoptimise` then frees those talks
+    together with up to `neighbourhood_size` talks sharing most attendees with
+    them, and re-optimises them as a sub-MIP with every other talk fixed. The
+    placements passed to `publish` are the reference for `max_moved`: at most
+    that many published talks may leave their slot or room over all edits,
+    unless an edit makes their placement impossible.
+
+    Talks and locations must only be changed through the scheduler, as both
+    are replaced rather than modified.
+    """
+
+    def __init__(
+        self,
+        *,
+        talks: list[Talk],
+        locations: list[Location],
+        allowed_times: AllowedTimes,
+        schedule: list[ScheduledTalk] | None = None,
+        max_moved: int | None = None,
+        neighbourhood_size: int = 8,
+        options: SolverOptions = SolverOptions(time_limit=5),
+    ):
+        self.talks = list(talks)
+        self.locations = list(locations)
+        self.allowed_times = allowed_times
+        self.schedule = list(schedule or [])
+        self.max_moved = max_moved
+        self.neighbourhood_size = neighbourhood_size
+        self.options = options
+        # The published slot and location position of every talk
+        self.published: dict[Talk, tuple[TimeSlot, int]] = {}
+        self._changed: set[Talk] = set(talks) - {
+            scheduled.talk for scheduled in self.schedule
+        }
+        self._affected: set[Attendee] = set()
+
+    def solve(self, **settings: Any) -> Solution:
+        """
+        Solve the whole problem from scratch with `solve_assignment`, whose
+        keyword arguments `settings` are.
+        """
+        solution = solve_assignment(
+            talks=self.talks,
+            locations=self.locations,
+            allowed_times=self.allowed_times,
+            **settings,
+        )
+        self.schedule = solution.schedule
+        self._changed.clear()
+        self._affected.clear()
+        return solution
+
+    def publish(self):
+        """
+        Make the current schedule the one that edits should move as little as
+        possible.
+        """
+        position = {location: index for index, location in enumerate(self.locations)}
+        self.published = {
+            scheduled.talk: (scheduled.time_slot, position[scheduled.location])
+            for scheduled in self.schedule
+        }
+
+    def add_talk(self, talk: Talk):
+        self.talks.append(talk)
+        self._changed.add(talk)
+
+    def remove_talk(self, talk: Talk):
+        self.talks.remove(talk)
+        self._changed.discard(talk)
+        self.published.pop(talk, None)
+        for scheduled in self.schedule:
+            if scheduled.talk == talk:
+                # Its listeners may join other talks now
+                self._affected.update(scheduled.attendees)
+        self.schedule = [
+            scheduled for scheduled in self.schedule if scheduled.talk != talk
+        ]
+
+    def set_preferences(self, talk: Talk, visitor_preferences: dict[Attendee, int]):
+        changed = replace(talk, visitor_preferences=dict(visitor_preferences))
+        self._affected.update(talk.visitor_preferences, visitor_preferences)
+        self.talks[self.talks.index(talk)] = changed
+        if talk in self.published:
+            self.published[changed] = self.published.pop(talk)
+        self._changed.discard(talk)
+        self._changed.add(changed)
+        self.schedule = [
+            replace(scheduled, talk=changed) if scheduled.talk == talk else scheduled
+            for scheduled in self.schedule
+        ]
+
+    def set_capacity(self, location: Location, capacity: int):
+        self._replace_location(location, replace(location, capacity=capacity))
+
+    def set_allowed_times(self, location: Location, allowed_times: AllowedTimes):
+        self._replace_location(location, replace(location, allowed_times=allowed_times))
+
+    def _replace_location(self, location: Location, changed: Location):
+        self.locations[self.locations.index(location)] = changed
+        # Only the talks held there are affected, they may have to move
+        for index, scheduled in enumerate(self.schedule):
+            if scheduled.location == location:
+                self.schedule[index] = replace(scheduled, location=changed)
+                self._changed.add(scheduled.talk)
+
+    def reoptimise(self) -> Solution:
+        """
+        Re-optimise the talks affected by the edits since the last call. If
+        their neighbourhood has no solution, every talk is freed instead.
+        """
+        started = time.perf_counter()
+        if self._changed or self._affected:
+            placements = self._reoptimise(self._region(self._neighbours()))
+            if placements is None:
+                placements = self._reoptimise(self._region(self.talks))
+            if placements is None:
+                return Solution(
+                    schedule=self.schedule,
+                    status="Not Solved",
+                    objective=None,
+                    bound=None,
+                    wall_time=time.perf_counter() - started,
+                )
+            self.schedule = merge_schedules(self.schedule, placements)
+            self._changed.clear()
+            self._affected.clear()
+
+        return Solution(
+            schedule=self.schedule,
+            status="Incremental",
+            objective=schedule_objective(self.schedule),
+            bound=None,
+            wall_time=time.perf_counter() - started,
+        )
+
+    def _neighbours(self) -> list[Talk]:
+        """
+        The changed talks and the ones sharing most attendees with them.
+        """
+        affected = self._affected | {
+            attendee
+            for talk in self._changed
+            for attendee in [talk.speaker, *talk.visitor_preferences]
+        }
+        others = [
+            scheduled
+            for scheduled in self.schedule
+            if scheduled.talk not in self._changed
+        ]
+        others.sort(
+            key=lambda scheduled: -len(affected.intersection(scheduled.attendees))
+        )
+        spare = max(self.neighbourhood_size - len(self._changed), 0)
+        return [*self._changed, *(scheduled.talk for scheduled in others[:spare])]
+
+    def _region(self, talks: list[Talk]) -> Region:
+        horizon = max(
+            time_range.end.index
+            for times in [
+                self.allowed_times,
+                *(location.allowed_times for location in self.locations),
+            ]
+            for time_range in times.times
+        )
+        return Region(
+            talks=frozenset(talks),
+            locations=frozenset(self.locations),
+            start=0,
+            end=horizon,
+        )
+
+    def _reoptimise(self, region: Region) -> list[ScheduledTalk] | None:
+        published = {
+            talk: (slot, self.locations[location])
+            for talk, (slot, location) in self.published.items()
+        }
+        max_moved = self.max_moved
+        if max_moved is not None:
+            # Talks that moved in earlier edits and stay fixed use up the limit
+            moved = sum(
+                published[scheduled.talk] != (scheduled.time_slot, scheduled.location)
+                for scheduled in self.schedule
+                if scheduled.talk in published and scheduled.talk not in region.talks
+            )
+            max_moved = max(max_moved - moved, 0)
+        return reoptimise(
+            self.schedule,
+            region,
+            attendees=gather_attendees(self.talks).union(
+                *(scheduled.attendees for scheduled in self.schedule)
+            ),
+            allowed_times=self.allowed_times,
+            options=self.options,
+            published=published,
+            max_moved=max_moved,
+        )
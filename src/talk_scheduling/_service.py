@@ -0,0 +1,380 @@
+from ._cache import problem_keys
+from ._io import load_instance, schedule_table
+from ._portfolio import _solve_quietly
+from ._types import Solution, SolverOptions
+
+import asyncio
+import collections
+import contextlib
+import itertools
+import json
+import os
+import pandas as pd
+import pickle
+import signal
+import struct
+import sys
+from dataclasses import dataclass, field
+from functools import partial
+from http import HTTPStatus
+from typing import Any, BinaryIO, Literal
+
+JobStatus = Literal["queued", "running", "done", "failed", "cancelled"]
+
+# The columns of the tables of `load_instance`, as sent to the server
+TABLE_COLUMNS = {
+    "talks": ["title", "speaker", "duration"],
+    "rooms": ["name", "capacity"],
+    "availability": ["location", "start", "end"],
+    "preferences": ["talk", "attendee", "preference"],
+}
+
+
+def _write_frame(stream: BinaryIO, value: Any):
+    data = pickle.dumps(value)
+    stream.write(struct.pack("!I", len(data)) + data)
+    stream.flush()
+
+
+def _serve_worker():
+    """
+    The loop of a worker process: read keyword arguments of
+    `solve_assignment` from stdin and write back the outcome, each as a
+    length-prefixed pickle.
+    """
+    # Keep the channel to the service clean of anything a solver prints
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    source = sys.stdin.buffer
+    while header := source.read(4):
+        (size,) = struct.unpack("!I", header)
+        arguments = pickle.loads(source.read(size))
+        try:
+            outcome = ("done", _solve_quietly(arguments))
+        except Exception as error:
+            outcome = ("failed", error)
+        _write_frame(channel, outcome)
+
+
+class _Worker:
+    """
+    A long-lived worker process with its own process group, so that it can
+    be stopped together with the solver it runs.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+
+    @classmethod
+    async def start(cls) -> "_Worker":
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            "from talk_scheduling._service import _serve_worker; _serve_worker()",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            start_new_session=hasattr(os, "killpg"),
+        )
+        return cls(process)
+
+    async def run(self, arguments: dict[str, Any]) -> tuple[str, Any]:
+        data = pickle.dumps(arguments)
+        self.process.stdin.write(struct.pack("!I", len(data)) + data)
+        await self.process.stdin.drain()
+        (size,) = struct.unpack("!I", await self.process.stdout.readexactly(4))
+        return pickle.loads(await self.process.stdout.readexactly(size))
+
+    def kill(self):
+        if hasattr(os, "killpg"):
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(self.process.pid, signal.SIGKILL)
+        else:
+            self.process.kill()
+
+
+@dataclass(kw_only=True, eq=False)
+class Job:
+    id: str
+    arguments: dict[str, Any]
+    priority: int
+    status: JobStatus = "queued"
+    result: asyncio.Future = field(repr=False)
+    # The number of the job's latest entry in the queue
+    entry: int = 0
+    worker: _Worker | None = field(default=None, repr=False)
+
+
+class SolveService:
+    """
+    Runs `solve_assignment` for an asyncio application without blocking its
+    event loop.
+
+    Submitted problems wait in a queue, jobs with a higher `priority` first,
+    and are solved by at most `max_workers` worker processes, by default one
+    per core. Jobs are identified by the hash of their problem and keyword
+    arguments, as in `SolutionCache`, so submitting a problem that is queued,
+    running or solved already returns the existing job; its priority is
+    raised if needed. Cancelling a job stops it for everyone who submitted
+    it, a running job by stopping its worker and solver. Only the
+    `keep_finished` jobs that finished last, done, failed or cancelled, are
+    kept; older ones are forgotten together with their solutions.
+
+    Use it as an async context manager, or call `start` and `close`.
+    """
+
+    def __init__(self, *, max_workers: int | None = None, keep_finished: int = 1000):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.keep_finished = keep_finished
+        self.jobs: dict[str, Job] = {}
+        self._finished: collections.deque[Job] = collections.deque()
+        self._queue: asyncio.PriorityQueue[tuple[int, int, Job]] | None = None
+        self._entries = itertools.count()
+        self._idle: list[_Worker] = []
+        self._workers: set[_Worker] = set()
+        self._dispatchers: list[asyncio.Task] = []
+
+    async def __aenter__(self) -> "SolveService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue()
+        self._dispatchers = [
+            asyncio.create_task(self._dispatch()) for _ in range(self.max_workers)
+        ]
+
+    async def close(self):
+        for job in list(self.jobs.values()):
+            self.cancel(job.id)
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        for worker in self._workers:
+            # Idle workers stop once their input ends
+            worker.process.stdin.close()
+            await worker.process.wait()
+        self._idle.clear()
+        self._workers.clear()
+
+    def submit(self, *, priority: int = 0, **arguments: Any) -> str:
+        """
+        Queue a problem given by the keyword arguments of `solve_assignment`
+        and return the id of its job.
+        """
+        _, key = problem_keys(
+            talks=arguments["talks"],
+            locations=arguments["locations"],
+            allowed_times=arguments["allowed_times"],
+            settings={
+                name: value
+                for name, value in arguments.items()
+                if name not in ("talks", "locations", "allowed_times")
+            },
+        )
+        job = self.jobs.get(key)
+        if job is None or job.status in ("failed", "cancelled"):
+            job = Job(
+                id=key,
+                arguments=arguments,
+                priority=priority,
+                result=asyncio.get_running_loop().create_future(),
+            )
+            self.jobs[key] = job
+            self._enqueue(job)
+        elif job.status == "queued" and priority > job.priority:
+            job.priority = priority
+            self._enqueue(job)
+        return key
+
+    def _enqueue(self, job: Job):
+        job.entry = next(self._entries)
+        self._queue.put_nowait((-job.priority, job.entry, job))
+
+    def _finish(self, job: Job, status: JobStatus):
+        job.status = status
+        self._finished.append(job)
+        while len(self._finished) > self.keep_finished:
+            old = self._finished.popleft()
+            # A failed or cancelled job may have been submitted again since
+            if self.jobs.get(old.id) is old:
+                del self.jobs[old.id]
+
+    def status(self, job_id: str) -> JobStatus:
+        return self.jobs[job_id].status
+
+    async def result(self, job_id: str) -> Solution:
+        """
+        Wait for the solution of a job. Raises `asyncio.CancelledError` if the
+        job was cancelled and the error of `solve_assignment` if it failed.
+        """
+        return await asyncio.shield(self.jobs[job_id].result)
+
+    async def solve(self, *, priority: int = 0, **arguments: Any) -> Solution:
+        return await self.result(self.submit(priority=priority, **arguments))
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job. Returns whether there was one.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.status not in ("queued", "running"):
+            return False
+        if job.worker is not None:
+            job.worker.kill()
+        job.result.cancel()
+        self._finish(job, "cancelled")
+        return True
+
+    async def _dispatch(self):
+        while True:
+            _, entry, job = await self._queue.get()
+            # Entries of jobs that were cancelled or raised in priority are stale
+            if job.status != "queued" or entry != job.entry:
+                continue
+            job.status = "running"
+            if self._idle:
+                worker = self._idle.pop()
+            else:
+                worker = await _Worker.start()
+                self._workers.add(worker)
+            job.worker = worker
+            try:
+                outcome, value = await worker.run(job.arguments)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                # The worker was stopped, by `cancel` or by a crash
+                self._workers.discard(worker)
+                await worker.process.wait()
+                if job.status == "running":
+                    job.result.set_exception(RuntimeError("The worker process died"))
+                    self._finish(job, "failed")
+                continue
+            finally:
+                job.worker = None
+            self._idle.append(worker)
+            if outcome == "done":
+                job.result.set_result(value)
+            else:
+                job.result.set_exception(value)
+            self._finish(job, outcome)
+
+
+def _solution_json(solution: Solution) -> dict[str, Any]:
+    return dict(
+        status=solution.status,
+        objective=solution.objective,
+        bound=solution.bound,
+        gap=solution.gap,
+        wall_time=solution.wall_time,
+        schedule=json.loads(
+            schedule_table(solution.schedule).to_json(orient="records")
+        ),
+    )
+
+
+def _job_json(service: SolveService, job_id: str) -> dict[str, Any]:
+    job = service.jobs[job_id]
+    reply: dict[str, Any] = dict(job=job.id, status=job.status)
+    if job.status == "done":
+        reply["solution"] = _solution_json(job.result.result())
+    elif job.status == "failed":
+        reply["error"] = repr(job.result.exception())
+    return reply
+
+
+def _submission(body: dict[str, Any]) -> dict[str, Any]:
+    """
+    The keyword arguments of `SolveService.submit` for a submitted problem:
+    the tables of `load_instance` as lists of records, and optionally
+    `settings` for `solve_assignment`, `options` and a `priority`.
+    """
+    if not isinstance(body, dict):
+        raise TypeError("The problem must be a JSON object")
+    instance = load_instance(
+        **{
+            name: pd.DataFrame(body.get(name, []), columns=columns)
+            for name, columns in TABLE_COLUMNS.items()
+        }
+    )
+    return dict(
+        instance,
+        **body.get("settings", {}),
+        options=SolverOptions(**body.get("options", {})),
+        priority=int(body.get("priority", 0)),
+    )
+
+
+async def _handle(
+    service: SolveService,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+):
+    """
+    Answer one HTTP request: `POST /jobs` submits a problem, `GET /jobs/<id>`
+    returns the status of a job and its solution once there is one, and
+    `DELETE /jobs/<id>` cancels it.
+    """
+    status, reply = HTTPStatus.OK, {}
+    try:
+        try:
+            method, target, _ = (await reader.readline()).decode().split(" ", 2)
+            headers = {}
+            while (line := (await reader.readline()).decode().strip()) != "":
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+            parts = target.split("?")[0].strip("/").split("/")
+            match method, parts:
+                case "POST", ["jobs"]:
+                    arguments = _submission(json.loads(body or b"{}"))
+                    job_id = service.submit(**arguments)
+                    status, reply = HTTPStatus.ACCEPTED, _job_json(service, job_id)
+                case ("GET" | "DELETE"), ["jobs", job_id] if job_id not in service.jobs:
+                    status, reply = HTTPStatus.NOT_FOUND, dict(error="Unknown job")
+                case "GET", ["jobs", job_id]:
+                    reply = _job_json(service, job_id)
+                case "DELETE", ["jobs", job_id]:
+                    reply = dict(job=job_id, cancelled=service.cancel(job_id))
+                case _:
+                    status, reply = HTTPStatus.NOT_FOUND, dict(error="Unknown route")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            # The client went away before it sent the whole request
+            return
+        except (ValueError, KeyError, TypeError) as error:
+            status, reply = HTTPStatus.BAD_REQUEST, dict(error=str(error))
+        except Exception as error:
+            status, reply = HTTPStatus.INTERNAL_SERVER_ERROR, dict(error=repr(error))
+
+        content = json.dumps(reply).encode()
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(content)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + content
+        )
+        with contextlib.suppress(ConnectionError):
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(
+    service: SolveService,
+    *,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    path: str | None = None,
+) -> asyncio.Server:
+    """
+    Start a small HTTP server in front of `service`, on a Unix socket at
+    `path` if given, otherwise on `host` and `port`. See `_handle` for the
+    routes; problems are submitted as in `_submission`.
+    """
+    handler = partial(_handle, service)
+    if path is not None:
+        return await asyncio.start_unix_server(handler, path)
+    return await asyncio.start_server(handler, host, port)
@@ -0,0 +1,103 @@
+from ._types import SolverOptions
+
+import pulp
+import re
+import tempfile
+from pathlib import Path
+
+
+def cbc_solver(
+    options: SolverOptions,
+    *,
+    warm_start: bool = False,
+    log_path: str | None = None,
+    preprocess: bool = True,
+) -> pulp.PULP_CBC_CMD:
+    cbc_options = [] if options.seed is None else [f"randomCbcSeed {options.seed}"]
+    if not preprocess:
+        cbc_options.append("preprocess off")
+    return pulp.PULP_CBC_CMD(
+        msg=False,
+        timeLimit=options.time_limit,
+        gapRel=options.relative_gap,
+        gapAbs=options.absolute_gap,
+        threads=options.threads,
+        warmStart=warm_start,
+        logPath=log_path,
+        options=cbc_options,
+    )
+
+
+def within_gap(objective: float, bound: float, options: SolverOptions) -> bool:
+    """
+    Whether `objective` is close enough to `bound` for CBC to stop under the
+    gaps of `options`. Without gaps only an objective reaching the bound is.
+    """
+    gap = max(bound - objective, 0)
+    return (
+        gap <= 1e-6
+        or (options.absolute_gap is not None and gap <= options.absolute_gap)
+        or (
+            options.relative_gap is not None
+            and gap <= options.relative_gap * abs(bound)
+        )
+    )
+
+
+def read_cbc_bound(log: str) -> float | None:
+    """
+    The best bound CBC proved on the objective, as reported at the end of its
+    log. When the search finished there is no separate bound, the optimum is
+    the bound.
+    """
+    if match := re.search(r"^(?:Upper|Lower) bound:\s+(\S+)", log, re.MULTILINE):
+        return float(match[1])
+    if "Optimal solution found" in log:
+        if match := re.search(r"^Objective value:\s+(\S+)", log, re.MULTILINE):
+            return float(match[1])
+    return None
+
+
+def solve_cbc(
+    problem: pulp.LpProblem, options: SolverOptions, *, warm_start: bool = False
+) -> float | None:
+    """
+    Solve `problem` with CBC and return the best bound proved on its objective,
+    in the sense of the problem, or None if CBC did not report one.
+
+    With `warm_start` the initial values of the variables are handed to CBC.
+    CBC flips the sign of the warm start's objective on maximisation problems
+    and then discards it, so those are solved as minimisation of the negated
+    objective instead.
+    """
+    flip = warm_start and problem.sense == pulp.LpMaximize
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = Path(directory) / "cbc.log"
+        solver = cbc_solver(options, warm_start=warm_start, log_path=str(log_path))
+        if flip:
+            problem.sense = pulp.LpMinimize
+            problem.setObjective(-problem.objective)
+        try:
+            try:
+                problem.solve(solver)
+            except pulp.PulpSolverError:
+                if not warm_start:
+                    raise
+                # CBC 2.10 can crash while preprocessing a warm-started model
+                problem.solve(
+                    cbc_solver(
+                        options,
+                        warm_start=True,
+                        log_path=str(log_path),
+                        preprocess=False,
+                    )
+                )
+        finally:
+            if flip:
+                problem.sense = pulp.LpMaximize
+                problem.setObjective(-problem.objective)
+        bound = read_cbc_bound(log_path.read_text())
+
+    if bound is not None and flip:
+        return -bound
+    return bound
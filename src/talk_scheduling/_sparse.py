@@ -0,0 +1,421 @@
+from dataclasses import dataclass
+
+from ._instance import ProblemInstance
+from ._model import ConflictEncoding
+from ._types import (
+    ScheduledTalk,
+    TimeSlot,
+    Solution,
+    SolverOptions,
+)
+
+import numpy as np
+import pulp
+import scipy.sparse as sp
+from scipy.optimize import Bounds, LinearConstraint, OptimizeResult, milp
+
+
+@dataclass(kw_only=True)
+class SparseModel:
+    """
+    The time-indexed formulation compiled into arrays for scipy.optimize.milp.
+
+    Columns are laid out by variable family: the start binaries, the attendee
+    assignment `x` (talk-major, `x_offset + talk * attendees + attendee`), the
+    family of the conflict encoding and finally `latest_end`. The objective is
+    negated because milp minimises.
+    """
+
+    c: np.ndarray
+    integrality: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    matrix: sp.csr_array
+    row_lower: np.ndarray
+    row_upper: np.ndarray
+    instance: ProblemInstance
+    start_talk: np.ndarray
+    start_location: np.ndarray
+    start_slot: np.ndarray
+    x_offset: int
+
+
+def _block(
+    rows: np.ndarray,
+    columns: np.ndarray,
+    values: np.ndarray | float,
+    *,
+    number_of_rows: int,
+    number_of_columns: int,
+) -> sp.csr_array:
+    values = np.broadcast_to(values, rows.shape)
+    return sp.csr_array(
+        (values, (rows, columns)), shape=(number_of_rows, number_of_columns)
+    )
+
+
+def _compress_rows(
+    keys: np.ndarray, columns: np.ndarray, values: np.ndarray, *, min_entries: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Number the distinct `keys` as rows and drop rows with fewer than
+    `min_entries` entries, those can never be violated.
+    """
+    unique_keys, rows = np.unique(keys, return_inverse=True)
+    counts = np.bincount(rows, minlength=len(unique_keys))
+    kept = counts >= min_entries
+    new_row = np.cumsum(kept) - 1
+    entries = kept[rows]
+    return new_row[rows[entries]], columns[entries], values[entries], int(kept.sum())
+
+
+# The names of `pulp.LpStatus` for the status codes of milp, so that every
+# backend reports alike. A time limit with a solution counts as optimal, as
+# with CBC through PuLP.
+MILP_STATUS = {
+    0: pulp.LpStatusOptimal,
+    1: pulp.LpStatusNotSolved,
+    2: pulp.LpStatusInfeasible,
+    3: pulp.LpStatusUnbounded,
+    4: pulp.LpStatusUndefined,
+}
+
+
+def build_sparse_model(
+    instance: ProblemInstance, *, conflict_encoding: ConflictEncoding = "pairwise"
+) -> SparseModel:
+    """
+    Compile the time-indexed model of `build_time_indexed_model` without
+    PuLP. As there, the per-slot encoding has a presence column and a linking
+    row per talk, attendee and slot at which several talks may run, so it is
+    only smaller than the pairwise encoding when many talks compete for few
+    slots.
+    """
+    weights = instance.weights
+    number_of_talks, number_of_attendees = len(instance.talks), len(instance.attendees)
+    durations = instance.duration
+    capacities = instance.capacity
+
+    # start describes whether a talk starts at a specific location and slot
+    start_talk, start_location, start_slot = np.nonzero(instance.allowed_starts)
+    number_of_starts = len(start_slot)
+    start_end = start_slot + durations[start_talk]
+    horizon = int(start_end.max(initial=0))
+
+    # Every start variable covers the slots from its start up to its end
+    cover_length = durations[start_talk]
+    cover_start = np.repeat(np.arange(number_of_starts), cover_length)
+    cover_slot = np.repeat(start_slot, cover_length) + (
+        np.arange(cover_length.sum())
+        - np.repeat(np.cumsum(cover_length) - cover_length, cover_length)
+    )
+    cover_talk = start_talk[cover_start]
+    # running[talk * horizon + u] sums the start variables that make talk run at u
+    running = sp.csr_array(
+        (np.ones(len(cover_start)), (cover_talk * horizon + cover_slot, cover_start)),
+        shape=(number_of_talks * horizon, number_of_starts),
+    )
+    running_keys = np.unique(cover_talk * horizon + cover_slot)
+    running_talk, running_slot = np.divmod(running_keys, horizon)
+    # Only slots at which several talks may run can hold a conflict
+    shared = np.bincount(running_slot, minlength=horizon)[running_slot] > 1
+    shared_keys = running_keys[shared]
+    shared_talk, shared_slot = running_talk[shared], running_slot[shared]
+
+    x_offset = number_of_starts
+    family_offset = x_offset + number_of_talks * number_of_attendees
+
+    match conflict_encoding:
+        case "pairwise":
+            # Talks conflict if they run in the same slot
+            pair_i, pair_j, pair_slot = [], [], []
+            for u in np.unique(running_slot):
+                talks_at_u = running_talk[running_slot == u]
+                i, j = np.triu_indices(len(talks_at_u), 1)
+                pair_i.append(talks_at_u[i])
+                pair_j.append(talks_at_u[j])
+                pair_slot.append(np.full(len(i), u))
+            pair_i = np.concatenate(pair_i or [np.zeros(0, dtype=int)])
+            pair_j = np.concatenate(pair_j or [np.zeros(0, dtype=int)])
+            pair_slot = np.concatenate(pair_slot or [np.zeros(0, dtype=int)])
+            conflict_pairs, conflict_of_row = np.unique(
+                pair_i * number_of_talks + pair_j, return_inverse=True
+            )
+            conflict_i, conflict_j = np.divmod(conflict_pairs, number_of_talks)
+            family_size = len(conflict_pairs)
+        case "per_slot":
+            # present describes whether an attendee sits in a talk at a slot
+            family_size = len(shared_keys) * number_of_attendees
+        case _:
+            raise ValueError(f"Unknown conflict encoding: {conflict_encoding}")
+
+    latest_end = family_offset + family_size
+    number_of_columns = latest_end + 1
+    blocks: list[tuple[sp.csr_array, np.ndarray, np.ndarray]] = []
+
+    def add(block: sp.csr_array, lower: float, upper: float):
+        rows = block.shape[0]
+        blocks.append((block, np.full(rows, lower), np.full(rows, upper)))
+
+    starts = np.arange(number_of_starts)
+    x_talk = np.repeat(np.arange(number_of_talks), number_of_attendees)
+    x_attendee = np.tile(np.arange(number_of_attendees), number_of_talks)
+    x_columns = x_offset + x_talk * number_of_attendees + x_attendee
+
+    # Each talk must be scheduled exactly once
+    add(
+        _block(
+            start_talk,
+            starts,
+            1.0,
+            number_of_rows=number_of_talks,
+            number_of_columns=number_of_columns,
+        ),
+        1,
+        1,
+    )
+
+    # Talks may not overlap in the same location
+    rows, columns, values, number_of_rows = _compress_rows(
+        start_location[cover_start] * horizon + cover_slot,
+        cover_start,
+        np.ones(len(cover_start)),
+        min_entries=2,
+    )
+    add(
+        _block(
+            rows,
+            columns,
+            values,
+            number_of_rows=number_of_rows,
+            number_of_columns=number_of_columns,
+        ),
+        -np.inf,
+        1,
+    )
+
+    # latest_end is after the end of every talk
+    add(
+        _block(
+            np.concatenate([start_talk, np.arange(number_of_talks)]),
+            np.concatenate([starts, np.full(number_of_talks, latest_end)]),
+            np.concatenate([start_end, -np.ones(number_of_talks)]),
+            number_of_rows=number_of_talks,
+            number_of_columns=number_of_columns,
+        ),
+        -np.inf,
+        0,
+    )
+
+    # Attendees must fit into the room the talk is held in
+    add(
+        _block(
+            np.concatenate([x_talk, start_talk]),
+            np.concatenate([x_columns, starts]),
+            np.concatenate(
+                [np.ones(len(x_columns)), -capacities[start_location].astype(float)]
+            ),
+            number_of_rows=number_of_talks,
+            number_of_columns=number_of_columns,
+        ),
+        -np.inf,
+        0,
+    )
+
+    # Each attendee can be only at one talk at a time
+    match conflict_encoding:
+        case "pairwise":
+            both_running = (
+                running[pair_i * horizon + pair_slot]
+                + running[pair_j * horizon + pair_slot]
+            ).tocoo()
+            number_of_rows = len(pair_slot)
+            add(
+                _block(
+                    np.concatenate([both_running.row, np.arange(number_of_rows)]),
+                    np.concatenate([both_running.col, family_offset + conflict_of_row]),
+                    np.concatenate([both_running.data, -np.ones(number_of_rows)]),
+                    number_of_rows=number_of_rows,
+                    number_of_columns=number_of_columns,
+                ),
+                -np.inf,
+                1,
+            )
+
+            pair = np.repeat(np.arange(len(conflict_pairs)), number_of_attendees)
+            attendee = np.tile(np.arange(number_of_attendees), len(conflict_pairs))
+            row = np.arange(len(pair))
+            add(
+                _block(
+                    np.concatenate([row, row, row]),
+                    np.concatenate(
+                        [
+                            x_offset
+                            + conflict_i[pair] * number_of_attendees
+                            + attendee,
+                            x_offset
+                            + conflict_j[pair] * number_of_attendees
+                            + attendee,
+                            family_offset + pair,
+                        ]
+                    ),
+                    1.0,
+                    number_of_rows=len(row),
+                    number_of_columns=number_of_columns,
+                ),
+                -np.inf,
+                2,
+            )
+        case "per_slot":
+            # x[talk, attendee] + running[talk, u] - 1 <= present[talk, attendee, u]
+            is_running = sp.kron(
+                running[shared_keys], np.ones((number_of_attendees, 1)), format="coo"
+            )
+            key = np.repeat(np.arange(len(shared_keys)), number_of_attendees)
+            attendee = np.tile(np.arange(number_of_attendees), len(shared_keys))
+            row = np.arange(len(key))
+            add(
+                _block(
+                    np.concatenate([is_running.row, row, row]),
+                    np.concatenate(
+                        [
+                            is_running.col,
+                            x_offset
+                            + shared_talk[key] * number_of_attendees
+                            + attendee,
+                            family_offset + row,
+                        ]
+                    ),
+                    np.concatenate(
+                        [is_running.data, np.ones(len(row)), -np.ones(len(row))]
+                    ),
+                    number_of_rows=len(row),
+                    number_of_columns=number_of_columns,
+                ),
+                -np.inf,
+                1,
+            )
+
+            rows, columns, values, number_of_rows = _compress_rows(
+                shared_slot[key] * number_of_attendees + attendee,
+                family_offset + row,
+                np.ones(len(row)),
+                min_entries=2,
+            )
+            add(
+                _block(
+                    rows,
+                    columns,
+                    values,
+                    number_of_rows=number_of_rows,
+                    number_of_columns=number_of_columns,
+                ),
+                -np.inf,
+                1,
+            )
+
+    # Objective function (maximize total visitor preference), 2nd: minimize
+    # latest end
+    c = np.zeros(number_of_columns)
+    c[x_columns] = -weights.T.ravel()
+    c[latest_end] = 0.001
+
+    lower = np.zeros(number_of_columns)
+    upper = np.ones(number_of_columns)
+    upper[latest_end] = horizon
+    # Each speaker must attend their own talk
+    speaker_columns = np.arange(number_of_talks) * number_of_attendees + instance.speaker
+    lower[x_offset + speaker_columns] = 1
+
+    integrality = np.ones(number_of_columns)
+    if conflict_encoding == "per_slot":
+        integrality[family_offset:latest_end] = 0
+
+    return SparseModel(
+        c=c,
+        integrality=integrality,
+        lower=lower,
+        upper=upper,
+        matrix=sp.vstack([block for block, _, _ in blocks], format="csr"),
+        row_lower=np.concatenate([lower for _, lower, _ in blocks]),
+        row_upper=np.concatenate([upper for _, _, upper in blocks]),
+        instance=instance,
+        start_talk=start_talk,
+        start_location=start_location,
+        start_slot=start_slot,
+        x_offset=x_offset,
+    )
+
+
+def solve_sparse_model(model: SparseModel, options: SolverOptions) -> OptimizeResult:
+    """
+    Solve `model` with HiGHS. The scipy interface exposes neither thread count,
+    random seed nor an absolute gap, so those options must be left unset.
+    """
+    for name in ("threads", "seed", "absolute_gap"):
+        if getattr(options, name) is not None:
+            raise ValueError(f"The highs backend does not support the {name} option")
+
+    milp_options = {"time_limit": options.time_limit, "disp": False}
+    if options.relative_gap is not None:
+        milp_options["mip_rel_gap"] = options.relative_gap
+    return milp(
+        model.c,
+        integrality=model.integrality,
+        bounds=Bounds(model.lower, model.upper),
+        constraints=LinearConstraint(model.matrix, model.row_lower, model.row_upper),
+        options=milp_options,
+    )
+
+
+def extract_sparse_schedule(
+    model: SparseModel, values: np.ndarray
+) -> list[ScheduledTalk]:
+    instance = model.instance
+    number_of_talks, number_of_attendees = len(instance.talks), len(instance.attendees)
+    x = values[
+        model.x_offset : model.x_offset + number_of_talks * number_of_attendees
+    ].reshape(number_of_talks, number_of_attendees)
+
+    schedule: list[ScheduledTalk] = []
+    for start in np.flatnonzero(values[: len(model.start_slot)] > 0.5):
+        talk = model.start_talk[start]
+        schedule.append(
+            ScheduledTalk(
+                talk=instance.talks[talk],
+                time_slot=TimeSlot(int(model.start_slot[start])),
+                location=instance.locations[model.start_location[start]],
+                attendees=[
+                    instance.attendees[attendee]
+                    for attendee in np.flatnonzero(x[talk] > 0.5)
+                ],
+            )
+        )
+    return schedule
+
+
+def solve_sparse(
+    *,
+    instance: ProblemInstance,
+    conflict_encoding: ConflictEncoding = "pairwise",
+    options: SolverOptions = SolverOptions(),
+) -> Solution:
+    model = build_sparse_model(instance, conflict_encoding=conflict_encoding)
+    result = solve_sparse_model(model, options)
+    # milp minimises the negated objective, so its dual bound is an upper bound
+    dual_bound = getattr(result, "mip_dual_bound", None)
+    bound = None if dual_bound is None else -dual_bound
+
+    print(f"Status: {result.message}")
+    status = pulp.LpStatus[MILP_STATUS[result.status]]
+    if result.x is None:
+        return Solution(schedule=[], status=status, objective=None, bound=bound)
+    print(f"Objective: {-result.fun}")
+    print("Rows", model.matrix.shape[0], "Columns", model.matrix.shape[1])
+
+    return Solution(
+        schedule=extract_sparse_schedule(model, result.x),
+        status=pulp.LpStatus[pulp.LpStatusOptimal],
+        objective=-result.fun,
+        bound=bound,
+    )
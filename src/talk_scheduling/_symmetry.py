@@ -0,0 +1,142 @@
+from ._instance import ProblemInstance
+from ._model import Model
+from ._types import (
+    Location,
+    Talk,
+    ScheduledTalk,
+)
+
+import pulp
+from collections import defaultdict
+from collections.abc import Callable, Hashable
+from dataclasses import replace
+from typing import TypeVar
+
+Item = TypeVar("Item")
+
+
+def equivalence_classes(
+    items: list[Item], key: Callable[[Item], Hashable]
+) -> list[list[int]]:
+    """
+    Group the positions of `items` with equal `key`, keeping their order. Only
+    groups with more than one item are returned, the others carry no symmetry.
+    """
+    groups: dict[Hashable, list[int]] = defaultdict(list)
+    for index, item in enumerate(items):
+        groups[key(item)].append(index)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def room_classes(locations: list[Location]) -> list[list[int]]:
+    """
+    Rooms with the same capacity and allowed times, any schedule stays feasible
+    when their contents are swapped.
+    """
+    return equivalence_classes(
+        locations,
+        lambda location: (
+            location.capacity,
+            frozenset(location.allowed_times.times),
+        ),
+    )
+
+
+def talk_classes(talks: list[Talk]) -> list[list[int]]:
+    """
+    Talks that only differ in their title, such as repeated sessions.
+    """
+    return equivalence_classes(
+        talks,
+        lambda talk: (
+            talk.speaker,
+            talk.duration,
+            frozenset(talk.visitor_preferences.items()),
+        ),
+    )
+
+
+def add_symmetry_breaking(model: Model) -> int:
+    """
+    Add constraints that keep a single representative of every schedule that
+    only differs by swapping interchangeable rooms or talks. Returns the number
+    of symmetries found, every room or talk beyond the first of its class
+    counts once.
+
+    Talks of a class are held in the order they are listed. As they share
+    their speaker they cannot overlap, so each one ends before the next one
+    starts. Rooms of a class are used in order of the first talk they hold:
+    a talk may only go into a room if the previous room of the class already
+    holds an earlier talk.
+    """
+    instance = model.instance
+    duration = instance.duration.tolist()
+    symmetries = 0
+    for talks in talk_classes(instance.talks):
+        symmetries += len(talks) - 1
+        for talk_i, talk_j in zip(talks, talks[1:]):
+            model.problem.addConstraint(
+                model.start_of[talk_i] + duration[talk_i] <= model.start_of[talk_j]
+            )
+
+    for rooms in room_classes(instance.locations):
+        symmetries += len(rooms) - 1
+        for talk in range(len(instance.talks)):
+            for previous, room in zip(rooms, rooms[1:]):
+                if (talk, room) not in model.is_scheduled:
+                    continue
+                model.problem.addConstraint(
+                    model.is_scheduled[talk, room]
+                    <= pulp.lpSum(
+                        model.is_scheduled[earlier, previous]
+                        for earlier in range(talk)
+                        if (earlier, previous) in model.is_scheduled
+                    )
+                )
+
+    return symmetries
+
+
+def canonical_schedule(
+    schedule: list[ScheduledTalk], instance: ProblemInstance
+) -> list[ScheduledTalk]:
+    """
+    The representative of `schedule` that satisfies the constraints of
+    `add_symmetry_breaking`, so it can still be used as a warm start.
+    """
+    talks, locations = instance.talks, instance.locations
+    placed = {instance.talk_index[scheduled.talk]: scheduled for scheduled in schedule}
+
+    # Hand the placements of interchangeable talks out in order of their start
+    for group in talk_classes(talks):
+        placements = sorted(
+            (placed[talk] for talk in group),
+            key=lambda scheduled: scheduled.time_slot,
+        )
+        for talk, scheduled in zip(group, placements):
+            placed[talk] = replace(scheduled, talk=talks[talk])
+
+    # Relabel interchangeable rooms in order of the first talk they hold
+    room_of = {
+        talk: instance.location_index[scheduled.location]
+        for talk, scheduled in placed.items()
+    }
+    relabel: dict[int, int] = {}
+    for rooms in room_classes(locations):
+        first_talk = {
+            room: min(
+                (talk for talk, held_in in room_of.items() if held_in == room),
+                default=len(talks),
+            )
+            for room in rooms
+        }
+        relabel.update(zip(sorted(rooms, key=first_talk.__getitem__), rooms))
+
+    return [
+        replace(
+            placed[talk],
+            location=locations[relabel.get(room_of[talk], room_of[talk])],
+        )
+        for talk in range(len(talks))
+        if talk in placed
+    ]
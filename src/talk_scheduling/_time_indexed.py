@@ -0,0 +1,407 @@
+from dataclasses import dataclass
+
+from ._aggregation import group_attendees
+from ._instance import ProblemInstance
+from ._model import ConflictEncoding, Model
+
+import numpy as np
+import pulp
+from collections import defaultdict
+from collections.abc import Iterable
+from itertools import combinations
+
+
+@dataclass(kw_only=True)
+class Placement:
+    """
+    Time-indexed placement of talks into rooms and start slots, keyed by the
+    ids of the instance.
+
+    `running[talk][u]` is 1 exactly when `talk` occupies slot `u` and
+    `talks_at[u]` lists every talk that may occupy slot `u`.
+    """
+
+    start: dict[tuple[int, int, int], pulp.LpVariable]
+    is_scheduled: dict[tuple[int, int], pulp.LpAffineExpression]
+    start_of: dict[int, pulp.LpAffineExpression]
+    end_of: dict[int, pulp.LpAffineExpression]
+    running: dict[int, dict[int, pulp.LpAffineExpression]]
+    talks_at: dict[int, list[int]]
+    latest_possible_end: int
+
+
+def add_placement(
+    problem: pulp.LpProblem,
+    instance: ProblemInstance,
+    *,
+    rooms_open: np.ndarray | None = None,
+) -> Placement:
+    """
+    Add start variables to `problem` such that every talk is scheduled exactly
+    once and talks in the same room do not overlap.
+
+    With `rooms_open`, the locations of `instance` stand for pools of rooms in
+    order of decreasing capacity, see `pool_rooms`. Instead of not
+    overlapping, the talks in the first k pools at a slot are bounded by
+    `rooms_open[k - 1, slot]`, the rooms of these pools that are open then.
+    """
+    talks = range(len(instance.talks))
+    locations = range(len(instance.locations))
+    duration = instance.duration.tolist()
+    slots = instance.domains()
+    latest_possible_end = max(
+        (ss[-1] + duration[talk] for (talk, _), ss in slots.items()),
+        default=0,
+    )
+
+    # start describes whether a talk starts at a specific location and slot
+    start = pulp.LpVariable.dicts(
+        "start",
+        (
+            (talk, location, slot)
+            for (talk, location), ss in slots.items()
+            for slot in ss
+        ),
+        0,
+        1,
+        cat=pulp.LpBinary,
+    )
+
+    is_scheduled = {
+        (talk, location): pulp.lpSum(start[talk, location, slot] for slot in ss)
+        for (talk, location), ss in slots.items()
+    }
+    start_of = {
+        talk: pulp.lpSum(
+            slot * start[talk, location, slot]
+            for location in locations
+            for slot in slots.get((talk, location), [])
+        )
+        for talk in talks
+    }
+    end_of = {talk: start_of[talk] + duration[talk] for talk in talks}
+
+    # running lists the start variables that make a talk occupy a slot
+    running: dict[int, dict[int, list[pulp.LpVariable]]] = {
+        talk: defaultdict(list) for talk in talks
+    }
+    occupying: dict[int, dict[int, list[pulp.LpVariable]]] = {
+        location: defaultdict(list) for location in locations
+    }
+    for (talk, location), ss in slots.items():
+        for slot in ss:
+            for u in range(slot, slot + duration[talk]):
+                running[talk][u].append(start[talk, location, slot])
+                occupying[location][u].append(start[talk, location, slot])
+
+    talks_at = defaultdict(list)
+    for talk in talks:
+        for u in running[talk]:
+            talks_at[u].append(talk)
+
+    # Each talk must be scheduled exactly once
+    for talk in talks:
+        problem += (
+            pulp.lpSum(
+                is_scheduled[talk, location]
+                for location in locations
+                if (talk, location) in is_scheduled
+            )
+            == 1
+        )
+
+    if rooms_open is None:
+        # Talks may not overlap in the same location
+        for location in locations:
+            for u, variables in occupying[location].items():
+                if len(variables) > 1:
+                    problem += pulp.lpSum(variables) <= 1
+    else:
+        # Talks that need at least some capacity must find enough such rooms
+        for u in talks_at:
+            needing: list[pulp.LpVariable] = []
+            for location in locations:
+                needing += occupying[location].get(u, [])
+                if len(needing) > rooms_open[location, u]:
+                    problem += pulp.lpSum(needing) <= int(rooms_open[location, u])
+
+    return Placement(
+        start=start,
+        is_scheduled=is_scheduled,
+        start_of=start_of,
+        end_of=end_of,
+        running={
+            talk: {u: pulp.lpSum(variables) for u, variables in running[talk].items()}
+            for talk in talks
+        },
+        talks_at=talks_at,
+        latest_possible_end=latest_possible_end,
+    )
+
+
+def add_conflicts(
+    problem: pulp.LpProblem,
+    placement: Placement,
+    pairs: Iterable[tuple[int, int]],
+) -> dict[tuple[int, int], pulp.LpVariable]:
+    """
+    Add binaries that are forced to 1 whenever the talks of a pair run in the
+    same slot. Pairs that can never overlap get no variable.
+    """
+    shared_slots = {
+        (talk_i, talk_j): sorted(
+            placement.running[talk_i].keys() & placement.running[talk_j].keys()
+        )
+        for talk_i, talk_j in pairs
+    }
+    conflicts = pulp.LpVariable.dicts(
+        "conflicts",
+        (pair for pair, shared in shared_slots.items() if shared),
+        0,
+        1,
+        cat=pulp.LpBinary,
+    )
+    for (talk_i, talk_j), con in conflicts.items():
+        for u in shared_slots[talk_i, talk_j]:
+            problem += (
+                placement.running[talk_i][u] + placement.running[talk_j][u] - 1 <= con
+            )
+    return conflicts
+
+
+def build_time_indexed_model(
+    *,
+    instance: ProblemInstance,
+    conflict_encoding: ConflictEncoding = "pairwise",
+    aggregate_attendees: bool = False,
+    sparse_preferences: bool = False,
+    rooms_open: np.ndarray | None = None,
+) -> Model:
+    """
+    `conflict_encoding="pairwise"` shares one binary per pair of talks that
+    may overlap between all attendees, with one row per attendee and pair.
+    `"per_slot"` needs no pair binaries, but seating an attendee at a slot is
+    the product of `x` and the talk running then, which takes a variable and
+    a row per talk, attendee and slot to linearise. Per attendee, it has
+    about as many rows as talks times the slots they may run at, where the
+    pairwise encoding has one per pair of talks that may overlap. It only
+    pays off when many talks compete for few slots, as in a crowded day of
+    short talks; over long horizons it is several times larger, so pairwise
+    stays the default.
+
+    With `sparse_preferences`, `x` only exists for explicit preferences and
+    speakers. Everyone else joins a talk through its `filler` count at the
+    default preference; fillers are seated when the schedule is extracted.
+    `rooms_open` places talks into pools of rooms, see `add_placement`.
+    """
+    if sparse_preferences and aggregate_attendees:
+        raise ValueError(
+            "Sparse preferences and attendee aggregation exclude each other"
+        )
+    if aggregate_attendees:
+        attendees, attendee_classes = group_attendees(instance)
+    else:
+        attendees, attendee_classes = list(range(len(instance.attendees))), []
+    talks = range(len(instance.talks))
+    speaker = instance.speaker.tolist()
+    capacity = instance.capacity.tolist()
+    # weight[talk][attendee], with the default for unrated talks
+    weight = instance.weights.T.tolist()
+
+    problem = pulp.LpProblem("TalkScheduling", pulp.LpMaximize)
+
+    placement = add_placement(problem, instance, rooms_open=rooms_open)
+    start_of = placement.start_of
+    running = placement.running
+    talks_at = placement.talks_at
+
+    attendees_of = {
+        talk: (
+            sorted({*instance.rated_by(talk), speaker[talk]})
+            if sparse_preferences
+            else attendees
+        )
+        for talk in talks
+    }
+    # x describes whether an attendee is assigned to a specific talk
+    x = pulp.LpVariable.dicts(
+        "x",
+        ((talk, attendee) for talk in talks for attendee in attendees_of[talk]),
+        0,
+        1,
+        cat=pulp.LpBinary,
+    )
+
+    # filler counts the attendees of a talk that join at the default preference
+    filler = {
+        talk: pulp.LpVariable(
+            f"filler_{talk}", 0, len(instance.attendees), cat=pulp.LpInteger
+        )
+        for talk in talks
+        if sparse_preferences
+    }
+
+    # class_count describes how many members of a class attend a specific talk
+    class_count = {
+        (talk, attendee_class): pulp.LpVariable(
+            f"class_count_{talk}_{attendee_class.name}",
+            0,
+            attendee_class.size,
+            cat=pulp.LpInteger,
+        )
+        for talk in talks
+        for attendee_class in attendee_classes
+    }
+
+    # Objective function (maximize total visitor preference)
+    preference_sum = (
+        pulp.lpSum(
+            weight[talk][attendee] * variable
+            for (talk, attendee), variable in x.items()
+        )
+        + pulp.lpSum(0.1 * count for count in filler.values())
+        + pulp.lpSum(
+            attendee_class.preferences[talk] * class_count[talk, attendee_class]
+            for talk in talks
+            for attendee_class in attendee_classes
+        )
+    )
+    # 2nd Objective: Minimize latest end
+    latest_end = pulp.LpVariable(
+        "latest_end", 0, placement.latest_possible_end, cat=pulp.LpInteger
+    )
+    for talk in talks:
+        problem += placement.end_of[talk] <= latest_end
+
+    problem += preference_sum - 0.001 * latest_end
+
+    # Each attendee can be only at one talk at a time
+    conflicts = {}
+    match conflict_encoding:
+        case "pairwise":
+            conflicts = add_conflicts(problem, placement, combinations(talks, 2))
+
+            for attendee in attendees:
+                for (talk_i, talk_j), con in conflicts.items():
+                    if (talk_i, attendee) in x and (talk_j, attendee) in x:
+                        problem += (
+                            x[(talk_i, attendee)] + x[(talk_j, attendee)] <= 2 - con
+                        )
+        case "per_slot":
+            # Only slots at which several talks may run can hold a conflict
+            shared = {
+                u for u, talks_running in talks_at.items() if len(talks_running) > 1
+            }
+            # present describes whether an attendee sits in a talk at a slot,
+            # it only needs to be pushed up, so it can stay continuous
+            present = pulp.LpVariable.dicts(
+                "present",
+                (
+                    (talk, attendee, u)
+                    for talk in talks
+                    for attendee in attendees_of[talk]
+                    for u in running[talk]
+                    if u in shared
+                ),
+                0,
+                1,
+            )
+            for (talk, attendee, u), variable in present.items():
+                problem += x[talk, attendee] + running[talk][u] - 1 <= variable
+            for attendee in attendees:
+                for u in shared:
+                    seated = [
+                        present[talk, attendee, u]
+                        for talk in talks_at[u]
+                        if (talk, attendee) in x
+                    ]
+                    if len(seated) > 1:
+                        problem += pulp.lpSum(seated) <= 1
+        case _:
+            raise ValueError(f"Unknown conflict encoding: {conflict_encoding}")
+
+    # Members of a class can only be at one talk at a time. Talks running at
+    # the same slot form a clique of the interval graph, so bounding every
+    # clique by the class size guarantees that the counts can be split up
+    # among the members.
+    class_present = pulp.LpVariable.dicts(
+        "class_present",
+        (
+            (talk, attendee_class, u)
+            for talk in talks
+            for attendee_class in attendee_classes
+            for u in running[talk]
+        ),
+        0,
+    )
+    for (talk, attendee_class), count in class_count.items():
+        for u, is_running in running[talk].items():
+            problem += (
+                count - attendee_class.size * (1 - is_running)
+                <= class_present[talk, attendee_class, u]
+            )
+    for attendee_class in attendee_classes:
+        for u, talks_running in talks_at.items():
+            if len(talks_running) > 1:
+                problem += (
+                    pulp.lpSum(
+                        class_present[talk, attendee_class, u] for talk in talks_running
+                    )
+                    <= attendee_class.size
+                )
+
+    # Fillers are drawn from all attendees, so the same clique argument bounds
+    # the fillers of talks running at the same slot by the number of attendees.
+    # Attendees seated through x are not subtracted, this only relaxes the model.
+    filler_present = pulp.LpVariable.dicts(
+        "filler_present",
+        ((talk, u) for talk in filler for u in running[talk]),
+        0,
+    )
+    for talk, count in filler.items():
+        for u, is_running in running[talk].items():
+            problem += (
+                count - len(instance.attendees) * (1 - is_running)
+                <= filler_present[talk, u]
+            )
+    if filler:
+        for u, talks_running in talks_at.items():
+            if len(talks_running) > 1:
+                problem += pulp.lpSum(
+                    filler_present[talk, u] for talk in talks_running
+                ) <= len(instance.attendees)
+
+    # Each speaker must attend their own talk
+    for talk in talks:
+        problem += x[talk, speaker[talk]] == 1
+
+    # Attendees must fit into the room the talk is held in
+    for talk in talks:
+        number_of_attendees = pulp.lpSum(
+            x[talk, attendee] for attendee in attendees_of[talk]
+        ) + pulp.lpSum(
+            class_count[talk, attendee_class] for attendee_class in attendee_classes
+        )
+        if talk in filler:
+            number_of_attendees += filler[talk]
+        problem += number_of_attendees <= pulp.lpSum(
+            capacity[location] * placement.is_scheduled[talk, location]
+            for location in range(len(instance.locations))
+            if (talk, location) in placement.is_scheduled
+        )
+
+    return Model(
+        problem=problem,
+        instance=instance,
+        attendees=attendees,
+        start_of=start_of,
+        is_scheduled=placement.is_scheduled,
+        x=x,
+        preference_sum=preference_sum,
+        latest_end=latest_end,
+        conflicts=conflicts,
+        start=placement.start,
+        attendee_classes=attendee_classes,
+        class_count=class_count,
+        filler=filler,
+    )
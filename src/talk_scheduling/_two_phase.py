@@ -0,0 +1,246 @@
+from ._instance import ProblemInstance
+from ._model import schedule_objective
+from ._prechecks import preference_upper_bound
+from ._solvers import solve_cbc
+from ._time_indexed import Placement, add_conflicts, add_placement
+from ._types import (
+    ScheduledTalk,
+    TimeSlot,
+    Solution,
+    SolverOptions,
+)
+
+import numpy as np
+import pulp
+
+
+def timetable_surrogate(instance: ProblemInstance) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The terms of a surrogate objective for placing talks without deciding who
+    attends them: `room_value[talk, location]` is the best attendance the
+    room allows and `overlap_loss[talk_i, talk_j]` what the attendees lose if
+    both talks overlap, the smaller of the two preferences of everyone.
+    """
+    weights = instance.weights
+    ranked = -np.sort(-weights, axis=0)
+    # best[k, talk] is the best attendance of `talk` in a room with k seats
+    best = np.vstack([np.zeros(len(instance.talks)), np.cumsum(ranked, axis=0)])
+    capacity = np.minimum(instance.capacity, len(instance.attendees))
+    room_value = best[capacity].T
+
+    overlap_loss = np.zeros((len(instance.talks), len(instance.talks)))
+    for talk_i in range(len(instance.talks)):
+        # The smaller preference of every attendee for talk_i and each later talk
+        losses = np.minimum(weights[:, talk_i, None], weights[:, talk_i + 1 :])
+        overlap_loss[talk_i, talk_i + 1 :] = losses.sum(axis=0)
+    overlap_loss += overlap_loss.T
+    return room_value, overlap_loss
+
+
+def build_timetable_model(
+    instance: ProblemInstance,
+) -> tuple[pulp.LpProblem, Placement]:
+    """
+    Phase 1: place talks without deciding who attends them.
+
+    The surrogate objective of `timetable_surrogate` rewards rooms by the
+    best attendance they allow and penalises overlapping talks by the
+    preference an attendee interested in both loses.
+    """
+    problem = pulp.LpProblem("Timetable", pulp.LpMaximize)
+    placement = add_placement(problem, instance)
+
+    values, losses = timetable_surrogate(instance)
+    room_value = {
+        (talk, location): float(values[talk, location])
+        for talk, location in placement.is_scheduled
+    }
+    overlap_loss = {
+        (talk_i, talk_j): float(losses[talk_i, talk_j])
+        for talk_i in range(len(instance.talks))
+        for talk_j in range(talk_i + 1, len(instance.talks))
+    }
+
+    conflicts = add_conflicts(problem, placement, overlap_loss.keys())
+
+    # Speakers can not give two talks at the same time
+    speaker = instance.speaker.tolist()
+    for (talk_i, talk_j), con in conflicts.items():
+        if speaker[talk_i] == speaker[talk_j]:
+            problem += con == 0
+
+    latest_end = pulp.LpVariable(
+        "latest_end", 0, placement.latest_possible_end, cat=pulp.LpInteger
+    )
+    for end_of in placement.end_of.values():
+        problem += end_of <= latest_end
+
+    problem += (
+        pulp.lpSum(
+            value * placement.is_scheduled[pair] for pair, value in room_value.items()
+        )
+        - pulp.lpSum(overlap_loss[pair] * con for pair, con in conflicts.items())
+        - 0.001 * latest_end
+    )
+    return problem, placement
+
+
+def assign_attendees(
+    starts: np.ndarray, durations: np.ndarray, weights: np.ndarray
+) -> np.ndarray:
+    """
+    Phase 2: pick the most valuable set of non-overlapping talks for every
+    attendee at once.
+
+    This is the weighted interval scheduling dynamic program, vectorised over
+    the rows of `weights`. Returns a boolean (attendees x talks) matrix.
+    """
+    number_of_attendees, number_of_talks = weights.shape
+    ends = starts + durations
+    order = np.argsort(ends, kind="stable")
+    sorted_starts, sorted_ends = starts[order], ends[order]
+    # previous[k] is the number of talks (in end order) that end before talk k starts
+    previous = np.searchsorted(sorted_ends, sorted_starts, side="right")
+
+    best = np.zeros((number_of_talks + 1, number_of_attendees))
+    take = np.zeros((number_of_talks, number_of_attendees), dtype=bool)
+    for k in range(number_of_talks):
+        with_talk = weights[:, order[k]] + best[previous[k]]
+        take[k] = with_talk > best[k]
+        best[k + 1] = np.where(take[k], with_talk, best[k])
+
+    chosen = np.zeros((number_of_attendees, number_of_talks), dtype=bool)
+    position = np.full(number_of_attendees, number_of_talks)
+    for k in range(number_of_talks, 0, -1):
+        at_k = position == k
+        taken = at_k & take[k - 1]
+        chosen[taken, order[k - 1]] = True
+        position[taken] = previous[k - 1]
+        position[at_k & ~take[k - 1]] = k - 1
+    return chosen
+
+
+def repair_capacity(
+    chosen: np.ndarray,
+    weights: np.ndarray,
+    capacities: np.ndarray,
+    overlapping: np.ndarray,
+    is_speaker: np.ndarray,
+) -> np.ndarray:
+    """
+    Make the attendee assignment respect room capacities.
+
+    Overfull talks drop the listeners with the lowest preference, speakers
+    always stay. Afterwards spare seats are handed out to the attendees that
+    like the talk the most, are free at that time and would gain from it.
+    """
+    chosen = chosen.copy()
+
+    for talk in range(chosen.shape[1]):
+        attending = np.flatnonzero(chosen[:, talk])
+        excess = len(attending) - capacities[talk]
+        if excess <= 0:
+            continue
+        priority = np.where(
+            is_speaker[attending, talk], np.inf, weights[attending, talk]
+        )
+        dropped = attending[np.argsort(priority, kind="stable")[:excess]]
+        chosen[dropped, talk] = False
+
+    for talk in range(chosen.shape[1]):
+        spare = capacities[talk] - chosen[:, talk].sum()
+        if spare <= 0:
+            continue
+        busy = (chosen & overlapping[talk]).any(axis=1)
+        candidates = np.flatnonzero(~chosen[:, talk] & ~busy & (weights[:, talk] > 0))
+        ranked = candidates[np.argsort(-weights[candidates, talk], kind="stable")]
+        chosen[ranked[:spare], talk] = True
+
+    return chosen
+
+
+def fill_timetable(
+    instance: ProblemInstance, *, starts: np.ndarray, rooms: np.ndarray
+) -> list[ScheduledTalk]:
+    """
+    Assign attendees to talks whose start slots and room ids are already
+    fixed.
+
+    Speakers' talks must not overlap each other, otherwise a speaker may miss
+    their own talk.
+    """
+    weights = instance.weights
+    durations = instance.duration
+    capacities = instance.capacity[rooms]
+    ends = starts + durations
+    overlapping = (starts[:, None] < ends[None, :]) & (starts[None, :] < ends[:, None])
+    np.fill_diagonal(overlapping, False)
+
+    is_speaker = np.arange(len(instance.attendees))[:, None] == instance.speaker
+    # Speakers must attend their own talks, so those outweigh everything else,
+    # including their own dislike of them
+    speaker_bonus = np.abs(weights).sum(axis=1, keepdims=True) + 1
+    chosen = assign_attendees(starts, durations, weights + is_speaker * speaker_bonus)
+    chosen = repair_capacity(chosen, weights, capacities, overlapping, is_speaker)
+
+    return [
+        ScheduledTalk(
+            talk=talk,
+            time_slot=TimeSlot(int(starts[column])),
+            location=instance.locations[rooms[column]],
+            attendees=[
+                instance.attendees[row] for row in np.flatnonzero(chosen[:, column])
+            ],
+        )
+        for column, talk in enumerate(instance.talks)
+    ]
+
+
+def joint_upper_bound(instance: ProblemInstance) -> float:
+    """
+    An upper bound on the objective of the joint model: the preference sum is
+    bounded by `preference_upper_bound`, and the schedule can not end before
+    the talk with the latest earliest end.
+    """
+    can_start = instance.allowed_starts.any(axis=1)
+    placeable = can_start.any(axis=1)
+    earliest_start = can_start.argmax(axis=1)
+    earliest_end = int(
+        (earliest_start + instance.duration)[placeable].max(initial=0)
+    )
+    return preference_upper_bound(instance) - 0.001 * earliest_end
+
+
+def solve_two_phase(
+    *, instance: ProblemInstance, options: SolverOptions = SolverOptions()
+) -> Solution:
+    problem, placement = build_timetable_model(instance)
+    solve_cbc(problem, options)
+    status = pulp.LpStatus[problem.status]
+    print(f"Timetable status: {status}")
+    if problem.status != pulp.LpStatusOptimal:
+        # Without an incumbent CBC leaves meaningless values in the variables
+        return Solution(schedule=[], status=status, objective=None, bound=None)
+
+    rooms = np.zeros(len(instance.talks), dtype=int)
+    for (talk, location), scheduled in placement.is_scheduled.items():
+        if round(pulp.value(scheduled) or 0) == 1:
+            rooms[talk] = location
+    schedule = fill_timetable(
+        instance,
+        starts=np.array(
+            [round(pulp.value(start_of)) for start_of in placement.start_of.values()]
+        ),
+        rooms=rooms,
+    )
+
+    objective = schedule_objective(schedule)
+    upper_bound = joint_upper_bound(instance)
+    print(f"Objective: {objective}")
+    print(f"Joint upper bound: {upper_bound}")
+    solution = Solution(
+        schedule=schedule, status=status, objective=objective, bound=upper_bound
+    )
+    print(f"Gap to joint optimum: at most {solution.gap:.2%}")
+
+    return solution
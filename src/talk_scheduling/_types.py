@@ -1,4 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Literal
+
+
+Backend = Literal["cbc", "highs"]
 
 
 @dataclass(frozen=True, order=True)
@@ -73,3 +77,30 @@ class ScheduledTalk:
     time_slot: TimeSlot
     location: Location
     attendees: list[Attendee]
+
+
+@dataclass(kw_only=True, frozen=True)
+class SolverOptions:
+    time_limit: float = 15  # Seconds
+    relative_gap: float | None = None
+    absolute_gap: float | None = None
+    threads: int | None = None
+    seed: int | None = None
+    backend: Backend = "cbc"
+
+
+@dataclass(kw_only=True)
+class Solution:
+    schedule: list[ScheduledTalk]
+    status: str
+    objective: float | None
+    bound: float | None  # Best known upper bound on the objective
+    wall_time: float = 0.0  # Seconds
+    # (seconds since the start, objective) whenever the schedule improved
+    history: list[tuple[float, float]] = field(default_factory=list)
+
+    @property
+    def gap(self) -> float | None:
+        if self.objective is None or self.bound is None:
+            return None
+        return max(self.bound - self.objective, 0) / max(abs(self.bound), 1e-9)
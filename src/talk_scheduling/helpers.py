@@ -1,13 +1,58 @@
+import math
+
 import pulp
 
 
+def expression_bounds(expression) -> tuple[float, float]:
+    """
+    Compute the smallest and largest value a linear expression can take given
+    the bounds of its variables. Unbounded variables give infinite bounds.
+
+    Parameters:
+    - expression: A number, pulp.LpVariable or pulp.LpAffineExpression.
+    """
+    if isinstance(expression, (int, float)):
+        return expression, expression
+    if isinstance(expression, pulp.LpVariable):
+        expression = pulp.LpAffineExpression(expression)
+
+    lower = upper = expression.constant
+    for variable, coefficient in expression.items():
+        low = -math.inf if variable.lowBound is None else variable.lowBound
+        high = math.inf if variable.upBound is None else variable.upBound
+        if coefficient >= 0:
+            lower += coefficient * low
+            upper += coefficient * high
+        else:
+            lower += coefficient * high
+            upper += coefficient * low
+    return lower, upper
+
+
+def big_m(expression) -> float:
+    """
+    The smallest M such that `expression <= M` holds for every assignment
+    within the variable bounds.
+
+    Parameters:
+    - expression: A number, pulp.LpVariable or pulp.LpAffineExpression.
+    """
+    _, upper = expression_bounds(expression)
+    if math.isinf(upper):
+        raise ValueError(
+            f"Cannot derive a big-M for the unbounded expression {expression}, "
+            "bound its variables or pass M explicitly"
+        )
+    return max(upper, 0)
+
+
 def pulp_min(
     problem: pulp.LpProblem,
     a: pulp.LpVariable,
     b: pulp.LpVariable,
     sel: pulp.LpVariable,
     *,
-    M: float,
+    M: float | None = None,
 ):
     """
     Compute the min of two variable a and b using a binary variable sel.
@@ -18,10 +63,11 @@ def pulp_min(
     - a: The first variable.
     - b: The second variable.
     - sel: The binary variable that indicates which of a or b is smaller.
-    - M: A large constant used for the constraints.
+    - M: A large constant used for the constraints. If omitted, the smallest
+      valid constant is derived from the variable bounds for each constraint.
     """
-    problem += a - b <= M * sel
-    problem += b - a <= M * (1 - sel)
+    problem += a - b <= (big_m(a - b) if M is None else M) * sel
+    problem += b - a <= (big_m(b - a) if M is None else M) * (1 - sel)
 
 
 def pulp_max(
@@ -30,7 +76,7 @@ def pulp_max(
     b: pulp.LpVariable,
     sel: pulp.LpVariable,
     *,
-    M: float,
+    M: float | None = None,
 ):
     """
     Compute the max of two variable a and b using a binary variable sel.
@@ -41,7 +87,8 @@ def pulp_max(
     - a: The first variable.
     - b: The second variable.
     - sel: The binary variable that indicates which of a or b is larger.
-    - M: A large constant used for the constraints.
+    - M: A large constant used for the constraints. If omitted, it is derived
+      from the variable bounds.
     """
     pulp_min(problem, -a, -b, sel, M=M)
 
@@ -53,7 +100,7 @@ def pulp_select(
     output: pulp.LpVariable,
     sel: pulp.LpVariable,
     *,
-    M: float,
+    M: float | None = None,
 ):
     """
     Select between two variables a and b using a binary variable sel.
@@ -65,23 +112,26 @@ def pulp_select(
     - b: The second variable.
     - c: The output variable that will be equal to either a or b.
     - sel: The binary variable that indicates which of a or b is selected.
-    - M: A large constant used for the constraints.
+    - M: A large constant used for the constraints. If omitted, the smallest
+      valid constant is derived from the variable bounds for each constraint.
     """
-    problem += output <= a + M * sel
-    problem += output >= a - M * sel
-    problem += output <= b + M * (1 - sel)
-    problem += output >= b - M * (1 - sel)
+    problem += output <= a + (big_m(output - a) if M is None else M) * sel
+    problem += output >= a - (big_m(a - output) if M is None else M) * sel
+    problem += output <= b + (big_m(output - b) if M is None else M) * (1 - sel)
+    problem += output >= b - (big_m(b - output) if M is None else M) * (1 - sel)
 
 
 def pulp_or(
     problem: pulp.LpProblem,
     *constraints: list[pulp.LpConstraint],
     or_variables: list[pulp.LpVariable],
-    M: float = 1e6,
+    M: float | None = None,
     number_of_true_terms: int | None = None,
 ):
     """
     Adds an OR constraint between multiple groups of AND constraints.
+    If M is omitted, the smallest valid constant is derived from the variable
+    bounds for each constraint.
     """
 
     for constraint_group, or_variable in zip(constraints, or_variables):
@@ -90,12 +140,16 @@ def pulp_or(
 
             match constraint.sense:
                 case pulp.LpConstraintEQ:
-                    problem += constraint_expr <= M * (1 - or_variable)
-                    problem += constraint_expr >= -M * (1 - or_variable)
+                    upper = big_m(constraint_expr) if M is None else M
+                    lower = big_m(-constraint_expr) if M is None else M
+                    problem += constraint_expr <= upper * (1 - or_variable)
+                    problem += constraint_expr >= -lower * (1 - or_variable)
                 case pulp.LpConstraintLE:
-                    problem += constraint_expr <= M * (1 - or_variable)
+                    upper = big_m(constraint_expr) if M is None else M
+                    problem += constraint_expr <= upper * (1 - or_variable)
                 case pulp.LpConstraintGE:
-                    problem += constraint_expr >= -M * (1 - or_variable)
+                    lower = big_m(-constraint_expr) if M is None else M
+                    problem += constraint_expr >= -lower * (1 - or_variable)
                 case _:
                     raise ValueError(f"Unknown constraint sense: {constraint.sense}")
 
@@ -106,3 +160,160 @@ def pulp_or(
         )
     else:
         problem += pulp.lpSum([var for var in or_variables]) >= 1
+
+
+def tighten_bound(
+    variable: pulp.LpVariable,
+    *,
+    lower: float | None = None,
+    upper: float | None = None,
+    eps: float = 1e-9,
+) -> bool:
+    """
+    Raise the lower or lower the upper bound of a variable, rounding for
+    integer variables. Bounds that would make the variable infeasible are not
+    applied, that is left to the solver to report.
+
+    Returns whether the bound was tightened.
+    """
+    integer = variable.cat == pulp.LpInteger
+    if upper is not None:
+        if integer:
+            upper = math.floor(upper + eps)
+        if variable.upBound is not None and upper >= variable.upBound - eps:
+            return False
+        if variable.lowBound is not None and upper < variable.lowBound - eps:
+            return False
+        variable.upBound = upper
+        return True
+    if lower is not None:
+        if integer:
+            lower = math.ceil(lower - eps)
+        if variable.lowBound is not None and lower <= variable.lowBound + eps:
+            return False
+        if variable.upBound is not None and lower > variable.upBound + eps:
+            return False
+        variable.lowBound = lower
+        return True
+    return False
+
+
+def propagate_less_equal(
+    terms: list[tuple[pulp.LpVariable, float]], rhs: float
+) -> int:
+    """
+    Tighten the bounds of the variables in sum(a_k * x_k) <= rhs, each term can
+    at most use up what is left of rhs when all others take their smallest value.
+
+    Returns the number of bounds that were tightened.
+    """
+    smallest = [
+        coefficient
+        * (
+            (-math.inf if variable.lowBound is None else variable.lowBound)
+            if coefficient > 0
+            else (math.inf if variable.upBound is None else variable.upBound)
+        )
+        for variable, coefficient in terms
+    ]
+    unbounded = sum(math.isinf(value) for value in smallest)
+    if unbounded > 1:
+        return 0
+    finite_sum = sum(value for value in smallest if not math.isinf(value))
+
+    tightened = 0
+    for (variable, coefficient), own in zip(terms, smallest):
+        if math.isinf(own):
+            rest = finite_sum
+        elif unbounded:
+            continue
+        else:
+            rest = finite_sum - own
+        limit = (rhs - rest) / coefficient
+        if coefficient > 0:
+            tightened += tighten_bound(variable, upper=limit)
+        else:
+            tightened += tighten_bound(variable, lower=limit)
+    return tightened
+
+
+def propagate_bounds(problem: pulp.LpProblem, *, max_rounds: int = 10) -> int:
+    """
+    Tighten variable bounds using the constraints of the problem.
+
+    Every constraint is propagated with `propagate_less_equal`, equality
+    constraints in both directions. Passes repeat until nothing changes
+    anymore or `max_rounds` is reached.
+
+    Parameters:
+    - problem: The pulp.LpProblem whose variable bounds will be tightened.
+    - max_rounds: The maximum number of passes over all constraints.
+
+    Returns the number of bounds that were tightened.
+    """
+    tightened = 0
+    for _ in range(max_rounds):
+        changed = 0
+        for constraint in problem.constraints.values():
+            terms = [
+                (variable, coefficient)
+                for variable, coefficient in constraint.items()
+                if coefficient != 0
+            ]
+            rhs = -constraint.constant
+            if constraint.sense in (pulp.LpConstraintLE, pulp.LpConstraintEQ):
+                changed += propagate_less_equal(terms, rhs)
+            if constraint.sense in (pulp.LpConstraintGE, pulp.LpConstraintEQ):
+                changed += propagate_less_equal(
+                    [(variable, -coefficient) for variable, coefficient in terms],
+                    -rhs,
+                )
+        tightened += changed
+        if not changed:
+            break
+
+    return tightened
+
+
+def complete_initial_values(
+    problem: pulp.LpProblem, solver: pulp.LpSolver | None = None
+) -> bool:
+    """
+    Fill in the initial values of all variables that have none yet.
+
+    The variables that already have an initial value are fixed to it and the
+    remaining ones are found by solving the fixed problem, which is usually
+    decided by presolve alone. This turns a partial assignment into a complete
+    one that can be handed to CBC as a warm start, CBC itself reads missing
+    values as 0.
+
+    Parameters:
+    - problem: The pulp.LpProblem whose variables will get initial values.
+    - solver: The solver used for the fixed problem, CBC if omitted.
+
+    Returns whether the partial assignment could be completed. If not, the
+    initial values are left as they were.
+    """
+    variables = problem.variables()
+    if all(variable.varValue is not None for variable in variables):
+        return True
+
+    bounds = {
+        variable: (variable.lowBound, variable.upBound)
+        for variable in variables
+        if variable.varValue is not None
+    }
+    initial_values = {variable: variable.varValue for variable in variables}
+    for variable in bounds:
+        variable.lowBound = variable.upBound = variable.varValue
+    try:
+        problem.solve(solver or pulp.PULP_CBC_CMD(msg=False))
+        completed = problem.status == pulp.LpStatusOptimal
+    finally:
+        for variable, (lower, upper) in bounds.items():
+            variable.lowBound, variable.upBound = lower, upper
+
+    if not completed:
+        for variable, value in initial_values.items():
+            variable.varValue = value
+    return completed
@@ -0,0 +1,236 @@
+import pytest
+import time
+from pathlib import Path
+
+from talk_scheduling import (
+    Location,
+    Talk,
+    Attendee,
+    AllowedTimes,
+    TimeRange,
+    TimeSlot,
+    ScheduledTalk,
+)
+
+
+def build_example_instance() -> dict:
+    locations = [
+        Location(
+            name="Room A",
+            capacity=10,
+            allowed_times=AllowedTimes(
+                times=[TimeRange(start=TimeSlot(5), end=TimeSlot(7))]
+            ),
+        ),
+        Location(
+            name="Room B",
+            capacity=4,
+            allowed_times=AllowedTimes(
+                times=[
+                    TimeRange(start=TimeSlot(0), end=TimeSlot(4)),
+                    TimeRange(start=TimeSlot(10), end=TimeSlot(50)),
+                ]
+            ),
+        ),
+        Location(
+            name="Room C",
+            capacity=20,
+            allowed_times=AllowedTimes(
+                times=[TimeRange(start=TimeSlot(0), end=TimeSlot(10))]
+            ),
+        ),
+    ]
+    talks = [
+        Talk(
+            title="Talk 1",
+            speaker=Attendee(name="Alice"),
+            duration=2,
+            visitor_preferences={Attendee(name="Bob"): 1, Attendee(name="Charlie"): 2},
+        ),
+        Talk(
+            title="Talk 2",
+            speaker=Attendee(name="Alice"),
+            duration=3,
+            visitor_preferences={Attendee(name="Bob"): 1, Attendee(name="Charlie"): 2},
+        ),
+        Talk(
+            title="Talk 3",
+            speaker=Attendee(name="Dave"),
+            duration=3,
+            visitor_preferences={Attendee(name="Eve"): 10, Attendee(name="Charlie"): 5},
+        ),
+    ]
+    allowed_times = AllowedTimes(
+        times=[
+            TimeRange(start=TimeSlot(0), end=TimeSlot(4)),
+            TimeRange(start=TimeSlot(6), end=TimeSlot(50)),
+        ]
+    )
+    return dict(talks=talks, locations=locations, allowed_times=allowed_times)
+
+
+def build_crowded_instance() -> dict:
+    """
+    Five talks on two days in rooms of different sizes and opening hours,
+    with speakers giving two talks, negative preferences and more interested
+    listeners than the small rooms can seat.
+    """
+    people = {
+        name: Attendee(name=name)
+        for name in ["Ada", "Ben", "Cy", "Dee", "Eli", "Fay", "Gus", "Hal"]
+    }
+    talks = [
+        Talk(
+            title=title,
+            speaker=people[speaker],
+            duration=duration,
+            visitor_preferences={
+                people[name]: preference for name, preference in preferences.items()
+            },
+        )
+        for title, speaker, duration, preferences in [
+            ("Keynote", "Ada", 3, dict(Ben=5, Cy=4, Dee=4, Eli=3, Fay=2, Gus=1)),
+            ("Solvers", "Ben", 2, dict(Cy=3, Dee=-2, Hal=4)),
+            ("Bounds", "Ben", 2, dict(Ada=2, Eli=5, Fay=-1)),
+            ("Cuts", "Cy", 1, dict(Dee=3, Gus=3, Hal=2)),
+            ("Heuristics", "Dee", 2, dict(Ada=1, Fay=4, Gus=4, Hal=-3)),
+        ]
+    ]
+
+    def times(*ranges: tuple[int, int]) -> AllowedTimes:
+        return AllowedTimes(
+            times=[
+                TimeRange(start=TimeSlot(start), end=TimeSlot(end))
+                for start, end in ranges
+            ]
+        )
+
+    locations = [
+        Location(name="Hall", capacity=6, allowed_times=times((0, 8))),
+        Location(name="Studio", capacity=3, allowed_times=times((0, 5))),
+        Location(name="Nook", capacity=2, allowed_times=times((3, 8))),
+    ]
+    return dict(talks=talks, locations=locations, allowed_times=times((0, 4), (5, 8)))
+
+
+# The optimum of the joint model on the crowded instance
+CROWDED_OBJECTIVE = 49.692
+
+
+def build_sequencing_instance() -> dict:
+    """
+    Three talks in two rooms over more slots than they need. They could run
+    side by side, but Pat only hears all of them if they run one after
+    another, and Quinn dislikes the last one.
+    """
+    pat, quinn = Attendee(name="Pat"), Attendee(name="Quinn")
+    times = AllowedTimes(times=[TimeRange(start=TimeSlot(0), end=TimeSlot(8))])
+    return dict(
+        talks=[
+            Talk(
+                title=f"Talk {index}",
+                speaker=Attendee(name=f"Speaker {index}"),
+                duration=2,
+                visitor_preferences={pat: 5, quinn: 4 if index < 2 else -1},
+            )
+            for index in range(3)
+        ],
+        locations=[
+            Location(name=name, capacity=3, allowed_times=times)
+            for name in ("Room 1", "Room 2")
+        ],
+        allowed_times=times,
+    )
+
+
+# Pat at every talk and Quinn at the liked ones, so the talks end at slot 6;
+# the speakers fill the seats left, one at the talk Quinn skips
+SEQUENCING_OBJECTIVE = 3 * 5 + 2 * 4 + 4 * 0.1 - 0.001 * 6
+
+
+def check_schedule(
+    schedule: list[ScheduledTalk],
+    *,
+    talks: list[Talk],
+    locations: list[Location],
+    allowed_times: AllowedTimes,
+):
+    assert sorted(s.talk.title for s in schedule) == sorted(t.title for t in talks)
+
+    for scheduled in schedule:
+        start = scheduled.time_slot.index
+        end = start + scheduled.talk.duration
+        assert any(
+            time_range.start.index <= start and end <= time_range.end.index
+            for time_range in scheduled.location.allowed_times.times
+        )
+        assert any(
+            time_range.start.index <= start and end <= time_range.end.index
+            for time_range in allowed_times.times
+        )
+        assert scheduled.talk.speaker in scheduled.attendees
+        assert len(scheduled.attendees) <= scheduled.location.capacity
+
+    for i, a in enumerate(schedule):
+        for b in schedule[i + 1 :]:
+            overlap = (
+                a.time_slot.index < b.time_slot.index + b.talk.duration
+                and b.time_slot.index < a.time_slot.index + a.talk.duration
+            )
+            if not overlap:
+                continue
+            assert a.location != b.location
+            assert not set(a.attendees) & set(b.attendees)
+
+
+def preference_sum(schedule: list[ScheduledTalk]) -> float:
+    return sum(
+        scheduled.talk.visitor_preferences.get(attendee, 0.1)
+        for scheduled in schedule
+        for attendee in scheduled.attendees
+    )
+
+
+def process_group(group: int) -> list[int]:
+    """
+    The ids of the live processes in a process group, read from /proc.
+    """
+    members = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # The command name in parentheses may contain spaces
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+        # Zombies have ended and only wait to be reaped
+        if int(fields[2]) == group and fields[0] != "Z":
+            members.append(int(stat.parent.name))
+    return members
+
+
+def group_ends(group: int, timeout: float = 5) -> bool:
+    """
+    Whether every process of a process group ends within `timeout` seconds.
+    Killed processes only go away once the kernel has torn them down.
+    """
+    deadline = time.perf_counter() + timeout
+    while process_group(group):
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+needs_proc = pytest.mark.skipif(
+    not Path("/proc/self/stat").exists(), reason="Needs /proc to list processes"
+)
+
+
+@pytest.fixture
+def example_instance() -> dict:
+    return build_example_instance()
+
+
+@pytest.fixture
+def crowded_instance() -> dict:
+    return build_crowded_instance()
@@ -0,0 +1,68 @@
+import pytest
+
+from talk_scheduling import (
+    solve_assignment,
+    Location,
+    Talk,
+    Attendee,
+    AllowedTimes,
+    TimeRange,
+    TimeSlot,
+)
+from talk_scheduling._aggregation import group_attendees
+from talk_scheduling._instance import compile_instance
+
+from conftest import check_schedule, preference_sum
+
+
+def build_crowd_instance() -> dict:
+    crowd = [Attendee(name=f"Listener {i}") for i in range(6)]
+    talks = [
+        Talk(
+            title=f"Talk {i}",
+            speaker=Attendee(name=f"Speaker {i}"),
+            duration=2,
+            visitor_preferences={listener: i + 1 for listener in crowd},
+        )
+        for i in range(3)
+    ]
+    locations = [
+        Location(
+            name=f"Room {name}",
+            capacity=4,
+            allowed_times=AllowedTimes(
+                times=[TimeRange(start=TimeSlot(0), end=TimeSlot(4))]
+            ),
+        )
+        for name in "AB"
+    ]
+    allowed_times = AllowedTimes(times=[TimeRange(start=TimeSlot(0), end=TimeSlot(4))])
+    return dict(talks=talks, locations=locations, allowed_times=allowed_times)
+
+
+def test_group_attendees_merges_identical_profiles():
+    instance = build_crowd_instance()
+    speakers, classes = group_attendees(compile_instance(**instance))
+
+    assert len(speakers) == 3
+    assert len(classes) == 1
+    assert classes[0].size == 6
+    assert classes[0].preferences == (1, 2, 3)
+
+
+def test_aggregated_solve_matches_individual_solve():
+    instance = build_crowd_instance()
+    individual = solve_assignment(
+        **instance, formulation="time_indexed", conflict_encoding="per_slot"
+    ).schedule
+    aggregated = solve_assignment(
+        **instance, formulation="time_indexed", aggregate_attendees=True
+    ).schedule
+
+    check_schedule(aggregated, **instance)
+    assert preference_sum(aggregated) == pytest.approx(preference_sum(individual))
+
+
+def test_aggregation_requires_time_indexed(example_instance):
+    with pytest.raises(ValueError):
+        solve_assignment(**example_instance, aggregate_attendees=True)
@@ -0,0 +1,47 @@
+import pytest
+
+from talk_scheduling import SolverOptions, solve_assignment
+from talk_scheduling._greedy import greedy_schedule
+from talk_scheduling._instance import compile_instance
+from talk_scheduling._model import schedule_objective
+
+from conftest import CROWDED_OBJECTIVE, check_schedule, preference_sum
+
+
+def test_annealing_finds_optimum(example_instance):
+    solution = solve_assignment(
+        **example_instance,
+        strategy="annealing",
+        options=SolverOptions(time_limit=5, seed=0),
+    )
+
+    check_schedule(solution.schedule, **example_instance)
+    assert solution.status == "Annealing"
+    assert preference_sum(solution.schedule) == pytest.approx(21.8)
+    assert solution.objective <= solution.bound
+
+
+def test_annealing_never_worsens_initial_schedule(example_instance):
+    greedy = greedy_schedule(compile_instance(**example_instance))
+    solution = solve_assignment(
+        **example_instance,
+        strategy="annealing",
+        initial_schedule=greedy,
+        options=SolverOptions(time_limit=0),
+    )
+
+    check_schedule(solution.schedule, **example_instance)
+    assert solution.objective == pytest.approx(schedule_objective(greedy))
+
+
+def test_annealing_improves_greedy_on_crowded_instance(crowded_instance):
+    greedy = greedy_schedule(compile_instance(**crowded_instance))
+    solution = solve_assignment(
+        **crowded_instance,
+        strategy="annealing",
+        options=SolverOptions(time_limit=5, seed=0),
+    )
+
+    check_schedule(solution.schedule, **crowded_instance)
+    assert schedule_objective(greedy) < solution.objective <= CROWDED_OBJECTIVE
+    assert solution.bound >= CROWDED_OBJECTIVE
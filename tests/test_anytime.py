@@ -0,0 +1,78 @@
+import multiprocessing
+import time
+
+import pytest
+
+from talk_scheduling import SolverOptions, iterate_solutions, solve_assignment
+
+from conftest import check_schedule, group_ends, needs_proc, process_group
+from test_service import slow_instance
+
+
+def test_incumbents_improve_until_optimal(example_instance):
+    reports = []
+    solution = solve_assignment(
+        **example_instance,
+        formulation="time_indexed",
+        on_incumbent=reports.append,
+        options=SolverOptions(time_limit=30),
+    )
+
+    check_schedule(solution.schedule, **example_instance)
+    assert reports[0].status == "Greedy"
+    objectives = [report.objective for report in reports]
+    assert objectives == sorted(objectives)
+    assert [report.wall_time for report in reports] == sorted(
+        report.wall_time for report in reports
+    )
+    assert reports[-1].objective == solution.objective == pytest.approx(21.788)
+    assert solution.gap == pytest.approx(0, abs=1e-6)
+
+
+def test_caller_stops_search(example_instance):
+    reports = []
+
+    def stop(solution):
+        reports.append(solution)
+        return True
+
+    solution = solve_assignment(**example_instance, on_incumbent=stop)
+
+    check_schedule(solution.schedule, **example_instance)
+    assert len(reports) == 1
+    assert solution.schedule == reports[0].schedule
+
+
+def test_iterate_solutions_can_be_closed(example_instance):
+    solutions = iterate_solutions(**example_instance, strategy="annealing")
+
+    first = next(solutions)
+    solutions.close()
+    check_schedule(first.schedule, **example_instance)
+    assert first.status == "Annealing"
+
+
+@needs_proc
+def test_closing_stops_a_running_mip_stage():
+    instance = slow_instance()
+    options = instance.pop("options")
+    solutions = iterate_solutions(
+        **instance, formulation="time_indexed", options=options
+    )
+
+    # The greedy and the annealed schedule, CBC runs next
+    reports = [next(solutions), next(solutions)]
+    [process] = multiprocessing.active_children()
+    solver = process.pid
+    deadline = time.perf_counter() + 60
+    while len(process_group(solver)) < 2 and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    assert len(process_group(solver)) >= 2
+
+    started = time.perf_counter()
+    solutions.close()
+
+    assert time.perf_counter() - started < 5
+    assert group_ends(solver)
+    for report in reports:
+        check_schedule(report.schedule, **instance)
@@ -0,0 +1,61 @@
+import pulp
+import pytest
+
+from talk_scheduling.helpers import (
+    big_m,
+    complete_initial_values,
+    expression_bounds,
+    propagate_bounds,
+)
+
+
+def test_expression_bounds():
+    x = pulp.LpVariable("x", 0, 10)
+    y = pulp.LpVariable("y", 2, 5)
+
+    assert expression_bounds(x - 2 * y + 1) == (-9, 7)
+    assert expression_bounds(3) == (3, 3)
+    assert big_m(y - x) == 5
+    assert big_m(-x - 1) == 0
+
+
+def test_big_m_of_unbounded_expression():
+    x = pulp.LpVariable("x", 0)
+
+    with pytest.raises(ValueError):
+        big_m(x)
+
+
+def test_propagate_bounds():
+    problem = pulp.LpProblem("test-problem", pulp.LpMaximize)
+    x = pulp.LpVariable("x", 0, cat=pulp.LpInteger)
+    y = pulp.LpVariable("y", 0, 10)
+    z = pulp.LpVariable("z", cat=pulp.LpInteger)
+    problem += x + y
+    problem += 2 * x + y <= 7
+    problem += y >= 3
+    problem += z == x + 1
+
+    tightened = propagate_bounds(problem)
+
+    assert tightened > 0
+    assert x.upBound == 2
+    assert y.upBound == 7
+    assert (z.lowBound, z.upBound) == (1, 3)
+
+
+def test_complete_initial_values_fills_dependent_variables():
+    problem = pulp.LpProblem("complete", pulp.LpMaximize)
+    a = pulp.LpVariable("a", 0, 10, cat=pulp.LpInteger)
+    b = pulp.LpVariable("b", 0, 10, cat=pulp.LpInteger)
+    smaller = pulp.LpVariable("smaller", 0, 10, cat=pulp.LpInteger)
+    problem += smaller
+    problem += smaller <= a
+    problem += smaller <= b
+
+    a.setInitialValue(3)
+    b.setInitialValue(7)
+
+    assert complete_initial_values(problem)
+    assert smaller.varValue == 3
+    assert (a.lowBound, a.upBound) == (0, 10)
@@ -0,0 +1,91 @@
+from dataclasses import replace
+
+from talk_scheduling import Attendee, SolutionCache, SolverOptions
+
+from conftest import check_schedule
+from test_instance import allowed
+
+SETTINGS = dict(
+    formulation="time_indexed", options=SolverOptions(time_limit=30, seed=1)
+)
+
+
+def test_exact_hit_returns_cached_solution(example_instance, tmp_path):
+    cache = SolutionCache(tmp_path)
+    solved = cache.solve(**example_instance, **SETTINGS)
+
+    cached = cache.solve(**example_instance, **SETTINGS)
+
+    assert cached.schedule == solved.schedule
+    assert cached.objective == solved.objective
+    assert cache.statistics.hits == 1
+    assert cache.statistics.misses == 1
+
+
+def test_changed_preference_is_warm_started(example_instance, tmp_path):
+    cache = SolutionCache(tmp_path)
+    cache.solve(**example_instance, **SETTINGS)
+    talks = list(example_instance["talks"])
+    talks[0] = replace(
+        talks[0],
+        visitor_preferences={**talks[0].visitor_preferences, Attendee(name="Eve"): 3},
+    )
+    changed = dict(example_instance, talks=talks)
+
+    solution = cache.solve(**changed, **SETTINGS)
+
+    check_schedule(solution.schedule, **changed)
+    assert cache.statistics.near_hits == 1
+    assert cache.statistics.misses == 1
+
+
+def test_least_recently_used_entries_are_evicted(example_instance, tmp_path):
+    other_settings = dict(SETTINGS, conflict_encoding="per_slot")
+    cache = SolutionCache(tmp_path)
+    cache.solve(**example_instance, **SETTINGS)
+    [entry] = tmp_path.glob("*.json")
+    cache.max_bytes = entry.stat().st_size * 3 // 2
+
+    cache.solve(**example_instance, **other_settings)
+    cache.solve(**example_instance, **other_settings)
+
+    assert cache.statistics.evictions == 1
+    assert not entry.exists()
+    assert cache.statistics.hits == 1
+
+
+def test_solves_without_schedule_are_not_cached(example_instance, tmp_path):
+    # No room is open long enough for any talk
+    locations = [
+        replace(location, allowed_times=allowed((0, 1)))
+        for location in example_instance["locations"]
+    ]
+    infeasible = dict(example_instance, locations=locations)
+    cache = SolutionCache(tmp_path)
+
+    first = cache.solve(**infeasible, **SETTINGS)
+    second = cache.solve(**infeasible, **SETTINGS)
+
+    assert first.status == second.status == "Infeasible"
+    assert cache.statistics.misses == 2
+    assert cache.statistics.hits == 0
+    assert not list(tmp_path.glob("*.json"))
+
+
+def test_near_hit_warm_starts_a_coarsened_solve(crowded_instance, tmp_path):
+    settings = dict(SETTINGS, time_coarsening=2)
+    cache = SolutionCache(tmp_path)
+    first = cache.solve(**crowded_instance, **settings)
+    talks = list(crowded_instance["talks"])
+    talks[1] = replace(
+        talks[1],
+        visitor_preferences={**talks[1].visitor_preferences, Attendee(name="Eli"): 2},
+    )
+    changed = dict(crowded_instance, talks=talks)
+
+    solution = cache.solve(**changed, **settings)
+
+    check_schedule(solution.schedule, **changed)
+    assert cache.statistics.near_hits == 1
+    # The refinement starts from the cached schedule, so it can only improve
+    assert solution.objective >= first.objective - 1e-6
@@ -0,0 +1,59 @@
+import pytest
+
+from talk_scheduling import SolverOptions, solve_assignment
+from talk_scheduling._coarsening import coarsen_problem
+
+from conftest import CROWDED_OBJECTIVE, check_schedule
+from test_service import slow_instance
+
+
+def test_coarse_ranges_only_keep_whole_slots(example_instance):
+    coarse = coarsen_problem(**example_instance, factor=4)
+
+    assert [talk.duration for talk in coarse["talks"]] == [1, 1, 1]
+    # Room A is open from slot 5 to 7, which holds no whole coarse slot
+    assert coarse["locations"][0].allowed_times.times == []
+    assert [
+        (time_range.start.index, time_range.end.index)
+        for time_range in coarse["allowed_times"].times
+    ] == [(0, 1), (2, 12)]
+
+
+@pytest.mark.parametrize("formulation", ["big_m", "time_indexed"])
+def test_coarse_to_fine_schedule_is_feasible(example_instance, formulation):
+    solution = solve_assignment(
+        **example_instance,
+        formulation=formulation,
+        time_coarsening=2,
+        options=SolverOptions(time_limit=30, seed=1),
+    )
+
+    check_schedule(solution.schedule, **example_instance)
+    assert solution.objective <= 21.8 - 0.001 * 12 + 1e-9
+    assert solution.objective <= solution.bound
+
+
+def test_coarse_and_fine_solve_share_the_time_limit():
+    instance = slow_instance()
+    instance.pop("options")
+
+    solution = solve_assignment(
+        **instance,
+        formulation="time_indexed",
+        time_coarsening=2,
+        warm_start=True,
+        options=SolverOptions(time_limit=4, seed=1),
+    )
+
+    check_schedule(solution.schedule, **instance)
+    # Each solve on its own runs into the limit of this instance
+    assert solution.wall_time < 6
+
+
+def test_coarse_to_fine_on_crowded_instance(crowded_instance):
+    solution = solve_assignment(
+        **crowded_instance, formulation="time_indexed", time_coarsening=2
+    )
+
+    check_schedule(solution.schedule, **crowded_instance)
+    assert solution.objective <= CROWDED_OBJECTIVE + 1e-9 <= solution.bound
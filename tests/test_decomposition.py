@@ -0,0 +1,53 @@
+import pytest
+
+from talk_scheduling import SolverOptions, solve_decomposed
+from talk_scheduling._decomposition import split_blocks
+
+from conftest import CROWDED_OBJECTIVE, check_schedule, preference_sum
+
+
+def test_example_splits_into_days(example_instance):
+    blocks = split_blocks(
+        locations=example_instance["locations"],
+        allowed_times=example_instance["allowed_times"],
+    )
+
+    assert [(block.start, block.end) for block in blocks] == [(0, 4), (6, 50)]
+    assert [len(block.locations) for block in blocks] == [2, 3]
+
+
+@pytest.mark.parametrize("by_day", [True, False])
+def test_decomposed_schedule_is_feasible(example_instance, by_day):
+    [room_a, room_b, room_c] = example_instance["locations"]
+
+    solution = solve_decomposed(
+        **example_instance,
+        by_day=by_day,
+        room_clusters=[[room_a, room_b], [room_c]],
+        max_workers=2,
+        formulation="time_indexed",
+        options=SolverOptions(time_limit=30, seed=1),
+    )
+
+    check_schedule(solution.schedule, **example_instance)
+    assert preference_sum(solution.schedule) <= 21.8 + 1e-9
+    assert solution.objective <= solution.bound
+
+
+@pytest.mark.parametrize("max_rounds", [0, -1])
+def test_decomposition_needs_a_round(example_instance, max_rounds):
+    with pytest.raises(ValueError, match="max_rounds"):
+        solve_decomposed(**example_instance, max_rounds=max_rounds)
+
+
+def test_decomposed_crowded_instance(crowded_instance):
+    # The speaker of two talks must give both on the same day
+    solution = solve_decomposed(
+        **crowded_instance,
+        max_workers=2,
+        formulation="time_indexed",
+        options=SolverOptions(time_limit=30, seed=1),
+    )
+
+    check_schedule(solution.schedule, **crowded_instance)
+    assert solution.objective <= CROWDED_OBJECTIVE + 1e-9 <= solution.bound
@@ -0,0 +1,47 @@
+from talk_scheduling import Location, Talk, Attendee, AllowedTimes, TimeRange, TimeSlot
+from talk_scheduling._domains import contiguous_runs
+from talk_scheduling._instance import compile_instance
+
+
+def allowed(*ranges: tuple[int, int]) -> AllowedTimes:
+    return AllowedTimes(
+        times=[
+            TimeRange(start=TimeSlot(start), end=TimeSlot(end)) for start, end in ranges
+        ]
+    )
+
+
+def test_feasible_start_slots_fit_into_location_and_global_ranges():
+    talk = Talk(
+        title="Talk", speaker=Attendee(name="Alice"), duration=3, visitor_preferences={}
+    )
+    location = Location(
+        name="Room", capacity=10, allowed_times=allowed((0, 10), (20, 22))
+    )
+
+    instance = compile_instance(
+        talks=[talk], locations=[location], allowed_times=allowed((0, 4), (6, 50))
+    )
+
+    assert instance.domains() == {(0, 0): [0, 1, 6, 7]}
+
+
+def test_start_slot_domains_prune_impossible_pairs():
+    talk = Talk(
+        title="Talk", speaker=Attendee(name="Alice"), duration=3, visitor_preferences={}
+    )
+    small = Location(name="Small", capacity=10, allowed_times=allowed((0, 2)))
+    large = Location(name="Large", capacity=10, allowed_times=allowed((0, 5)))
+
+    instance = compile_instance(
+        talks=[talk], locations=[small, large], allowed_times=allowed((0, 50))
+    )
+
+    assert instance.domains() == {(0, 1): [0, 1, 2]}
+    assert not instance.allowed_starts[0, 0].any()
+
+
+def test_contiguous_runs():
+    assert contiguous_runs([]) == []
+    assert contiguous_runs([3]) == [(3, 3)]
+    assert contiguous_runs([0, 1, 6, 7, 9]) == [(0, 1), (6, 7), (9, 9)]
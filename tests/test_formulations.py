@@ -0,0 +1,134 @@
+import pytest
+
+from talk_scheduling import Attendee, Location, Talk, solve_assignment
+from talk_scheduling._instance import compile_instance
+from talk_scheduling._time_indexed import build_time_indexed_model
+
+from conftest import (
+    CROWDED_OBJECTIVE,
+    SEQUENCING_OBJECTIVE,
+    build_sequencing_instance,
+    check_schedule,
+    preference_sum,
+)
+from test_instance import allowed
+
+
+@pytest.mark.parametrize(
+    "formulation, conflict_encoding",
+    [
+        ("big_m", "pairwise"),
+        ("time_indexed", "pairwise"),
+        ("time_indexed", "per_slot"),
+    ],
+)
+def test_formulation_finds_valid_schedule(
+    example_instance, formulation, conflict_encoding
+):
+    schedule = solve_assignment(
+        **example_instance,
+        formulation=formulation,
+        conflict_encoding=conflict_encoding,
+    ).schedule
+
+    check_schedule(schedule, **example_instance)
+    assert preference_sum(schedule) == pytest.approx(21.8)
+
+
+def test_unknown_formulation(example_instance):
+    with pytest.raises(ValueError):
+        solve_assignment(**example_instance, formulation="unknown")
+
+
+def test_per_slot_encoding_requires_time_indexed(example_instance):
+    with pytest.raises(ValueError):
+        solve_assignment(
+            **example_instance, formulation="big_m", conflict_encoding="per_slot"
+        )
+
+
+@pytest.mark.parametrize(
+    "formulation, conflict_encoding",
+    [
+        ("big_m", "pairwise"),
+        ("time_indexed", "pairwise"),
+        ("time_indexed", "per_slot"),
+    ],
+)
+def test_attendee_conflicts_sequence_the_talks(formulation, conflict_encoding):
+    instance = build_sequencing_instance()
+
+    solution = solve_assignment(
+        **instance, formulation=formulation, conflict_encoding=conflict_encoding
+    )
+
+    check_schedule(solution.schedule, **instance)
+    assert solution.objective == pytest.approx(SEQUENCING_OBJECTIVE)
+
+
+@pytest.mark.parametrize(
+    "formulation, conflict_encoding",
+    [
+        ("big_m", "pairwise"),
+        ("time_indexed", "pairwise"),
+        ("time_indexed", "per_slot"),
+    ],
+)
+def test_formulations_agree_on_crowded_instance(
+    crowded_instance, formulation, conflict_encoding
+):
+    solution = solve_assignment(
+        **crowded_instance,
+        formulation=formulation,
+        conflict_encoding=conflict_encoding,
+    )
+
+    check_schedule(solution.schedule, **crowded_instance)
+    assert solution.objective == pytest.approx(CROWDED_OBJECTIVE)
+
+
+def model_size(instance: dict, conflict_encoding: str) -> tuple[int, int]:
+    problem = build_time_indexed_model(
+        instance=compile_instance(**instance), conflict_encoding=conflict_encoding
+    ).problem
+    rows = problem.constraints.values()
+    return len(rows), sum(len(row) for row in rows)
+
+
+@pytest.mark.parametrize(
+    "rooms, slots, smaller",
+    [
+        # Twenty short talks in ten rooms over two slots
+        (10, 2, "per_slot"),
+        # The same talks in two rooms over a long day
+        (2, 30, "pairwise"),
+    ],
+)
+def test_per_slot_encoding_is_smaller_only_on_crowded_slots(rooms, slots, smaller):
+    listeners = [Attendee(name=f"listener {index}") for index in range(10)]
+    times = allowed((0, slots))
+    instance = dict(
+        talks=[
+            Talk(
+                title=f"Talk {index}",
+                speaker=Attendee(name=f"speaker {index}"),
+                duration=1,
+                visitor_preferences={listener: 1 for listener in listeners},
+            )
+            for index in range(20)
+        ],
+        locations=[
+            Location(name=f"Room {index}", capacity=10, allowed_times=times)
+            for index in range(rooms)
+        ],
+        allowed_times=times,
+    )
+    sizes = {
+        encoding: model_size(instance, encoding)
+        for encoding in ("pairwise", "per_slot")
+    }
+    larger = ({"pairwise", "per_slot"} - {smaller}).pop()
+
+    # Fewer rows and fewer nonzeros
+    assert sizes[smaller][0] < sizes[larger][0]
+    assert sizes[smaller][1] < sizes[larger][1]
@@ -0,0 +1,39 @@
+import pytest
+
+from talk_scheduling import solve_assignment
+from talk_scheduling._greedy import greedy_schedule
+from talk_scheduling._instance import compile_instance
+from talk_scheduling._model import schedule_objective
+
+from conftest import CROWDED_OBJECTIVE, check_schedule, preference_sum
+
+
+def test_greedy_schedule_is_feasible(example_instance):
+    schedule = greedy_schedule(compile_instance(**example_instance))
+
+    check_schedule(schedule, **example_instance)
+
+
+@pytest.mark.parametrize("formulation", ["big_m", "time_indexed"])
+def test_warm_start_keeps_optimum(example_instance, formulation):
+    greedy = greedy_schedule(compile_instance(**example_instance))
+    schedule = solve_assignment(
+        **example_instance, formulation=formulation, warm_start=True
+    ).schedule
+
+    check_schedule(schedule, **example_instance)
+    assert preference_sum(schedule) == pytest.approx(21.8)
+    assert schedule_objective(schedule) >= schedule_objective(greedy) - 1e-6
+
+
+def test_warm_start_keeps_optimum_of_crowded_instance(crowded_instance):
+    greedy = greedy_schedule(compile_instance(**crowded_instance))
+    check_schedule(greedy, **crowded_instance)
+
+    solution = solve_assignment(
+        **crowded_instance, formulation="time_indexed", warm_start=True
+    )
+
+    check_schedule(solution.schedule, **crowded_instance)
+    assert schedule_objective(greedy) < CROWDED_OBJECTIVE
+    assert solution.objective == pytest.approx(CROWDED_OBJECTIVE)
@@ -0,0 +1,47 @@
+from talk_scheduling import Location, Talk, Attendee, AllowedTimes, TimeRange, TimeSlot
+from talk_scheduling._instance import compile_instance
+
+
+def allowed(*ranges: tuple[int, int]) -> AllowedTimes:
+    return AllowedTimes(
+        times=[
+            TimeRange(start=TimeSlot(start), end=TimeSlot(end)) for start, end in ranges
+        ]
+    )
+
+
+def test_compiled_domains_of_example(example_instance):
+    instance = compile_instance(**example_instance)
+    domains = instance.domains()
+
+    # Room A is only open from 5 to 7, which no global range covers
+    assert {location for _, location in domains} == {1, 2}
+    # Room C closes at 10, the global ranges skip slots 4 and 5
+    assert domains[0, 2] == [0, 1, 2, 6, 7, 8]
+    assert domains[1, 2] == domains[2, 2] == [0, 1, 6, 7]
+    # Room B reopens at 10, a talk of 3 slots can start until 47
+    assert domains[1, 1] == [0, 1, *range(10, 48)]
+    for (talk, location), slots in domains.items():
+        assert instance.allowed_starts[talk, location].nonzero()[0].tolist() == slots
+
+
+def test_compiled_preferences_keep_explicit_zeros():
+    alice, bob, carol = (Attendee(name=name) for name in ("Alice", "Bob", "Carol"))
+    talk = Talk(
+        title="Talk",
+        speaker=alice,
+        duration=2,
+        visitor_preferences={bob: 0, carol: 3},
+    )
+    location = Location(name="Room", capacity=3, allowed_times=allowed((0, 1)))
+
+    instance = compile_instance(
+        talks=[talk], locations=[location], allowed_times=allowed((0, 10))
+    )
+
+    assert instance.attendees == [alice, bob, carol]
+    assert instance.speaker.tolist() == [0]
+    assert instance.rated_by(0) == [1, 2]
+    assert instance.weights[:, 0].tolist() == [0.1, 0, 3]
+    # The room's only range is shorter than the talk
+    assert instance.domains() == {}
@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+from talk_scheduling import load_instance, read_schedule, write_schedule
+from talk_scheduling._greedy import greedy_schedule
+from talk_scheduling._instance import compile_instance
+
+
+def write_tables(instance: dict, directory, suffix: str) -> dict:
+    tables = {
+        "talks": pd.DataFrame(
+            [
+                (talk.title, talk.speaker.name, talk.duration)
+                for talk in instance["talks"]
+            ],
+            columns=["title", "speaker", "duration"],
+        ),
+        "rooms": pd.DataFrame(
+            [(location.name, location.capacity) for location in instance["locations"]],
+            columns=["name", "capacity"],
+        ),
+        "availability": pd.DataFrame(
+            [
+                (location.name, time_range.start.index, time_range.end.index)
+                for location in instance["locations"]
+                for time_range in location.allowed_times.times
+            ]
+            + [
+                (None, time_range.start.index, time_range.end.index)
+                for time_range in instance["allowed_times"].times
+            ],
+            columns=["location", "start", "end"],
+        ),
+        "preferences": pd.DataFrame(
+            [
+                (talk.title, attendee.name, preference)
+                for talk in instance["talks"]
+                for attendee, preference in talk.visitor_preferences.items()
+            ],
+            columns=["talk", "attendee", "preference"],
+        ),
+    }
+    paths = {}
+    for name, frame in tables.items():
+        paths[name] = directory / f"{name}{suffix}"
+        if suffix == ".csv":
+            frame.to_csv(paths[name], index=False)
+        elif suffix == ".jsonl":
+            frame.to_json(paths[name], orient="records", lines=True)
+        else:
+            frame.to_parquet(paths[name], index=False)
+    return paths
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl"])
+def test_load_instance_reads_chunked_tables(example_instance, tmp_path, suffix):
+    paths = write_tables(example_instance, tmp_path, suffix)
+
+    loaded = load_instance(**paths, chunksize=1)
+
+    assert loaded == example_instance
+
+
+def test_load_instance_reads_parquet(example_instance, tmp_path):
+    pytest.importorskip("pyarrow")
+    paths = write_tables(example_instance, tmp_path, ".parquet")
+
+    assert load_instance(**paths) == example_instance
+
+
+def test_load_instance_rejects_unknown_talks(example_instance, tmp_path):
+    paths = write_tables(example_instance, tmp_path, ".csv")
+    pd.DataFrame(
+        [("Talk 4", "Bob", 1)], columns=["talk", "attendee", "preference"]
+    ).to_csv(paths["preferences"], index=False)
+
+    with pytest.raises(ValueError, match="Talk 4"):
+        load_instance(**paths)
+
+
+@pytest.mark.parametrize("name", ["schedule.csv", "schedule.json"])
+def test_schedule_round_trip(example_instance, tmp_path, name):
+    schedule = greedy_schedule(compile_instance(**example_instance))
+
+    write_schedule(schedule, tmp_path / name)
+
+    assert read_schedule(tmp_path / name, example_instance) == schedule
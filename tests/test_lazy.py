@@ -0,0 +1,43 @@
+import pytest
+
+from talk_scheduling import solve_assignment
+from talk_scheduling._instance import compile_instance
+from talk_scheduling._problem import build_big_m_model
+
+from conftest import CROWDED_OBJECTIVE, check_schedule, preference_sum
+
+
+@pytest.mark.parametrize("warm_start", [False, True])
+def test_lazy_constraints_find_optimum(example_instance, warm_start):
+    solution = solve_assignment(
+        **example_instance, lazy_constraints=True, warm_start=warm_start
+    )
+
+    check_schedule(solution.schedule, **example_instance)
+    assert preference_sum(solution.schedule) == pytest.approx(21.8)
+
+
+def test_lazy_model_starts_smaller(example_instance):
+    instance = compile_instance(**example_instance)
+    eager = build_big_m_model(instance)
+    lazy = build_big_m_model(instance, lazy=True)
+
+    assert len(lazy.problem.constraints) < len(eager.problem.constraints)
+    assert lazy.separate is not None and eager.separate is None
+
+
+def test_lazy_constraints_require_big_m(example_instance):
+    with pytest.raises(ValueError):
+        solve_assignment(
+            **example_instance, formulation="time_indexed", lazy_constraints=True
+        )
+
+
+def test_lazy_constraints_keep_optimum_of_crowded_instance(crowded_instance):
+    # Talks overlap in time there, so some left out constraints are violated
+    solution = solve_assignment(
+        **crowded_instance, lazy_constraints=True, warm_start=True
+    )
+
+    check_schedule(solution.schedule, **crowded_instance)
+    assert solution.objective == pytest.approx(CROWDED_OBJECTIVE)
@@ -0,0 +1,40 @@
+import pytest
+from dataclasses import replace
+
+from talk_scheduling import solve_lns
+from talk_scheduling._greedy import greedy_schedule
+from talk_scheduling._instance import compile_instance
+from talk_scheduling._lns import merge_schedules
+from talk_scheduling._model import schedule_objective
+
+from conftest import check_schedule
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_lns_improves_greedy_schedule(example_instance, workers):
+    greedy = greedy_schedule(compile_instance(**example_instance))
+    solution = solve_lns(
+        **example_instance, neighbourhood_size=4, time_limit=2, workers=workers
+    )
+
+    check_schedule(solution.schedule, **example_instance)
+    assert solution.objective == pytest.approx(schedule_objective(solution.schedule))
+    assert solution.objective >= schedule_objective(greedy)
+    objectives = [objective for _, objective in solution.history]
+    assert objectives == sorted(objectives)
+
+
+def test_merge_drops_double_booked_listeners(example_instance):
+    schedule = greedy_schedule(compile_instance(**example_instance))
+    first, second = schedule[0], schedule[1]
+    listener = next(
+        attendee for attendee in first.attendees if attendee != second.talk.speaker
+    )
+    moved = replace(
+        second, time_slot=first.time_slot, attendees=[*second.attendees, listener]
+    )
+
+    merged = merge_schedules(schedule, [moved])
+    attended = [scheduled for scheduled in merged if listener in scheduled.attendees]
+
+    assert sum(scheduled.time_slot == first.time_slot for scheduled in attended) <= 1
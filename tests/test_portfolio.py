@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from talk_scheduling import SolverOptions, solve_assignment_portfolio
+from talk_scheduling._portfolio import REPORT_GRACE, _SolveProcess
+
+from conftest import (
+    check_schedule,
+    group_ends,
+    needs_proc,
+    preference_sum,
+    process_group,
+)
+from test_service import slow_instance
+
+
+def test_portfolio_returns_best_schedule(example_instance):
+    solution = solve_assignment_portfolio(
+        **example_instance,
+        portfolio=[
+            dict(formulation="time_indexed", conflict_encoding="per_slot"),
+            dict(formulation="time_indexed", options=SolverOptions(backend="highs")),
+            dict(formulation="unknown"),
+        ],
+        time_limit=30,
+    )
+
+    check_schedule(solution.schedule, **example_instance)
+    assert preference_sum(solution.schedule) == pytest.approx(21.8)
+    assert solution.gap == pytest.approx(0, abs=1e-6)
+
+
+@needs_proc
+def test_stopped_solve_ends_with_its_solver():
+    solve = _SolveProcess(slow_instance())
+    group = solve.process.pid
+    deadline = time.perf_counter() + 60
+    # Wait until the solver runs next to the solving process
+    while len(process_group(group)) < 2 and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    assert len(process_group(group)) >= 2
+
+    started = time.perf_counter()
+    solve.stop()
+
+    assert time.perf_counter() - started < 5
+    assert group_ends(group)
+
+
+def test_entries_share_the_time_limit():
+    instance = slow_instance()
+    instance.pop("options")
+    entry = dict(formulation="time_indexed", warm_start=True)
+
+    started = time.perf_counter()
+    solution = solve_assignment_portfolio(
+        **instance, portfolio=[entry, entry, entry], time_limit=4, max_workers=1
+    )
+
+    # One after another, every entry with the full limit would take 12s
+    assert time.perf_counter() - started < 4 + REPORT_GRACE + 1
+    check_schedule(solution.schedule, **instance)
@@ -0,0 +1,99 @@
+import pytest
+
+from talk_scheduling import (
+    Location,
+    Talk,
+    Attendee,
+    SolverOptions,
+    solve_assignment,
+)
+from talk_scheduling._instance import compile_instance
+from talk_scheduling._prechecks import find_infeasibility, preference_upper_bound
+
+from conftest import CROWDED_OBJECTIVE
+from test_instance import allowed
+
+
+def problem(
+    durations: dict[str, int], speakers: dict[str, str], rooms: int, end: int
+) -> dict:
+    return dict(
+        talks=[
+            Talk(
+                title=title,
+                speaker=Attendee(name=speakers[title]),
+                duration=duration,
+                visitor_preferences={},
+            )
+            for title, duration in durations.items()
+        ],
+        locations=[
+            Location(name=f"R{index}", capacity=5, allowed_times=allowed((0, end)))
+            for index in range(rooms)
+        ],
+        allowed_times=allowed((0, end)),
+    )
+
+
+@pytest.mark.parametrize(
+    "durations, speakers, rooms, end, reason",
+    [
+        ({"A": 5}, {"A": "a"}, 1, 4, "Talk 'A' fits into no room"),
+        ({"A": 2, "B": 2, "C": 2}, {"A": "a", "B": "b", "C": "c"}, 1, 4, "rooms are"),
+        # Every talk runs at slots 2 and 3, wherever it starts
+        ({"A": 4, "B": 4, "C": 4}, {"A": "a", "B": "b", "C": "c"}, 2, 6, "slot 2"),
+        ({"A": 3, "B": 2}, {"A": "a", "B": "a"}, 2, 4, "Speaker 'a'"),
+    ],
+)
+def test_infeasible_instances_are_reported(durations, speakers, rooms, end, reason):
+    instance = problem(durations, speakers, rooms, end)
+
+    assert reason in find_infeasibility(compile_instance(**instance))
+    solution = solve_assignment(**instance)
+    assert solution.status == "Infeasible"
+    assert solution.objective is None
+
+
+def test_initial_schedule_within_gap_is_returned(example_instance):
+    optimum = solve_assignment(**example_instance, formulation="time_indexed")
+    bound = preference_upper_bound(compile_instance(**example_instance))
+    assert bound >= 21.8 - 1e-9
+
+    solution = solve_assignment(
+        **example_instance,
+        formulation="time_indexed",
+        initial_schedule=optimum.schedule,
+        options=SolverOptions(relative_gap=0.01),
+    )
+    assert solution.schedule == optimum.schedule
+    assert solution.bound - solution.objective <= 0.01 * solution.bound
+
+
+@pytest.mark.parametrize("formulation", ["big_m", "time_indexed"])
+def test_negative_preferences_do_not_lower_the_bound(formulation):
+    talk = Talk(
+        title="A",
+        speaker=Attendee(name="S"),
+        duration=1,
+        visitor_preferences={Attendee(name="B"): -3},
+    )
+    instance = dict(
+        talks=[talk],
+        locations=[Location(name="R", capacity=10, allowed_times=allowed((0, 2)))],
+        allowed_times=allowed((0, 2)),
+    )
+    assert preference_upper_bound(compile_instance(**instance)) == pytest.approx(0.1)
+
+    solution = solve_assignment(**instance, formulation=formulation)
+    assert solution.objective == pytest.approx(0.099)
+    assert solution.schedule[0].attendees == [Attendee(name="S")]
+    assert solution.bound >= solution.objective
+
+
+def test_bound_holds_with_negative_preferences(crowded_instance):
+    instance = compile_instance(**crowded_instance)
+
+    assert (instance.weights < 0).any()
+    assert preference_upper_bound(instance) >= CROWDED_OBJECTIVE
+    solution = solve_assignment(**crowded_instance, formulation="time_indexed")
+    assert solution.objective == pytest.approx(CROWDED_OBJECTIVE)
@@ -73,3 +73,26 @@ def test_pulp_max():
             assert a >= b
         else:
             assert a < b
+
+
+def test_pulp_min_derives_big_m_from_bounds():
+    for _ in range(100):
+        a = randint(-20, 20)
+        b = randint(-20, 20)
+        problem = pulp.LpProblem("test-problem", pulp.LpMinimize)
+        pulp_solver = pulp.PULP_CBC_CMD(msg=False, timeLimit=15)
+
+        x = pulp.LpVariable("x", -20, 20)
+        y = pulp.LpVariable("y", -20, 20)
+        c = pulp.LpVariable("c", 0, 1, cat=pulp.LpBinary)
+        problem += x == a
+        problem += y == b
+        pulp_min(problem, x, y, c)
+
+        problem.solve(pulp_solver)
+
+        assert pulp.LpStatus[problem.status] == "Optimal"
+        if pulp.value(c) == 0:
+            assert a <= b
+        else:
+            assert a > b
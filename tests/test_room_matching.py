@@ -0,0 +1,75 @@
+import pytest
+
+from talk_scheduling import (
+    Location,
+    Talk,
+    ScheduledTalk,
+    Attendee,
+    TimeSlot,
+    SolverOptions,
+    solve_assignment,
+)
+from talk_scheduling._instance import compile_instance
+from talk_scheduling._room_matching import match_rooms, repair_rooms
+
+from conftest import CROWDED_OBJECTIVE, check_schedule
+from test_instance import allowed
+
+
+def test_room_matching_solves_example(example_instance):
+    solution = solve_assignment(
+        **example_instance,
+        formulation="time_indexed",
+        room_matching=True,
+        options=SolverOptions(time_limit=30, seed=1),
+    )
+
+    check_schedule(solution.schedule, **example_instance)
+    assert solution.objective == pytest.approx(21.8 - 0.001 * 12)
+
+
+def test_talks_without_a_room_are_repaired():
+    # Room Y closes between its ranges, so only Room X can hold slots 1 to 3
+    rooms = [
+        Location(name="X", capacity=5, allowed_times=allowed((0, 4))),
+        Location(name="Y", capacity=5, allowed_times=allowed((0, 2), (2, 4))),
+    ]
+    talks = [
+        Talk(
+            title=title,
+            speaker=Attendee(name=title),
+            duration=2,
+            visitor_preferences={},
+        )
+        for title in "ABC"
+    ]
+    problem = dict(talks=talks, locations=rooms, allowed_times=allowed((0, 4)))
+    instance = compile_instance(**problem)
+    schedule = [
+        ScheduledTalk(
+            talk=talk,
+            time_slot=TimeSlot(start),
+            location=rooms[0],
+            attendees=[talk.speaker],
+        )
+        for talk, start in zip(talks, [0, 1, 2])
+    ]
+
+    matched, unmatched = match_rooms(schedule, instance)
+    repaired = repair_rooms(matched, unmatched, instance, SolverOptions())
+
+    assert [scheduled.talk.title for scheduled in unmatched] == ["B"]
+    check_schedule(repaired, **problem)
+
+
+def test_room_matching_keeps_optimum_with_room_sizes(crowded_instance):
+    # The rooms differ in size and opening hours, so pooling them matters
+    solution = solve_assignment(
+        **crowded_instance,
+        formulation="time_indexed",
+        room_matching=True,
+        options=SolverOptions(time_limit=30, seed=1),
+    )
+
+    check_schedule(solution.schedule, **crowded_instance)
+    assert solution.objective == pytest.approx(CROWDED_OBJECTIVE)
@@ -0,0 +1,63 @@
+from talk_scheduling import Attendee, Scheduler, SolverOptions, Talk
+
+from conftest import check_schedule
+
+
+def solved_scheduler(example_instance, **arguments) -> Scheduler:
+    scheduler = Scheduler(**example_instance, **arguments)
+    scheduler.solve(
+        formulation="time_indexed", options=SolverOptions(time_limit=30, seed=1)
+    )
+    scheduler.publish()
+    return scheduler
+
+
+def current_problem(scheduler: Scheduler) -> dict:
+    return dict(
+        talks=scheduler.talks,
+        locations=scheduler.locations,
+        allowed_times=scheduler.allowed_times,
+    )
+
+
+def test_edits_keep_the_schedule_feasible(example_instance):
+    scheduler = solved_scheduler(example_instance)
+    [talk_1, talk_2, talk_3] = example_instance["talks"]
+    [_, room_b, room_c] = example_instance["locations"]
+
+    scheduler.remove_talk(talk_2)
+    scheduler.add_talk(
+        Talk(
+            title="Talk 4",
+            speaker=Attendee(name="Frank"),
+            duration=2,
+            visitor_preferences={Attendee(name="Eve"): 4},
+        )
+    )
+    scheduler.set_capacity(room_c, 2)
+    scheduler.set_preferences(talk_1, {Attendee(name="Bob"): 5})
+    solution = scheduler.reoptimise()
+
+    check_schedule(solution.schedule, **current_problem(scheduler))
+    assert solution.objective is not None
+
+
+def test_published_talks_stay_within_move_limit(example_instance):
+    scheduler = solved_scheduler(example_instance, max_moved=0)
+    before = {
+        scheduled.talk.title: (scheduled.time_slot, scheduled.location.name)
+        for scheduled in scheduler.schedule
+    }
+
+    for talk in list(scheduler.talks):
+        scheduler.set_preferences(
+            talk, {attendee: 1 for attendee in talk.visitor_preferences}
+        )
+    solution = scheduler.reoptimise()
+
+    check_schedule(solution.schedule, **current_problem(scheduler))
+    after = {
+        scheduled.talk.title: (scheduled.time_slot, scheduled.location.name)
+        for scheduled in solution.schedule
+    }
+    assert after == before
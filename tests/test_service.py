@@ -0,0 +1,186 @@
+import asyncio
+import http.client
+import json
+import socket
+import time
+
+import pytest
+
+from talk_scheduling import (
+    Location,
+    Talk,
+    Attendee,
+    SolverOptions,
+    SolveService,
+    serve,
+)
+
+from conftest import check_schedule
+from test_instance import allowed
+from test_io import write_tables
+
+
+def slow_instance() -> dict:
+    # Every listener likes every talk, so every solve is hard
+    listeners = [Attendee(name=f"listener {index}") for index in range(30)]
+    return dict(
+        talks=[
+            Talk(
+                title=f"Talk {index}",
+                speaker=Attendee(name=f"speaker {index}"),
+                duration=2,
+                visitor_preferences={listener: 1 + index % 3 for listener in listeners},
+            )
+            for index in range(16)
+        ],
+        locations=[
+            Location(name=f"Room {index}", capacity=12, allowed_times=allowed((0, 20)))
+            for index in range(4)
+        ],
+        allowed_times=allowed((0, 20)),
+        options=SolverOptions(time_limit=60),
+    )
+
+
+def test_identical_jobs_are_solved_once(example_instance):
+    async def main():
+        async with SolveService(max_workers=2) as service:
+            first = service.submit(**example_instance, formulation="time_indexed")
+            second = service.submit(**example_instance, formulation="time_indexed")
+            other = service.submit(**example_instance, strategy="two_phase")
+            solutions = await asyncio.gather(
+                service.result(first), service.result(other)
+            )
+            return first, second, other, solutions
+
+    first, second, other, [solution, two_phase] = asyncio.run(main())
+
+    assert first == second != other
+    check_schedule(solution.schedule, **example_instance)
+    check_schedule(two_phase.schedule, **example_instance)
+    assert solution.objective == pytest.approx(21.788)
+
+
+def test_jobs_run_by_priority_and_can_be_cancelled(example_instance):
+    async def main():
+        async with SolveService(max_workers=1) as service:
+            slow = service.submit(**slow_instance())
+            while service.status(slow) != "running":
+                await asyncio.sleep(0.01)
+            low = service.submit(**example_instance, strategy="two_phase")
+            high = service.submit(**example_instance, priority=1)
+            dropped = service.submit(**example_instance, strategy="annealing")
+            finished = []
+            waiting = [asyncio.create_task(service.result(job)) for job in (low, high)]
+            for job, task in zip((low, high), waiting):
+                task.add_done_callback(lambda _, job=job: finished.append(job))
+
+            assert service.cancel(dropped)
+            started = time.perf_counter()
+            assert service.cancel(slow)
+            await asyncio.gather(*waiting)
+            with pytest.raises(asyncio.CancelledError):
+                await service.result(slow)
+            return finished, [low, high], time.perf_counter() - started, service
+
+    finished, (low, high), elapsed, service = asyncio.run(main())
+
+    assert finished == [high, low]
+    assert elapsed < 30
+    assert {job.status for job in service.jobs.values()} == {"done", "cancelled"}
+
+
+def request(path: str, method: str, target: str, body=None) -> dict:
+    connection = http.client.HTTPConnection("localhost")
+    connection.sock = socket.socket(socket.AF_UNIX)
+    connection.sock.connect(path)
+    connection.request(method, target, body=json.dumps(body) if body else None)
+    return json.loads(connection.getresponse().read())
+
+
+def test_server_solves_submitted_tables(example_instance, tmp_path):
+    tables = {
+        name: [json.loads(line) for line in path.read_text().splitlines()]
+        for name, path in write_tables(example_instance, tmp_path, ".jsonl").items()
+    }
+    socket_path = str(tmp_path / "service.sock")
+
+    async def main():
+        async with SolveService(max_workers=1) as service:
+            server = await serve(service, path=socket_path)
+            async with server:
+                submitted = await asyncio.to_thread(
+                    request,
+                    socket_path,
+                    "POST",
+                    "/jobs",
+                    dict(tables, settings=dict(formulation="time_indexed")),
+                )
+                await service.result(submitted["job"])
+                job = await asyncio.to_thread(
+                    request, socket_path, "GET", f"/jobs/{submitted['job']}"
+                )
+                missing = await asyncio.to_thread(
+                    request, socket_path, "DELETE", "/jobs/unknown"
+                )
+                return job, missing
+
+    job, missing = asyncio.run(main())
+
+    assert job["status"] == "done"
+    assert job["solution"]["objective"] == pytest.approx(21.788)
+    rows = job["solution"]["schedule"]
+    assert {row["talk"] for row in rows} == {t.title for t in example_instance["talks"]}
+    assert missing == dict(error="Unknown job")
+
+
+def test_only_the_latest_finished_jobs_are_kept(example_instance):
+    async def main():
+        async with SolveService(max_workers=1, keep_finished=2) as service:
+            first = service.submit(**example_instance, strategy="annealing")
+            cancelled = service.submit(**slow_instance())
+            service.cancel(cancelled)
+            await service.result(first)
+            last = service.submit(**example_instance, strategy="two_phase")
+            await service.result(last)
+            return first, cancelled, last, set(service.jobs)
+
+    first, cancelled, last, kept = asyncio.run(main())
+
+    assert kept == {first, last}
+    assert cancelled not in kept
+
+
+def test_server_survives_broken_requests(example_instance, tmp_path):
+    socket_path = str(tmp_path / "service.sock")
+
+    async def send(data: bytes) -> bytes:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        writer.write(data)
+        writer.write_eof()
+        reply = await asyncio.wait_for(reader.read(), timeout=10)
+        writer.close()
+        return reply
+
+    async def main():
+        async with SolveService(max_workers=1) as service:
+            server = await serve(service, path=socket_path)
+            async with server:
+                # The client stops sending halfway through the body
+                cut_off = await send(
+                    b"POST /jobs HTTP/1.1\r\nContent-Length: 100\r\n\r\n{"
+                )
+                not_an_object = await send(
+                    b"POST /jobs HTTP/1.1\r\nContent-Length: 2\r\n\r\n[]"
+                )
+                missing = await asyncio.to_thread(
+                    request, socket_path, "GET", "/jobs/unknown"
+                )
+                return cut_off, not_an_object, missing
+
+    cut_off, not_an_object, missing = asyncio.run(main())
+
+    assert cut_off == b""
+    assert not_an_object.startswith(b"HTTP/1.1 400 Bad Request")
+    assert b"JSON object" in not_an_object
+    assert missing == dict(error="Unknown job")
@@ -0,0 +1,47 @@
+import pytest
+
+from talk_scheduling import SolverOptions, solve_assignment
+from talk_scheduling._solvers import read_cbc_bound
+
+from conftest import check_schedule, preference_sum
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        SolverOptions(time_limit=30, relative_gap=0.0, threads=2, seed=7),
+        SolverOptions(time_limit=30, relative_gap=0.0, backend="highs"),
+    ],
+)
+def test_solution_reports_gap_and_wall_time(example_instance, options):
+    solution = solve_assignment(
+        **example_instance, formulation="time_indexed", options=options
+    )
+
+    check_schedule(solution.schedule, **example_instance)
+    assert preference_sum(solution.schedule) == pytest.approx(21.8)
+    assert solution.objective == pytest.approx(21.8 - 0.001 * 12)
+    assert solution.gap == pytest.approx(0, abs=1e-6)
+    assert solution.wall_time > 0
+
+
+def test_highs_rejects_unsupported_options(example_instance):
+    with pytest.raises(ValueError):
+        solve_assignment(
+            **example_instance,
+            formulation="time_indexed",
+            options=SolverOptions(threads=4, backend="highs"),
+        )
+
+
+def test_read_cbc_bound():
+    stopped = (
+        "Result - Stopped on time limit\n\n"
+        "Objective value:  10.5\nUpper bound:  12.25\nGap:  0.14\n"
+    )
+    optimal = "Result - Optimal solution found\n\nObjective value:  81.386\n"
+    infeasible = "Result - Stopped on time limit\n\nNo feasible solution found\n"
+
+    assert read_cbc_bound(stopped) == 12.25
+    assert read_cbc_bound(optimal) == 81.386
+    assert read_cbc_bound(infeasible) is None
@@ -0,0 +1,77 @@
+import pytest
+
+from dataclasses import replace
+
+from talk_scheduling import (
+    AllowedTimes,
+    SolverOptions,
+    TimeRange,
+    TimeSlot,
+    solve_assignment,
+)
+from talk_scheduling._instance import compile_instance
+from talk_scheduling._sparse import build_sparse_model, solve_sparse
+
+from conftest import (
+    SEQUENCING_OBJECTIVE,
+    build_sequencing_instance,
+    check_schedule,
+    preference_sum,
+)
+
+
+@pytest.mark.parametrize("conflict_encoding", ["pairwise", "per_slot"])
+def test_highs_backend_matches_cbc(example_instance, conflict_encoding):
+    schedule = solve_assignment(
+        **example_instance,
+        formulation="time_indexed",
+        conflict_encoding=conflict_encoding,
+        options=SolverOptions(backend="highs"),
+    ).schedule
+
+    check_schedule(schedule, **example_instance)
+    assert preference_sum(schedule) == pytest.approx(21.8)
+
+
+@pytest.mark.parametrize("conflict_encoding", ["pairwise", "per_slot"])
+def test_highs_backend_sequences_the_talks(conflict_encoding):
+    instance = build_sequencing_instance()
+
+    solution = solve_assignment(
+        **instance,
+        formulation="time_indexed",
+        conflict_encoding=conflict_encoding,
+        options=SolverOptions(backend="highs"),
+    )
+
+    check_schedule(solution.schedule, **instance)
+    assert solution.status == "Optimal"
+    assert solution.objective == pytest.approx(SEQUENCING_OBJECTIVE)
+
+
+def test_highs_status_uses_pulp_names():
+    # Talks 0 and 1 share their speaker and can only run at slots 0 and 1, so
+    # they clash whatever their room; the pre-checks are skipped on purpose
+    instance = build_sequencing_instance()
+    speaker = instance["talks"][0].speaker
+    instance["talks"][1] = replace(instance["talks"][1], speaker=speaker)
+    instance["allowed_times"] = AllowedTimes(
+        times=[TimeRange(start=TimeSlot(0), end=TimeSlot(2))]
+    )
+
+    solution = solve_sparse(instance=compile_instance(**instance))
+
+    assert solution.status == "Infeasible"
+    assert solution.objective is None
+
+
+def test_sparse_model_shape(example_instance):
+    model = build_sparse_model(compile_instance(**example_instance))
+
+    assert model.matrix.shape == (len(model.row_lower), len(model.c))
+    assert len(model.lower) == len(model.upper) == len(model.c)
+
+
+def test_highs_backend_requires_time_indexed(example_instance):
+    with pytest.raises(ValueError):
+        solve_assignment(**example_instance, options=SolverOptions(backend="highs"))
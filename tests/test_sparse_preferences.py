@@ -0,0 +1,64 @@
+import pytest
+
+from talk_scheduling import solve_assignment
+
+from conftest import CROWDED_OBJECTIVE, check_schedule
+
+
+@pytest.mark.parametrize("conflict_encoding", ["pairwise", "per_slot"])
+def test_sparse_preferences_match_dense_model(example_instance, conflict_encoding):
+    dense = solve_assignment(
+        **example_instance,
+        formulation="time_indexed",
+        conflict_encoding=conflict_encoding,
+    )
+    sparse = solve_assignment(
+        **example_instance,
+        formulation="time_indexed",
+        conflict_encoding=conflict_encoding,
+        sparse_preferences=True,
+    )
+
+    check_schedule(sparse.schedule, **example_instance)
+    assert sparse.objective == pytest.approx(dense.objective)
+
+
+def test_sparse_preferences_with_warm_start(example_instance):
+    solution = solve_assignment(
+        **example_instance,
+        formulation="time_indexed",
+        sparse_preferences=True,
+        warm_start=True,
+    )
+
+    check_schedule(solution.schedule, **example_instance)
+    assert solution.objective == pytest.approx(21.8 - 0.012)
+
+
+def test_sparse_preferences_require_time_indexed(example_instance):
+    with pytest.raises(ValueError):
+        solve_assignment(**example_instance, sparse_preferences=True)
+    with pytest.raises(ValueError):
+        solve_assignment(
+            **example_instance,
+            formulation="time_indexed",
+            sparse_preferences=True,
+            aggregate_attendees=True,
+        )
+
+
+@pytest.mark.parametrize("conflict_encoding", ["pairwise", "per_slot"])
+def test_sparse_preferences_seat_fillers_in_crowded_instance(
+    crowded_instance, conflict_encoding
+):
+    # Unrated listeners fill the free seats, but must not be counted twice
+    # where small rooms are full or their talks overlap
+    solution = solve_assignment(
+        **crowded_instance,
+        formulation="time_indexed",
+        conflict_encoding=conflict_encoding,
+        sparse_preferences=True,
+    )
+
+    check_schedule(solution.schedule, **crowded_instance)
+    assert solution.objective == pytest.approx(CROWDED_OBJECTIVE)
@@ -0,0 +1,93 @@
+import pytest
+
+from talk_scheduling import (
+    solve_assignment,
+    Location,
+    Talk,
+    Attendee,
+    AllowedTimes,
+    TimeRange,
+    TimeSlot,
+)
+from talk_scheduling._greedy import greedy_schedule
+from talk_scheduling._instance import compile_instance
+from talk_scheduling._symmetry import canonical_schedule, room_classes, talk_classes
+
+from conftest import check_schedule
+
+
+def build_symmetric_instance() -> dict:
+    listeners = [Attendee(name=f"Listener {i}") for i in range(4)]
+    workshop = [
+        Talk(
+            title=f"Workshop session {i}",
+            speaker=Attendee(name="Trainer"),
+            duration=2,
+            visitor_preferences={listener: 2 for listener in listeners[:2]},
+        )
+        for i in range(3)
+    ]
+    talks = workshop + [
+        Talk(
+            title=f"Talk {i}",
+            speaker=Attendee(name=f"Speaker {i}"),
+            duration=1,
+            visitor_preferences={listeners[i]: 3, listeners[i + 1]: 1},
+        )
+        for i in range(2)
+    ]
+    allowed_times = AllowedTimes(times=[TimeRange(start=TimeSlot(0), end=TimeSlot(6))])
+    locations = [
+        Location(name=f"Room {name}", capacity=3, allowed_times=allowed_times)
+        for name in "ABC"
+    ] + [Location(name="Hall", capacity=10, allowed_times=allowed_times)]
+    return dict(talks=talks, locations=locations, allowed_times=allowed_times)
+
+
+def test_equivalence_classes():
+    instance = build_symmetric_instance()
+
+    assert room_classes(instance["locations"]) == [[0, 1, 2]]
+    assert talk_classes(instance["talks"]) == [[0, 1, 2]]
+
+
+@pytest.mark.parametrize("formulation", ["big_m", "time_indexed"])
+def test_symmetry_breaking_keeps_the_optimum(formulation, capsys):
+    instance = build_symmetric_instance()
+    solution = solve_assignment(
+        **instance, formulation=formulation, warm_start=True, break_symmetries=True
+    )
+
+    check_schedule(solution.schedule, **instance)
+    assert solution.objective == pytest.approx(17.5 - 0.006)
+    assert "Symmetries found 4" in capsys.readouterr().out
+
+    starts = {
+        scheduled.talk: scheduled.time_slot.index for scheduled in solution.schedule
+    }
+    workshop = instance["talks"][:3]
+    assert [starts[talk] for talk in workshop] == sorted(
+        starts[talk] for talk in workshop
+    )
+
+
+def test_canonical_schedule_stays_feasible():
+    instance = build_symmetric_instance()
+    compiled = compile_instance(**instance)
+    canonical = canonical_schedule(greedy_schedule(compiled), compiled)
+
+    check_schedule(canonical, **instance)
+    rooms = instance["locations"][:3]
+    first_talk = [
+        min(
+            (
+                index
+                for index, talk in enumerate(instance["talks"])
+                for scheduled in canonical
+                if scheduled.talk == talk and scheduled.location == room
+            ),
+            default=len(instance["talks"]),
+        )
+        for room in rooms
+    ]
+    assert first_talk == sorted(first_talk)
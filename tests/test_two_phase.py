@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from itertools import combinations
+from random import Random
+
+from talk_scheduling import Attendee, Location, Talk, solve_assignment
+from talk_scheduling._two_phase import assign_attendees, repair_capacity
+
+from conftest import CROWDED_OBJECTIVE, check_schedule
+from test_instance import allowed
+
+
+def brute_force_best(starts, durations, weights_row):
+    best = 0.0
+    talks = range(len(starts))
+    for size in range(len(starts) + 1):
+        for subset in combinations(talks, size):
+            if any(
+                starts[i] < starts[j] + durations[j]
+                and starts[j] < starts[i] + durations[i]
+                for i, j in combinations(subset, 2)
+            ):
+                continue
+            best = max(best, sum(weights_row[i] for i in subset))
+    return best
+
+
+def test_assign_attendees_is_optimal_per_attendee():
+    random = Random(4)
+    for _ in range(20):
+        starts = np.array([random.randint(0, 8) for _ in range(6)])
+        durations = np.array([random.randint(1, 4) for _ in range(6)])
+        weights = np.array([[random.randint(0, 5) for _ in range(6)] for _ in range(5)])
+
+        chosen = assign_attendees(starts, durations, weights)
+
+        for row in range(weights.shape[0]):
+            picked = np.flatnonzero(chosen[row])
+            for i, j in combinations(picked, 2):
+                assert not (
+                    starts[i] < starts[j] + durations[j]
+                    and starts[j] < starts[i] + durations[i]
+                )
+            assert weights[row, picked].sum() == brute_force_best(
+                starts, durations, weights[row]
+            )
+
+
+def test_repair_capacity_keeps_speakers_and_fills_seats():
+    weights = np.array([[1.0, 3.0], [5.0, 1.0], [2.0, 2.0]])
+    chosen = np.array([[True, False], [True, False], [True, False]])
+    is_speaker = np.array([[True, False], [False, False], [False, True]])
+    overlapping = np.zeros((2, 2), dtype=bool)
+
+    repaired = repair_capacity(
+        chosen, weights, np.array([2, 3]), overlapping, is_speaker
+    )
+
+    assert repaired[:, 0].tolist() == [True, True, False]
+    assert repaired[:, 1].tolist() == [True, True, True]
+
+
+def test_two_phase_finds_valid_schedule(example_instance):
+    schedule = solve_assignment(**example_instance, strategy="two_phase").schedule
+
+    check_schedule(schedule, **example_instance)
+
+
+def test_two_phase_stays_below_joint_optimum(crowded_instance):
+    solution = solve_assignment(**crowded_instance, strategy="two_phase")
+
+    check_schedule(solution.schedule, **crowded_instance)
+    assert solution.objective <= CROWDED_OBJECTIVE + 1e-9 <= solution.bound
+
+
+@pytest.mark.parametrize("strategy", ["two_phase", "annealing"])
+def test_speaker_who_dislikes_the_other_talk_gives_their_own(strategy):
+    # Both talks run at once; the listeners of T0 fill its room unless the
+    # speaker is forced in, and a0 must not be seated in T1 instead
+    people = [Attendee(name=f"a{index}") for index in range(4)]
+    times = allowed((0, 2))
+    instance = dict(
+        talks=[
+            Talk(
+                title="T0",
+                speaker=people[0],
+                duration=2,
+                visitor_preferences={people[2]: 5, people[3]: 5},
+            ),
+            Talk(
+                title="T1",
+                speaker=people[1],
+                duration=2,
+                visitor_preferences={people[0]: -10},
+            ),
+        ],
+        locations=[
+            Location(name=f"Room {index}", capacity=2, allowed_times=times)
+            for index in range(2)
+        ],
+        allowed_times=times,
+    )
+
+    solution = solve_assignment(**instance, strategy=strategy)
+
+    check_schedule(solution.schedule, **instance)
+    attendees = {s.talk.title: s.attendees for s in solution.schedule}
+    assert people[0] not in attendees["T1"]
+    assert solution.objective == pytest.approx(5 + 3 * 0.1 - 0.001 * 2)